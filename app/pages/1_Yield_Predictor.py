@@ -9,7 +9,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.ml import yield_predictor
-from src.analysis import economics
+from src.analysis import economics, crop_recommender
 from src.data_ingestion import smart_soil_ingestion
 from utils.translations import TRANSLATIONS
 
@@ -26,15 +26,6 @@ def text_to_speech(text, lang='en'):
         st.error(f"Could not generate audio. Error: {e}")
         return None
 
-def get_soil_recommendation_keys(soil_df):
-    """Generates a list of recommendation keys based on soil data."""
-    keys = []
-    if soil_df['nitrogen_kg_ha'].iloc[0] < 120: keys.append("rec_urea")
-    if soil_df['phosphorus_kg_ha'].iloc[0] < 15: keys.append("rec_dap")
-    if soil_df['potassium_kg_ha'].iloc[0] < 200: keys.append("rec_mop")
-    if soil_df['ph'].iloc[0] < 6.0: keys.append("rec_lime")
-    return keys if keys else ["rec_optimal"]
-
 # --- Sidebar and Language Selection ---
 st.sidebar.title("⚙️ Settings")
 st.sidebar.selectbox(
@@ -70,6 +61,10 @@ with col5:
 
 annual_rainfall = st.slider(t["rainfall_slider"], 500, 3500, 1500)
 
+# The model for this farm's state (from the published model bundle, else the single model);
+# loaded once per process by the model registry and reloaded if the files change
+model_payload = yield_predictor.load_payload_for_location(lat, lon)
+
 # --- Button and Backend Processing ---
 if st.button(t["predict_button"], type="primary"):
     with st.spinner(t["spinner_text"]):
@@ -79,7 +74,6 @@ if st.button(t["predict_button"], type="primary"):
             st.error(t["soil_data_error"])
             st.stop()
 
-        model_payload = yield_predictor.load_model_payload()
         input_data = pd.DataFrame({
             'crop': [crop], 'season': [season], 'area': [area], 'annual_rainfall': [annual_rainfall],
             'ph': [soil_df['ph'].iloc[0]], 'nitrogen_kg_ha': [soil_df['nitrogen_kg_ha'].iloc[0]],
@@ -89,7 +83,7 @@ if st.button(t["predict_button"], type="primary"):
         predicted_yield = yield_predictor.make_prediction(input_data, model_payload)
 
         # Get recommendation keys and then get translated results
-        recommendation_keys = get_soil_recommendation_keys(soil_df)
+        recommendation_keys = economics.get_soil_recommendation_keys(soil_df)
         profit_analysis = economics.calculate_profitability(recommendation_keys, predicted_yield, crop, t)
         
         # --- Display Results ---
@@ -112,4 +106,26 @@ if st.button(t["predict_button"], type="primary"):
 
         audio_file = text_to_speech(summary_text_for_audio, lang=lang_code)
         if audio_file:
-            st.audio(audio_file, format='audio/mp3')
\ No newline at end of file
+            st.audio(audio_file, format='audio/mp3')
+
+# --- Crop & Season Comparison ---
+st.header(t.get("crop_sweep_header", "📊 Compare All Crops & Seasons"))
+if st.button(t.get("crop_sweep_button", "Rank Crops for This Farm")):
+    with st.spinner(t["spinner_text"]):
+        soil_df = smart_soil_ingestion.get_smart_soil_data(lat=lat, lon=lon)
+        if soil_df.empty:
+            st.error(t["soil_data_error"])
+            st.stop()
+
+        ranking = crop_recommender.recommend_crops(
+            soil_df, area, annual_rainfall, model_payload,
+            crops=crop_options, seasons=season_options
+        )
+        display_df = pd.DataFrame({
+            t["select_crop"]: ranking["crop"].map(lambda key: t["crops"].get(key, key)),
+            t["select_season"]: ranking["season"].map(lambda key: t["seasons"].get(key, key)),
+            t["econ_predicted_yield"]: ranking["predicted_yield"].round(2),
+            t["econ_revenue"]: ranking["revenue"].round(0),
+            t["econ_profit"]: ranking["profit"].round(0),
+        })
+        st.dataframe(display_df, hide_index=True)
@@ -1,13 +1,12 @@
 import streamlit as st
 from PIL import Image
-import tensorflow as tf
-import numpy as np
-import json
+import pandas as pd
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from utils.translations import TRANSLATIONS
+from src.ml import pest_inference
 
 # --- Sidebar and Language Selection (Consistent with other pages) ---
 st.sidebar.title("⚙️ Settings")
@@ -20,55 +19,48 @@ lang_code = st.session_state.get('lang', 'en')
 t = TRANSLATIONS[lang_code]
 
 # --- Load Model and Class Names ---
-@st.cache_resource
-def load_resources():
-    """Loads the ML model and class names, caching them to improve performance."""
-    model = tf.keras.models.load_model('models/pest_classifier_model.h5')
-    
-    try:
-        with open('models/pest_class_names.json', 'r') as f:
-            class_names = json.load(f)
-    except FileNotFoundError:
-        # Fallback if the JSON file doesn't exist
-        class_names = ['Corn_(maize)___Common_rust', 'Corn_(maize)___healthy']
-    return model, class_names
-
+# The model registry keeps the model in memory and reloads it when the file changes,
+# so it is asked on every run instead of being pinned with st.cache_resource
 try:
-    model, class_names = load_resources()
+    model, class_names = pest_inference.load_pest_model(), pest_inference.load_class_names()
 except Exception as e:
     st.error(f"Error loading model resources: {e}")
-    st.info("Please ensure 'pest_classifier_model.h5' exists in the 'models/' directory.")
+    st.info("Please ensure 'pest_classifier_model.tflite' or 'pest_classifier_model.h5' exists in the 'models/' directory.")
     st.stop()
 
 # --- Main Page UI ---
 st.title("🌿 " + t["pest_detector_title"])
 st.markdown(t["pest_detector_instruction"])
 
-uploaded_file = st.file_uploader(t["file_uploader_label"], type=["jpg", "jpeg", "png"])
-
-if uploaded_file is not None:
-    image = Image.open(uploaded_file)
-    # Use the translated caption
-    st.image(image, caption=t.get("uploaded_image_caption", "Uploaded Image."), use_column_width=True)
+uploaded_files = st.file_uploader(t["file_uploader_label"], type=["jpg", "jpeg", "png"], accept_multiple_files=True)
 
+if uploaded_files:
     with st.spinner(t["classifying_text"]):
-        # Preprocess the image
-        img_resized = image.resize((224, 224))
-        img_array = np.array(img_resized) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
-
-        # Make prediction
-        predictions = model.predict(img_array)
-        score = tf.nn.softmax(predictions[0])
+        # All images are decoded in parallel and classified in one batched pass
+        results, stats = pest_inference.classify_images(uploaded_files, model, class_names)
 
-        # Display result using translated text
-        predicted_class_key = class_names[np.argmax(score)]
-    
-        predicted_class_display = predicted_class_key.replace('___', ' ').replace('_', ' ')
-        confidence = 100 * np.max(score)
+    if len(uploaded_files) > 1:
+        st.caption(t.get("pest_batch_summary", "Classified {count} images in {seconds:.2f}s ({rate:.1f} images/s)").format(
+            count=stats["images"], seconds=stats["total_s"], rate=stats["images_per_s"]))
+        st.dataframe(pd.DataFrame({
+            t.get("pest_image_column", "Image"): results["image"],
+            t.get("pest_result_column", "Result"): results["label"],
+            t.get("pest_confidence_column", "Confidence (%)"): results["confidence"].round(2),
+        }), hide_index=True)
 
-        st.success(t["result_text"].format(result=predicted_class_display))
-        st.info(t["confidence_text"].format(confidence=confidence))
+    columns = st.columns(min(len(uploaded_files), 3))
+    for i, (uploaded_file, result) in enumerate(zip(uploaded_files, results.itertuples(index=False))):
+        with columns[i % len(columns)]:
+            if pd.notna(result.error):
+                st.error(t.get("pest_image_error", "Could not read {image}: {error}").format(
+                    image=result.image, error=result.error))
+                continue
+            # Use the translated caption (rewind first: the file was already read for classification)
+            uploaded_file.seek(0)
+            st.image(Image.open(uploaded_file), caption=t.get("uploaded_image_caption", "Uploaded Image."),
+                     use_column_width=True)
+            st.success(t["result_text"].format(result=result.label))
+            st.info(t["confidence_text"].format(confidence=result.confidence))
 else:
     # Add a placeholder text for when no file is uploaded
     st.info(t.get("pest_detector_placeholder", "Please upload an image of a crop leaf to begin analysis."))
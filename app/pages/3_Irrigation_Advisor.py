@@ -1,14 +1,13 @@
 import streamlit as st
 import pandas as pd
-import requests
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from utils.translations import TRANSLATIONS
-from src.data_ingestion import smart_soil_ingestion
-from src.analysis.irrigation import deduce_soil_type, get_irrigation_advice
+from src.data_ingestion import smart_soil_ingestion, weather_ingestion
+from src.analysis.irrigation import deduce_soil_type, get_irrigation_advice, get_irrigation_schedule
 from src.config import WEATHERAPI
 
 # --- Sidebar and Language Selection ---
@@ -25,24 +24,8 @@ t = TRANSLATIONS[lang_code]
 @st.cache_data(ttl=3600)
 def get_weather_forecast(lat, lon, api_key):
     """Fetches weather data and uses programmatic column names."""
-    base_url = "https://api.weatherapi.com/v1/forecast.json"
-    params = {"key": api_key, "q": f"{lat},{lon}", "days": 5, "aqi": "no", "alerts": "no"}
     try:
-        response = requests.get(base_url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
-        forecast_days = data.get("forecast", {}).get("forecastday", [])
-        if not forecast_days: return pd.DataFrame()
-        
-        rows = [
-            {
-                "Date": pd.to_datetime(d.get("date")),
-                "precipitation_sum": d.get("day", {}).get("totalprecip_mm", 0),
-                "temp_celsius": d.get("day", {}).get("avgtemp_c", 0) # Corrected column name
-            }
-            for d in forecast_days
-        ]
-        return pd.DataFrame(rows)
+        return weather_ingestion.get_weatherapi_forecast(lat, lon, api_key, days=5)
     except Exception as e:
         st.error(f"Failed to fetch weather data: {e}")
         return pd.DataFrame()
@@ -76,14 +59,31 @@ if st.button(t.get("get_irrigation_advice_button", "Get Irrigation Advice"), typ
             # Create a separate DataFrame for display purposes with user-friendly names
             display_df = weather_df.rename(columns={
                 "precipitation_sum": "Rainfall (mm)",
-                "temp_celsius": "Temp (°C)"  # Add the renaming rule for temperature
+                "temp_celsius": "Temp (°C)",  # Add the renaming rule for temperature
+                "humidity_percent": "Humidity (%)",
+                "wind_speed_ms": "Wind (m/s)"
             })
-            st.dataframe(display_df.style.format({"Date": "{:%Y-%m-%d}", "Rainfall (mm)": "{:.1f}", "Temp (°C)": "{:.1f}"}))
+            st.dataframe(display_df.style.format({"Date": "{:%Y-%m-%d}", "Rainfall (mm)": "{:.1f}", "Temp (°C)": "{:.1f}",
+                                                  "Humidity (%)": "{:.0f}", "Wind (m/s)": "{:.1f}"}))
             
             st.subheader(t["recommendations_header"])
         
             advice = get_irrigation_advice(weather_df, deduced_type)
             for line in advice:
                 st.markdown(f"- {line}")
+
+            st.subheader(t.get("irrigation_schedule_header", "🗓️ Daily Irrigation Schedule"))
+            schedule = get_irrigation_schedule(weather_df, deduced_type)
+            action_labels = {
+                "irrigate": t.get("irrigation_action_irrigate", "Irrigate"),
+                "monitor": t.get("irrigation_action_monitor", "Monitor soil moisture"),
+                "none": t.get("irrigation_action_none", "No action needed"),
+            }
+            schedule_df = pd.DataFrame({
+                "Date": schedule["Date"],
+                "Dry-Spell Day": schedule["dry_run_days"],
+                "Action": schedule["action"].map(action_labels),
+            })
+            st.dataframe(schedule_df.style.format({"Date": "{:%Y-%m-%d}"}))
         else:
             st.error(t.get("weather_data_error", "Could not fetch weather data. Check coordinates or API key."))
\ No newline at end of file
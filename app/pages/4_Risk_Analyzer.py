@@ -6,7 +6,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 # Import the backend logic and translations
-from src.analysis import weather_risk
+from src.analysis import risk_rules, weather_risk
 from utils.translations import TRANSLATIONS
 
 # --- Sidebar and Language Selection ---
@@ -29,6 +29,12 @@ col1, col2 = st.columns(2)
 lat = col1.number_input(t.get("latitude", "Latitude"), value=20.46, format="%.4f")
 lon = col2.number_input(t.get("longitude", "Longitude"), value=85.88, format="%.4f")
 
+# Only the rules for the farmer's crop are evaluated, so a maize field gets no rice or wheat alerts
+rules = risk_rules.active_risk_rules()
+crop = st.selectbox(t.get("select_crop", "Select Crop"), options=risk_rules.rule_crops(rules),
+                    format_func=lambda key: t.get("crops", {}).get(key, key))
+crop_rules = risk_rules.rules_for_crop(crop, rules)
+
 if st.button(t.get("get_risk_button", "Analyze Risk"), type="primary"):
     with st.spinner(t.get("analyzing_risk_spinner", "Analyzing 7-day forecast for potential risks...")):
         
@@ -39,17 +45,17 @@ if st.button(t.get("get_risk_button", "Analyze Risk"), type="primary"):
             st.error(t.get("risk_fetch_error", "Could not fetch weather forecast for risk analysis."))
         else:
             # 2. Analyze for risks
-            risk_alerts = weather_risk.analyze_forecast_for_risk(forecast_df)
+            risk_intervals = weather_risk.analyze_forecast_for_risk(forecast_df, crop_rules)
             
-            # 3. Consolidate alerts for better readability
-            final_alerts = weather_risk.consolidate_alerts(risk_alerts)
+            # 3. Consolidate overlapping risk periods for better readability
+            final_alerts = weather_risk.consolidate_alerts(risk_intervals)
             
             # 4. Display the results
             st.subheader(t.get("risk_recommendation_header", "Pest & Disease Risk Alerts"))
             
             if final_alerts:
                 for alert in final_alerts:
-                    st.warning(alert)
+                    st.warning(weather_risk.format_risk_alert(alert, t, rules))
             else:
                 st.success(t.get("no_risk_found", "👍 No immediate high-risk conditions detected."))
 
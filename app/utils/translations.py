@@ -56,6 +56,18 @@ TRANSLATIONS = {
         "classifying_text": "Classifying...",
         "result_text": "**Result:** {result}",
         "confidence_text": "**Confidence:** {confidence:.2f}%",
+
+        # --- Risk Analyzer ---
+        "risk_alert_window": "High Risk of {rule} between {start} and {end}. Conditions are favorable. Recommend inspecting crops closely.",
+        "risk_alert_prolonged": "High Risk of {rule} from {start} to {end}. Conditions are favorable for a prolonged period. Recommend continuous monitoring and proactive spraying if necessary.",
+        "risk_alert_crops": "Affected crops: {crops}.",
+        "risk_rules": {
+            "fungal_common_rust": "Fungal Disease (e.g., Common Rust)", "rice_blast": "Rice Blast",
+            "rice_sheath_blight": "Rice Sheath Blight", "rice_bacterial_leaf_blight": "Bacterial Leaf Blight",
+            "brown_planthopper": "Brown Planthopper", "yellow_stem_borer": "Yellow Stem Borer",
+            "fall_armyworm": "Fall Armyworm", "powdery_mildew": "Powdery Mildew", "wheat_rust": "Wheat Rust",
+            "aphids": "Aphid Infestation", "red_rot": "Sugarcane Red Rot"
+        },
     },
     "hi": { # Hindi (हिंदी)
         "app_title": "एग्री-एडवाइजर प्रो",
@@ -109,6 +121,18 @@ TRANSLATIONS = {
         "classifying_text": "वर्गीकरण हो रहा है...",
         "result_text": "**परिणाम:** {result}",
         "confidence_text": "**आत्मविश्वास:** {confidence:.2f}%",
+
+        # --- Risk Analyzer ---
+        "risk_alert_window": "{start} और {end} के बीच {rule} का उच्च जोखिम। परिस्थितियाँ अनुकूल हैं। फसलों का बारीकी से निरीक्षण करने की सलाह दी जाती है।",
+        "risk_alert_prolonged": "{start} से {end} तक {rule} का उच्च जोखिम। लंबी अवधि तक परिस्थितियाँ अनुकूल हैं। लगातार निगरानी और आवश्यकता होने पर समय पर छिड़काव की सलाह दी जाती है।",
+        "risk_alert_crops": "प्रभावित फसलें: {crops}।",
+        "risk_rules": {
+            "fungal_common_rust": "फफूंद रोग (जैसे, सामान्य रतुआ)", "rice_blast": "धान का झोंका (ब्लास्ट) रोग",
+            "rice_sheath_blight": "धान का शीथ ब्लाइट", "rice_bacterial_leaf_blight": "जीवाणु पत्ती झुलसा",
+            "brown_planthopper": "भूरा फुदका", "yellow_stem_borer": "पीला तना छेदक",
+            "fall_armyworm": "फॉल आर्मीवर्म", "powdery_mildew": "चूर्णिल आसिता", "wheat_rust": "गेहूँ का रतुआ",
+            "aphids": "माहू (एफिड) प्रकोप", "red_rot": "गन्ने का लाल सड़न रोग"
+        },
     },
     "or": { # Odia (ଓଡ଼ିଆ)
         "app_title": "ଏଗ୍ରି-ଆଡଭାଇଜର୍ ପ୍ରୋ",
@@ -162,5 +186,17 @@ TRANSLATIONS = {
         "classifying_text": "ବର୍ଗୀକରଣ କରାଯାଉଛି...",
         "result_text": "**ଫଳାଫଳ:** {result}",
         "confidence_text": "**ବିଶ୍ୱାସ:** {confidence:.2f}%",
+
+        # --- Risk Analyzer ---
+        "risk_alert_window": "{start} ଏବଂ {end} ମଧ୍ୟରେ {rule}ର ଅଧିକ ବିପଦ। ପରିସ୍ଥିତି ଅନୁକୂଳ ଅଟେ। ଫସଲକୁ ଭଲ ଭାବରେ ଯାଞ୍ଚ କରିବାକୁ ପରାମର୍ଶ ଦିଆଯାଉଛି।",
+        "risk_alert_prolonged": "{start} ରୁ {end} ପର୍ଯ୍ୟନ୍ତ {rule}ର ଅଧିକ ବିପଦ। ଦୀର୍ଘ ସମୟ ପାଇଁ ପରିସ୍ଥିତି ଅନୁକୂଳ ଅଟେ। ନିରନ୍ତର ନିରୀକ୍ଷଣ ଏବଂ ଆବଶ୍ୟକ ହେଲେ ଆଗୁଆ ସ୍ପ୍ରେ କରିବାକୁ ପରାମର୍ଶ ଦିଆଯାଉଛି।",
+        "risk_alert_crops": "ପ୍ରଭାବିତ ଫସଲ: {crops}।",
+        "risk_rules": {
+            "fungal_common_rust": "କବକ ରୋଗ (ଯେପରି ସାଧାରଣ କଳଙ୍କି ରୋଗ)", "rice_blast": "ଧାନର ବ୍ଲାଷ୍ଟ ରୋଗ",
+            "rice_sheath_blight": "ଧାନର ଖୋଳପୋଡ଼ା ରୋଗ", "rice_bacterial_leaf_blight": "ଜୀବାଣୁ ପତ୍ର ପୋଡ଼ା ରୋଗ",
+            "brown_planthopper": "ବାଦାମୀ ଫଡ଼ିଙ୍ଗ", "yellow_stem_borer": "ହଳଦିଆ କାଣ୍ଡ ବିନ୍ଧା ପୋକ",
+            "fall_armyworm": "ଫଲ୍ ଆର୍ମିୱର୍ମ", "powdery_mildew": "ଧଳା ଗୁଣ୍ଡି ରୋଗ", "wheat_rust": "ଗହମ କଳଙ୍କି ରୋଗ",
+            "aphids": "ଜାଉପୋକ ଆକ୍ରମଣ", "red_rot": "ଆଖୁର ଲାଲ ପଚା ରୋଗ"
+        },
     }
 }
\ No newline at end of file
@@ -0,0 +1,95 @@
+# src/analysis/crop_recommender.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import economics
+from src.ml import yield_predictor
+
+CATEGORICAL_FEATURES = ('crop', 'season')
+SOIL_FEATURES = ['ph', 'nitrogen_kg_ha', 'phosphorus_kg_ha', 'potassium_kg_ha', 'organic_carbon_percent']
+
+
+# --- GRID CONSTRUCTION ---
+def model_categories(model_payload, feature):
+    """
+    The levels of a categorical feature known to the model. Uses the saved
+    "categories" when the payload has them; otherwise they are read back
+    from the one-hot column names (which lack the level dropped in training).
+    """
+    saved = model_payload.get("categories", {}).get(feature)
+    if saved is not None:
+        return list(saved)
+    prefix = f"{feature}_"
+    return [col[len(prefix):] for col in model_payload["columns"] if col.startswith(prefix)]
+
+def _select_levels(available, wanted):
+    # Match on stripped names, since the training data pads seasons with spaces
+    if wanted is None:
+        return available
+    wanted = {str(w).strip() for w in wanted}
+    return [level for level in available if level.strip() in wanted]
+
+def build_crop_season_grid(model_payload, soil_df, area, annual_rainfall, crops=None, seasons=None):
+    """
+    Builds one input row per crop x season combination for a single farm.
+    crops/seasons restrict the grid (None means every level the model knows).
+    """
+    crop_levels = _select_levels(model_categories(model_payload, 'crop'), crops)
+    season_levels = _select_levels(model_categories(model_payload, 'season'), seasons)
+    crop_grid, season_grid = np.meshgrid(np.array(crop_levels, dtype=object),
+                                         np.array(season_levels, dtype=object), indexing='ij')
+    grid = pd.DataFrame({'crop': crop_grid.ravel(), 'season': season_grid.ravel()})
+    grid['area'] = float(area)
+    grid['annual_rainfall'] = float(annual_rainfall)
+    for col in SOIL_FEATURES:
+        grid[col] = float(soil_df[col].iloc[0])
+    return grid
+
+
+# --- THE SWEEP ---
+def recommend_crops(soil_df, area, annual_rainfall, model_payload, crops=None, seasons=None, top_n=None):
+    """
+    Ranks every crop x season option for a farm by estimated profit.
+
+    The whole grid is scored with one batched model call and priced with
+    one economics.compute_profitability() call (fertilizer cost from the soil
+    recommendations, revenue = predicted yield x market price).
+
+    Args:
+        soil_df (pd.DataFrame): One-row soil profile from smart_soil_ingestion.
+        crops, seasons: Optional lists restricting the sweep (e.g. the crops
+            with known market prices, economics.MARKET_PRICES).
+        top_n (int): Return only the best top_n options.
+    Returns:
+        pd.DataFrame: crop, season, predicted_yield, market_price,
+        input_cost, revenue, profit and rank (1 = most profitable).
+    """
+    start = time.perf_counter()
+    grid = build_crop_season_grid(model_payload, soil_df, area, annual_rainfall, crops, seasons)
+    if grid.empty:
+        return pd.DataFrame(columns=['crop', 'season', 'predicted_yield', 'market_price',
+                                     'input_cost', 'revenue', 'profit', 'rank'])
+
+    predicted = yield_predictor.predict_batch(grid, model_payload)
+
+    economics_df = economics.compute_profitability(
+        grid['crop'], predicted, recommendation_mask=economics.soil_recommendation_mask(soil_df.iloc[:1])[0]
+    )
+    table = pd.DataFrame({
+        'crop': grid['crop'],
+        'season': grid['season'].str.strip(),
+        'predicted_yield': predicted,
+        'market_price': economics_df['market_price'],
+        'input_cost': economics_df['input_cost'],
+        'revenue': economics_df['revenue'],
+        'profit': economics_df['profit'],
+    }).sort_values('profit', ascending=False, kind='stable').reset_index(drop=True)
+    table['rank'] = np.arange(1, len(table) + 1)
+    if top_n is not None:
+        table = table.head(top_n)
+
+    print(f"--- Crop sweep: {len(grid)} options scored in {(time.perf_counter() - start) * 1000:.1f} ms ---")
+    return table
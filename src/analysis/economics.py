@@ -1,4 +1,5 @@
 # src/analysis/economics.py
+import numpy as np
 import pandas as pd
 
 # Approximate costs and prices (INR)
@@ -15,6 +16,101 @@ MARKET_PRICES = {
 }
 DEFAULT_PRICE = 20000
 
+# Soil thresholds behind each fertilizer recommendation: (soil column, below this value)
+RECOMMENDATION_RULES = {
+    'rec_urea': ('nitrogen_kg_ha', 120),
+    'rec_dap': ('phosphorus_kg_ha', 15),
+    'rec_mop': ('potassium_kg_ha', 200),
+    'rec_lime': ('ph', 6.0),
+}
+RECOMMENDATION_KEYS = list(RECOMMENDATION_RULES)
+
+PROFITABILITY_COLUMNS = ['crop', 'predicted_yield', 'area', 'market_price', 'input_cost',
+                         'revenue', 'profit', 'total_input_cost', 'total_revenue', 'total_profit']
+
+def soil_recommendation_mask(soil_df):
+    """
+    Boolean matrix (rows, len(RECOMMENDATION_KEYS)): which fertilizers each
+    soil profile needs. Vectorised form of get_soil_recommendation_keys().
+    """
+    return np.column_stack([
+        soil_df[column].to_numpy(dtype=float) < threshold
+        for column, threshold in RECOMMENDATION_RULES.values()
+    ])
+
+def get_soil_recommendation_keys(soil_df):
+    """Generates a list of recommendation keys based on soil data."""
+    mask = soil_recommendation_mask(soil_df.iloc[:1])[0]
+    keys = [key for key, needed in zip(RECOMMENDATION_KEYS, mask) if needed]
+    return keys if keys else ["rec_optimal"]
+
+def recommendation_mask_from_keys(recommendation_keys):
+    """Converts a list of recommendation keys into one row of the recommendation mask."""
+    return np.array([key in recommendation_keys for key in RECOMMENDATION_KEYS])
+
+# --- Numeric engine ---
+def compute_profitability(crops, predicted_yields, areas=1.0, recommendation_mask=None):
+    """
+    Vectorised profitability for many plantings at once.
+
+    Args:
+        crops (array-like): Crop name per planting.
+        predicted_yields (array-like): Yield in tonnes/hectare per planting.
+        areas (float or array-like): Planted hectares per planting.
+        recommendation_mask (array-like): Booleans (plantings, len(RECOMMENDATION_KEYS))
+            or a single row applied to every planting; None means no fertilizer.
+    Returns:
+        pd.DataFrame: Per-hectare market_price, input_cost, revenue, profit
+        and totals over each planting's area (total_*), all numeric (INR).
+    """
+    crops = pd.Series(np.asarray(crops, dtype=object))
+    predicted_yields = np.asarray(predicted_yields, dtype=float)
+    n = len(crops)
+    areas = np.broadcast_to(np.asarray(areas, dtype=float), (n,))
+
+    costs = np.array([FERTILIZER_COSTS[key] for key in RECOMMENDATION_KEYS], dtype=float)
+    if recommendation_mask is None:
+        input_cost = np.zeros(n)
+    else:
+        mask = np.broadcast_to(np.asarray(recommendation_mask, dtype=bool), (n, len(RECOMMENDATION_KEYS)))
+        input_cost = mask @ costs
+
+    market_price = crops.map(MARKET_PRICES).fillna(DEFAULT_PRICE).to_numpy(dtype=float)
+    revenue = predicted_yields * market_price
+    profit = revenue - input_cost
+
+    return pd.DataFrame({
+        'crop': crops,
+        'predicted_yield': predicted_yields,
+        'area': areas,
+        'market_price': market_price,
+        'input_cost': input_cost,
+        'revenue': revenue,
+        'profit': profit,
+        'total_input_cost': input_cost * areas,
+        'total_revenue': revenue * areas,
+        'total_profit': profit * areas,
+    }, columns=PROFITABILITY_COLUMNS)
+
+# --- Presentation ---
+def format_profitability(result, recommendation_keys, t):
+    """
+    Turns one row of compute_profitability() into the translated,
+    display-ready dictionary shown on the Yield Predictor page.
+    """
+    applied_fertilizers = [t.get(key, key) for key in recommendation_keys if key in FERTILIZER_COSTS]
+    if not applied_fertilizers:
+        applied_fertilizers = [t.get("rec_optimal", "None")]
+
+    return {
+        t["econ_applied_fertilizers"]: ", ".join(applied_fertilizers),
+        t["econ_input_cost"]: f"₹{result['input_cost']:,.2f}",
+        t["econ_predicted_yield"]: f"{result['predicted_yield']:.2f} tonnes/ha",
+        t["econ_market_price"]: f"₹{result['market_price']:,.2f} /tonne",
+        t["econ_revenue"]: f"₹{result['revenue']:,.2f}",
+        t["econ_profit"]: f"₹{result['profit']:,.2f}"
+    }
+
 def calculate_profitability(recommendation_keys, predicted_yield, crop, t):
     """
     Calculates the estimated profitability based on recommendations and yield.
@@ -26,29 +122,7 @@ def calculate_profitability(recommendation_keys, predicted_yield, crop, t):
     Returns:
         dict: A dictionary containing the translated economic analysis.
     """
-    # Calculate total input cost from recommended fertilizers
-    input_cost = sum(FERTILIZER_COSTS.get(key, 0) for key in recommendation_keys)
-    
-    # Get the translated list of applied fertilizers
-    applied_fertilizers = [t.get(key, key) for key in recommendation_keys]
-    if not applied_fertilizers:
-        applied_fertilizers = [t.get("rec_optimal", "None")]
-
-    # Get market price and calculate revenue
-    market_price = MARKET_PRICES.get(crop, DEFAULT_PRICE)
-    revenue = predicted_yield * market_price
-    
-    # Calculate profit
-    profit = revenue - input_cost
-
-    # Build the final dictionary with TRANSLATED keys
-    analysis = {
-        t["econ_applied_fertilizers"]: ", ".join(applied_fertilizers),
-        t["econ_input_cost"]: f"₹{input_cost:,.2f}",
-        t["econ_predicted_yield"]: f"{predicted_yield:.2f} tonnes/ha",
-        t["econ_market_price"]: f"₹{market_price:,.2f} /tonne",
-        t["econ_revenue"]: f"₹{revenue:,.2f}",
-        t["econ_profit"]: f"₹{profit:,.2f}"
-    }
-    
-    return analysis
\ No newline at end of file
+    result = compute_profitability(
+        [crop], [predicted_yield], recommendation_mask=recommendation_mask_from_keys(recommendation_keys)
+    ).iloc[0]
+    return format_profitability(result, recommendation_keys, t)
@@ -1,4 +1,5 @@
 # src/analysis/irrigation.py
+import numpy as np
 import pandas as pd
 
 # --- Soil Deduction ---
@@ -11,6 +12,13 @@ def deduce_soil_type(soil_df):
         return "Sandy"
     return "Loamy"
 
+def deduce_soil_types(soil_df):
+    """Vectorised deduce_soil_type() for every row of a soil frame (e.g. batch ingestion output)."""
+    n = len(soil_df)
+    potassium = soil_df['potassium_kg_ha'].to_numpy(dtype=float) if 'potassium_kg_ha' in soil_df else np.full(n, np.nan)
+    carbon = soil_df['organic_carbon_percent'].to_numpy(dtype=float) if 'organic_carbon_percent' in soil_df else np.full(n, np.nan)
+    return np.select([potassium > 190, carbon < 0.5], ["Clay", "Sandy"], default="Loamy").astype(object)
+
 # --- Irrigation Logic ---
 SOIL_WATER_RETENTION = {
     "Loamy": "Medium",
@@ -19,30 +27,88 @@ SOIL_WATER_RETENTION = {
     "Clay": "High"
 }
 
-def is_high_evaporation_day(day):
+# Thresholds for a dry, high-evaporation spell
+DRY_SPELL_DAYS = 3
+LOW_RAIN_THRESHOLD = 1.0       # mm/day
+HIGH_EVAP_TEMP_C = 30
+HIGH_EVAP_HUMIDITY_PCT = 40
+HIGH_EVAP_WIND_MS = 3
+
+# Per-day action by soil water retention, on days inside a dry spell
+DRY_SPELL_ACTION = {"Low": "irrigate", "Medium": "monitor", "High": "none"}
+
+SCHEDULE_COLUMNS = ['low_rain', 'high_evaporation', 'dry_run_days', 'in_dry_spell', 'action']
+
+
+def _column(forecast_df, col):
+    # Missing columns count as NaN, which fails every threshold comparison
+    if col in forecast_df:
+        return forecast_df[col].to_numpy(dtype=float)
+    return np.full(len(forecast_df), np.nan)
+
+def evaporation_stress_mask(forecast_df):
+    """Boolean array: hot, dry and windy days (temp_celsius, humidity_percent, wind_speed_ms)."""
     return (
-        day["temp_celsius"] > 30 and
-        day["humidity_percent"] < 40 and
-        day["wind_speed_ms"] > 3
+        (_column(forecast_df, "temp_celsius") > HIGH_EVAP_TEMP_C)
+        & (_column(forecast_df, "humidity_percent") < HIGH_EVAP_HUMIDITY_PCT)
+        & (_column(forecast_df, "wind_speed_ms") > HIGH_EVAP_WIND_MS)
     )
 
+def _run_lengths(mask, new_group):
+    """Length of the run of True values ending at each position; runs restart where new_group is True."""
+    idx = np.arange(len(mask))
+    resets = np.where(~mask, idx, np.where(new_group, idx - 1, -1))
+    return idx - np.maximum.accumulate(resets)
+
+def get_irrigation_schedule(forecast_df, soil_type_str, group_col=None):
+    """
+    Builds a per-day irrigation schedule for the whole forecast in one
+    vectorised pass (linear in the number of days).
+
+    A day is in a dry spell when it belongs to a run of at least
+    DRY_SPELL_DAYS consecutive low-rain, high-evaporation days. With
+    group_col (e.g. a farm id), the frame must be sorted by group then date
+    and runs never span two groups.
+
+    Returns:
+        pd.DataFrame: The input columns plus low_rain, high_evaporation,
+        dry_run_days (length of the current run so far), in_dry_spell and
+        action ("irrigate", "monitor" or "none").
+    """
+    schedule = forecast_df.reset_index(drop=True).copy()
+    n = len(schedule)
+    retention = SOIL_WATER_RETENTION.get(soil_type_str, "Medium")
+
+    low_rain = _column(schedule, "precipitation_sum") < LOW_RAIN_THRESHOLD
+    high_evap = evaporation_stress_mask(schedule)
+    dry = low_rain & high_evap
+
+    if group_col and n:
+        groups = schedule[group_col].to_numpy()
+        new_group = np.r_[True, groups[1:] != groups[:-1]]
+        group_end = np.r_[groups[1:] != groups[:-1], True]
+    else:
+        new_group = np.arange(n) == 0
+        group_end = np.arange(n) == n - 1
+
+    run_so_far = _run_lengths(dry, new_group)
+    run_to_come = _run_lengths(dry[::-1], group_end[::-1])[::-1]
+    in_spell = dry & (run_so_far + run_to_come - 1 >= DRY_SPELL_DAYS)
+
+    schedule['low_rain'] = low_rain
+    schedule['high_evaporation'] = high_evap
+    schedule['dry_run_days'] = run_so_far
+    schedule['in_dry_spell'] = in_spell
+    schedule['action'] = np.where(in_spell, DRY_SPELL_ACTION[retention], "none")
+    return schedule
+
 def get_irrigation_advice(forecast_df, soil_type_str):
     retention = SOIL_WATER_RETENTION.get(soil_type_str, "Medium")
-    DRY_SPELL_DAYS = 3
-    LOW_RAIN_THRESHOLD = 1.0
 
     if forecast_df.empty or len(forecast_df) < DRY_SPELL_DAYS:
         return ["Not enough forecast data to provide advice."]
 
-    dry_spell_found = False
-    for i in range(len(forecast_df) - DRY_SPELL_DAYS + 1):
-        window = forecast_df.iloc[i:i + DRY_SPELL_DAYS]
-        is_low_rain = (window['precipitation_sum'] < LOW_RAIN_THRESHOLD).all()
-        is_high_evap = all(is_high_evaporation_day(day) for _, day in window.iterrows())
-
-        if is_low_rain and is_high_evap:
-            dry_spell_found = True
-            break
+    dry_spell_found = get_irrigation_schedule(forecast_df, soil_type_str)['in_dry_spell'].any()
 
     if dry_spell_found:
         if retention == "Low":
@@ -0,0 +1,191 @@
+# src/analysis/irrigation_planner.py
+"""
+Headless batch irrigation planner: reads a farm list, fetches weather and
+soil once per grid cell, and writes one irrigation plan per farm.
+
+Usage:
+    python -m src.analysis.irrigation_planner farms.csv --output plans.parquet
+    python -m src.analysis.irrigation_planner farms.parquet --output plans.csv --offline-soil
+
+The farm list needs lat and lon columns; any other columns (e.g. farm_id,
+phone) are carried through to the output.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import requests
+
+from src.analysis.irrigation import deduce_soil_types, get_irrigation_advice, get_irrigation_schedule
+from src.data_ingestion import soil_cache
+from src.data_ingestion.batch_soil_ingestion import get_smart_soil_data_batch, valid_coordinates
+from src.data_ingestion.weather_ingestion import get_weatherapi_forecast
+
+WEATHER_CELL_DEG = 0.1           # Forecast resolution (~11 km); farms in one cell share a forecast
+FORECAST_DAYS = 5
+DEFAULT_MAX_WORKERS = 16
+WEATHER_ERROR_ADVICE = "Could not fetch weather data for this location."
+INVALID_LOCATION_ADVICE = "Farm location is missing or invalid; check its latitude and longitude."
+
+
+# --- INPUT / OUTPUT ---
+def load_farms(path, lat_col='lat', lon_col='lon'):
+    """
+    Reads a farm list from CSV or Parquet and checks the coordinate columns.
+    Blank or non-numeric coordinates become NaN; plan_irrigation() gives
+    those farms INVALID_LOCATION_ADVICE instead of failing the run.
+    """
+    if path.endswith('.parquet'):
+        farms = pd.read_parquet(path)
+    else:
+        farms = pd.read_csv(path)
+    missing = [col for col in (lat_col, lon_col) if col not in farms.columns]
+    if missing:
+        raise ValueError(f"Farm list '{path}' is missing column(s): {missing}")
+    farms = farms.rename(columns={lat_col: 'lat', lon_col: 'lon'})
+    for col in ('lat', 'lon'):
+        farms[col] = pd.to_numeric(farms[col], errors='coerce')
+    return farms
+
+def write_plans(plans, path):
+    """Writes the plans as Parquet or CSV, chosen by file extension."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith('.parquet'):
+        plans.to_parquet(path, index=False)
+    else:
+        plans.to_csv(path, index=False)
+
+
+# --- WEATHER ---
+def _snap(values, cell_deg):
+    return np.round(np.round(values / cell_deg) * cell_deg, 6)
+
+def fetch_cell_forecasts(cells, api_key, days=FORECAST_DAYS, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Fetches one forecast per (cell_lat, cell_lon) on a thread pool. Returns
+    {cell: forecast_df}; cells whose request failed or whose response could
+    not be parsed map to an empty frame.
+    """
+    def fetch(cell):
+        try:
+            return cell, get_weatherapi_forecast(*cell, api_key, days=days)
+        except requests.exceptions.RequestException as e:
+            print(f"  -> Weather fetch failed for cell {cell}: {e}")
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            # A malformed or partial body should cost this cell its forecast, not the whole run
+            print(f"  -> Weather response for cell {cell} could not be parsed: {e!r}")
+        return cell, pd.DataFrame()
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather-batch") as pool:
+        return dict(pool.map(fetch, cells))
+
+
+# --- PLANNING ---
+def plan_irrigation(farms, api_key, days=FORECAST_DAYS, max_workers=DEFAULT_MAX_WORKERS,
+                    weather_cell_deg=WEATHER_CELL_DEG, soil_cell_deg=soil_cache.SOIL_CACHE_CELL_DEG,
+                    use_remote_tiers=True):
+    """
+    Builds irrigation plans for every farm in the frame.
+
+    Soil is resolved once per soil-cache cell and weather once per weather
+    cell (both fetched concurrently). Farms that share a weather cell and a
+    soil type get identical advice, so advice and the daily schedule are
+    computed once per (weather cell, soil type) pair and joined back.
+
+    Returns:
+        pd.DataFrame: The farm columns plus soil_type, soil_tier,
+        weather_cell_lat/lon, dry_spell, next_action, next_action_date and
+        advice (the recommendation lines joined with spaces). Farms with a
+        missing or out-of-range coordinate get INVALID_LOCATION_ADVICE.
+    """
+    start = time.perf_counter()
+    farms = farms.reset_index(drop=True)
+    lats = pd.to_numeric(farms['lat'], errors='coerce').to_numpy(dtype=float)
+    lons = pd.to_numeric(farms['lon'], errors='coerce').to_numpy(dtype=float)
+    valid = valid_coordinates(lats, lons)
+    if not valid.all():
+        print(f"⚠️ {int((~valid).sum())} farm(s) have a missing or invalid location and get no plan.")
+
+    soil = get_smart_soil_data_batch(np.column_stack([lats, lons]), max_workers=max_workers,
+                                     cell_deg=soil_cell_deg, use_remote_tiers=use_remote_tiers)
+    plans = farms.copy()
+    plans['soil_type'] = np.where(valid, deduce_soil_types(soil), None)
+    plans['soil_tier'] = soil['tier'].to_numpy()
+    plans['weather_cell_lat'] = _snap(np.where(valid, lats, np.nan), weather_cell_deg)
+    plans['weather_cell_lon'] = _snap(np.where(valid, lons, np.nan), weather_cell_deg)
+
+    located = plans[valid]
+    cells = list(located[['weather_cell_lat', 'weather_cell_lon']].drop_duplicates().itertuples(index=False, name=None))
+    forecasts = fetch_cell_forecasts(cells, api_key, days=days, max_workers=max_workers)
+
+    # One advice per (weather cell, soil type); one vectorised schedule pass per soil type
+    pairs = located[['weather_cell_lat', 'weather_cell_lon', 'soil_type']].drop_duplicates()
+    advice_rows = []
+    for soil_type, group in pairs.groupby('soil_type'):
+        frames = []
+        for pair_id, cell in enumerate(group[['weather_cell_lat', 'weather_cell_lon']].itertuples(index=False, name=None)):
+            forecast = forecasts.get(cell, pd.DataFrame())
+            if forecast.empty:
+                advice_rows.append((*cell, soil_type, WEATHER_ERROR_ADVICE, False, "none", pd.NaT))
+                continue
+            # Plain text for SMS/IVR delivery: drop the markdown emphasis used on the page
+            advice = " ".join(get_irrigation_advice(forecast, soil_type)).replace("**", "")
+            frames.append(forecast.assign(pair_id=pair_id, weather_cell_lat=cell[0], weather_cell_lon=cell[1],
+                                          advice=advice))
+        if not frames:
+            continue
+        schedule = get_irrigation_schedule(pd.concat(frames, ignore_index=True), soil_type, group_col='pair_id')
+        for _, days_df in schedule.groupby('pair_id', sort=False):
+            cell_lat, cell_lon, advice = days_df[['weather_cell_lat', 'weather_cell_lon', 'advice']].iloc[0]
+            actions = days_df[days_df['action'] != "none"]
+            advice_rows.append((
+                cell_lat, cell_lon, soil_type, advice, bool(days_df['in_dry_spell'].any()),
+                actions['action'].iloc[0] if not actions.empty else "none",
+                actions['Date'].iloc[0] if not actions.empty else pd.NaT,
+            ))
+
+    advice_table = pd.DataFrame(advice_rows, columns=['weather_cell_lat', 'weather_cell_lon', 'soil_type', 'advice',
+                                                      'dry_spell', 'next_action', 'next_action_date'])
+    # Keep the key dtypes when there are no rows (an empty farm list), so the merge still lines up
+    advice_table = advice_table.astype({'weather_cell_lat': float, 'weather_cell_lon': float,
+                                        'soil_type': plans['soil_type'].dtype})
+    plans = plans.merge(advice_table, on=['weather_cell_lat', 'weather_cell_lon', 'soil_type'], how='left')
+    plans.loc[~valid, ['advice', 'dry_spell', 'next_action']] = [INVALID_LOCATION_ADVICE, False, "none"]
+
+    elapsed = time.perf_counter() - start
+    print(f"--- Irrigation plans: {len(plans)} farms, {len(cells)} weather cells, "
+          f"{len(pairs)} cell/soil pairs in {elapsed:.2f}s ---")
+    return plans
+
+
+# --- CLI ---
+def main(argv=None):
+    from src.config import WEATHERAPI
+
+    parser = argparse.ArgumentParser(description="Batch irrigation planner for many farms.")
+    parser.add_argument("farms", help="Farm list (.csv or .parquet) with lat/lon columns.")
+    parser.add_argument("--output", default="irrigation_plans.csv", help="Output file (.csv or .parquet).")
+    parser.add_argument("--lat-col", default="lat")
+    parser.add_argument("--lon-col", default="lon")
+    parser.add_argument("--days", type=int, default=FORECAST_DAYS)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--weather-cell-deg", type=float, default=WEATHER_CELL_DEG)
+    parser.add_argument("--offline-soil", action="store_true",
+                        help="Use only the offline district/state soil tiers.")
+    args = parser.parse_args(argv)
+
+    farms = load_farms(args.farms, args.lat_col, args.lon_col)
+    plans = plan_irrigation(farms, WEATHERAPI, days=args.days, max_workers=args.workers,
+                            weather_cell_deg=args.weather_cell_deg, use_remote_tiers=not args.offline_soil)
+    write_plans(plans, args.output)
+    print(f"--- Wrote {len(plans)} plans to {args.output} ---")
+
+
+if __name__ == '__main__':
+    main()
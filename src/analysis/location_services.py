@@ -3,6 +3,8 @@ import requests
 import pandas as pd
 from datetime import datetime, timedelta
 
+from src.data_ingestion.api_providers import fetch_json
+
 @st.cache_data(ttl=86400) # Cache geocoding results for a day
 def geocode_location(location_name: str):
     """
@@ -12,9 +14,7 @@ def geocode_location(location_name: str):
     try:
         url = "https://geocoding-api.open-meteo.com/v1/search"
         params = {"name": location_name, "count": 1, "language": "en", "format": "json"}
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(url, params=params, timeout=10)
         if "results" in data and len(data["results"]) > 0:
             result = data["results"][0]
             return result.get("latitude"), result.get("longitude")
@@ -40,9 +40,7 @@ def get_historical_average_rainfall(lat: float, lon: float, years: int = 5):
             "end_date": end_date.strftime('%Y-%m-%d'),
             "daily": "precipitation_sum"
         }
-        response = requests.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(url, params=params, timeout=15)
         
         df = pd.DataFrame(data['daily'])
         df['time'] = pd.to_datetime(df['time'])
@@ -0,0 +1,123 @@
+# src/analysis/profit_risk.py
+"""
+Monte Carlo profit risk for one or many plantings.
+
+Each sample draws:
+  * a rainfall scenario (deficit / normal / excess), which changes the
+    annual_rainfall fed to the yield model,
+  * one tree of the RandomForest, so yield uncertainty follows the spread
+    of the per-tree predictions,
+  * a market price shock (mean-preserving lognormal, per-crop volatility).
+
+The model is called once for all plantings x scenarios; sampling and profit
+are pure NumPy indexing, so 10k+ samples per planting stay fast.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.analysis import economics
+from src.ml import yield_predictor
+
+DEFAULT_SAMPLES = 10000
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DOWNSIDE_LEVEL = 0.05            # Tail used for value-at-risk / expected shortfall
+
+# Annual price volatility (std. dev. of log price); rough figures for mandi price swings
+PRICE_VOLATILITY = {
+    'Rice': 0.10, 'Wheat': 0.10, 'Maize': 0.18, 'Jowar': 0.20,
+    'Sugarcane': 0.05, 'Masoor': 0.22,
+}
+DEFAULT_PRICE_VOLATILITY = 0.20
+
+# Rainfall scenarios: name -> (multiplier on the expected annual rainfall, probability)
+RAINFALL_SCENARIOS = {
+    "deficit": (0.75, 0.2),
+    "normal": (1.0, 0.6),
+    "excess": (1.25, 0.2),
+}
+
+
+# --- SCENARIO YIELDS ---
+def scenario_tree_yields(plantings, model_payload, rainfall_scenarios=RAINFALL_SCENARIOS):
+    """
+    Per-tree yield predictions for every planting under every rainfall
+    scenario, from one batched model call. Returns an array shaped
+    (plantings, scenarios, trees).
+    """
+    multipliers = np.array([m for m, _ in rainfall_scenarios.values()], dtype=float)
+    n_plantings, n_scenarios = len(plantings), len(multipliers)
+
+    expanded = plantings.loc[plantings.index.repeat(n_scenarios)].reset_index(drop=True)
+    expanded['annual_rainfall'] = expanded['annual_rainfall'].to_numpy(dtype=float) * np.tile(multipliers, n_plantings)
+    per_tree = yield_predictor.predict_batch_per_tree(expanded, model_payload)
+    return per_tree.reshape(n_plantings, n_scenarios, -1)
+
+
+# --- SIMULATION ---
+def simulate_profit(plantings, model_payload, n_samples=DEFAULT_SAMPLES, rainfall_scenarios=RAINFALL_SCENARIOS,
+                    price_volatility=None, recommendation_mask=None, seed=None):
+    """
+    Samples the per-hectare profit distribution of each planting.
+
+    Args:
+        plantings (pd.DataFrame): Model input rows (crop, season, area,
+            annual_rainfall and soil columns), one per planting.
+        recommendation_mask: Fertilizer mask as in economics.compute_profitability;
+            defaults to the mask derived from each row's soil columns.
+        price_volatility (dict): Overrides PRICE_VOLATILITY per crop.
+        seed: Seed for reproducible samples.
+    Returns:
+        np.ndarray: Profit samples (INR/hectare), shape (plantings, n_samples).
+    """
+    rng = np.random.default_rng(seed)
+    plantings = plantings.reset_index(drop=True)
+    n_plantings = len(plantings)
+
+    yields = scenario_tree_yields(plantings, model_payload, rainfall_scenarios)      # (P, S, T)
+    _, n_scenarios, n_trees = yields.shape
+
+    if recommendation_mask is None:
+        recommendation_mask = economics.soil_recommendation_mask(plantings)
+    base = economics.compute_profitability(plantings['crop'], np.zeros(n_plantings),
+                                           recommendation_mask=recommendation_mask)
+    volatility = {**PRICE_VOLATILITY, **(price_volatility or {})}
+    sigma = plantings['crop'].map(volatility).fillna(DEFAULT_PRICE_VOLATILITY).to_numpy(dtype=float)
+
+    probabilities = np.array([p for _, p in rainfall_scenarios.values()], dtype=float)
+    scenario = rng.choice(n_scenarios, size=(n_plantings, n_samples), p=probabilities / probabilities.sum())
+    tree = rng.integers(n_trees, size=(n_plantings, n_samples))
+    sampled_yield = yields[np.arange(n_plantings)[:, None], scenario, tree]
+
+    # Mean-preserving lognormal price shock
+    shock = np.exp(sigma[:, None] * rng.standard_normal((n_plantings, n_samples)) - sigma[:, None] ** 2 / 2)
+    price = base['market_price'].to_numpy()[:, None] * shock
+    return sampled_yield * price - base['input_cost'].to_numpy()[:, None]
+
+
+def summarize_profit_distribution(profits, quantiles=DEFAULT_QUANTILES, downside_level=DOWNSIDE_LEVEL):
+    """
+    Summary statistics per row of a (plantings, samples) profit array:
+    mean, std, the requested quantiles (p5, p25, ...), probability of a loss,
+    and the expected shortfall (mean profit in the worst downside_level tail).
+    """
+    profits = np.atleast_2d(profits)
+    summary = pd.DataFrame({
+        'mean_profit': profits.mean(axis=1),
+        'std_profit': profits.std(axis=1),
+    })
+    for q, values in zip(quantiles, np.quantile(profits, quantiles, axis=1)):
+        summary[f"p{round(q * 100):g}"] = values
+    summary['prob_loss'] = (profits < 0).mean(axis=1)
+
+    cutoff = np.quantile(profits, downside_level, axis=1)[:, None]
+    tail = np.where(profits <= cutoff, profits, np.nan)
+    summary['expected_shortfall'] = np.nanmean(tail, axis=1)
+    return summary
+
+
+def profit_risk_report(plantings, model_payload, n_samples=DEFAULT_SAMPLES, seed=None, **kwargs):
+    """Runs simulate_profit() and returns the plantings joined with their risk summary (per hectare)."""
+    profits = simulate_profit(plantings, model_payload, n_samples=n_samples, seed=seed, **kwargs)
+    summary = summarize_profit_distribution(profits)
+    return pd.concat([plantings.reset_index(drop=True)[['crop', 'season']], summary], axis=1)
@@ -0,0 +1,238 @@
+# src/analysis/risk_rules.py
+
+import json
+import os
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Rule bounds refer to these forecast columns
+RULE_VARIABLES = {
+    "temp": "temperature_2m_max",
+    "humidity": "relative_humidity_2m_mean",
+    "rain": "precipitation_sum",
+}
+
+RISK_WINDOW_COLUMNS = ['rule_id', 'start', 'end']
+RISK_RULES_ENV = "AGRI_RISK_RULES"   # Optional JSON rule file (see load_risk_rules) that replaces DEFAULT_RISK_RULES
+
+
+# --- RULE DEFINITION ---
+@dataclass(frozen=True)
+class RiskRule:
+    """
+    A pest/disease risk rule: every bound must hold (strictly) on each of
+    min_run_days consecutive days. Bounds left as None are not checked.
+    """
+    rule_id: str
+    name: str
+    min_run_days: int
+    temp_min: float = None        # temperature_2m_max > temp_min
+    temp_max: float = None        # temperature_2m_max < temp_max
+    humidity_min: float = None    # relative_humidity_2m_mean > humidity_min
+    humidity_max: float = None
+    rain_min: float = None        # precipitation_sum > rain_min
+    rain_max: float = None
+    crops: tuple = ()             # Crops the rule applies to; empty means all crops
+
+
+# Indicative thresholds from common extension guidance; tune per region as data allows.
+DEFAULT_RISK_RULES = (
+    RiskRule("fungal_common_rust", "Fungal Disease (e.g., Common Rust)", 3,
+             temp_min=26, humidity_min=80, crops=("Maize",)),
+    RiskRule("rice_blast", "Rice Blast", 3,
+             temp_min=24, temp_max=30, humidity_min=90, crops=("Rice",)),
+    RiskRule("rice_sheath_blight", "Rice Sheath Blight", 3,
+             temp_min=28, temp_max=34, humidity_min=85, crops=("Rice",)),
+    RiskRule("rice_bacterial_leaf_blight", "Bacterial Leaf Blight", 2,
+             temp_min=25, temp_max=34, humidity_min=70, rain_min=5, crops=("Rice",)),
+    RiskRule("brown_planthopper", "Brown Planthopper", 4,
+             temp_min=25, temp_max=30, humidity_min=80, crops=("Rice",)),
+    RiskRule("yellow_stem_borer", "Yellow Stem Borer", 5,
+             temp_min=26, temp_max=32, humidity_min=70, crops=("Rice",)),
+    RiskRule("fall_armyworm", "Fall Armyworm", 3,
+             temp_min=25, temp_max=35, rain_max=1, crops=("Maize", "Jowar")),
+    RiskRule("powdery_mildew", "Powdery Mildew", 4,
+             temp_min=15, temp_max=28, humidity_min=50, humidity_max=75, rain_max=1,
+             crops=("Wheat", "Masoor")),
+    RiskRule("wheat_rust", "Wheat Rust", 3,
+             temp_min=15, temp_max=25, humidity_min=80, crops=("Wheat",)),
+    RiskRule("aphids", "Aphid Infestation", 3,
+             temp_min=10, temp_max=25, humidity_min=60, humidity_max=85, rain_max=1,
+             crops=("Wheat", "Masoor")),
+    RiskRule("red_rot", "Sugarcane Red Rot", 3,
+             temp_min=27, humidity_min=85, rain_min=2, crops=("Sugarcane",)),
+)
+
+
+def get_risk_rule(rule_id, rules=DEFAULT_RISK_RULES):
+    for rule in rules:
+        if rule.rule_id == rule_id:
+            return rule
+    raise KeyError(f"Unknown risk rule '{rule_id}'.")
+
+def rules_for_crop(crop, rules=DEFAULT_RISK_RULES):
+    """Rules that apply to the given crop (including crop-agnostic rules)."""
+    return tuple(rule for rule in rules if not rule.crops or crop in rule.crops)
+
+def rule_crops(rules=DEFAULT_RISK_RULES):
+    """Every crop named by at least one rule, in first-mentioned order."""
+    return list(dict.fromkeys(crop for rule in rules for crop in rule.crops))
+
+def load_risk_rules(path):
+    """Loads rules from a JSON file containing a list of RiskRule field dicts."""
+    with open(path, 'r') as f:
+        records = json.load(f)
+    known = {field.name for field in fields(RiskRule)}
+    rules = []
+    for record in records:
+        unknown = set(record) - known
+        if unknown:
+            raise ValueError(f"Unknown field(s) {sorted(unknown)} in risk rule {record.get('rule_id')!r}.")
+        rules.append(RiskRule(**{**record, "crops": tuple(record.get("crops", ()))}))
+    return tuple(rules)
+
+def active_risk_rules():
+    """The rules in the file named by AGRI_RISK_RULES if it is set, otherwise DEFAULT_RISK_RULES."""
+    path = os.environ.get(RISK_RULES_ENV)
+    return load_risk_rules(path) if path else DEFAULT_RISK_RULES
+
+
+# --- COMPILATION ---
+@lru_cache(maxsize=32)
+def compile_risk_rules(rules):
+    """
+    Turns a tuple of rules into bound matrices, so all rules are checked
+    together: lower/upper have shape (n_rules, n_variables), with -inf/+inf
+    for unchecked bounds.
+    """
+    variables = list(RULE_VARIABLES)
+    lower = np.full((len(rules), len(variables)), -np.inf)
+    upper = np.full((len(rules), len(variables)), np.inf)
+    for r, rule in enumerate(rules):
+        for v, var in enumerate(variables):
+            low, high = getattr(rule, f"{var}_min"), getattr(rule, f"{var}_max")
+            if low is not None:
+                lower[r, v] = low
+            if high is not None:
+                upper[r, v] = high
+    return {
+        "rule_ids": np.array([rule.rule_id for rule in rules], dtype=object),
+        "run_days": np.array([rule.min_run_days for rule in rules], dtype=int),
+        "columns": [RULE_VARIABLES[var] for var in variables],
+        "lower": lower,
+        "upper": upper,
+    }
+
+
+# --- EVALUATION ---
+def evaluate_risk_rules(forecast_df, rules=DEFAULT_RISK_RULES, group_col=None):
+    """
+    Evaluates every rule against the forecast in one vectorised pass.
+
+    The daily condition for all rules is one (days, rules) boolean matrix;
+    run lengths come from a single cumulative sum over it. Cost is
+    O(days x rules) array work with no per-rule scan in Python. With
+    group_col (e.g. a farm id), the frame must be sorted by group then time
+    and windows never span two groups.
+
+    Returns:
+        pd.DataFrame: One row per qualifying window with columns rule_id,
+        start, end (plus group_col if given).
+    """
+    columns = RISK_WINDOW_COLUMNS + ([group_col] if group_col else [])
+    rules = tuple(rules)
+    if forecast_df.empty or not rules:
+        return pd.DataFrame(columns=columns)
+
+    compiled = compile_risk_rules(rules)
+    n_days = len(forecast_df)
+    # Missing forecast columns count as NaN, which fails any bound placed on them
+    values = np.column_stack([
+        forecast_df[col].to_numpy(dtype=float) if col in forecast_df else np.full(n_days, np.nan)
+        for col in compiled["columns"]
+    ])                                                                       # (days, vars)
+    lower, upper = compiled["lower"], compiled["upper"]
+    above = (values[:, None, :] > lower) | np.isneginf(lower)                # (days, rules, vars)
+    below = (values[:, None, :] < upper) | np.isposinf(upper)
+    daily = (above & below).all(axis=2)                                      # (days, rules)
+
+    # Rolling sum of each rule's mask over its own run length, via one cumsum
+    counts = np.vstack([np.zeros((1, len(rules)), dtype=int), np.cumsum(daily, axis=0)])
+    run_days = compiled["run_days"]
+    end_idx = np.arange(n_days)[:, None]
+    start_idx = end_idx - run_days + 1
+    window_sums = counts[end_idx + 1, np.arange(len(rules))] - counts[np.clip(start_idx, 0, None), np.arange(len(rules))]
+    hits = (start_idx >= 0) & (window_sums == run_days)
+
+    # Order by series position, then by rule registry order
+    ends, rule_pos = np.nonzero(hits)
+    starts = ends - run_days[rule_pos] + 1
+    order = np.lexsort((rule_pos, starts))
+    starts, ends, rule_pos = starts[order], ends[order], rule_pos[order]
+
+    if group_col:
+        groups = forecast_df[group_col].to_numpy()
+        same_group = groups[starts] == groups[ends]
+        starts, ends, rule_pos = starts[same_group], ends[same_group], rule_pos[same_group]
+
+    times = forecast_df['time'].to_numpy()
+    windows = pd.DataFrame({
+        'rule_id': compiled["rule_ids"][rule_pos],
+        'start': times[starts],
+        'end': times[ends],
+    })
+    if group_col:
+        windows[group_col] = groups[starts]
+    return windows[columns]
+
+
+# --- TYPED INTERVALS & CONSOLIDATION ---
+@dataclass(frozen=True)
+class RiskInterval:
+    """A period (inclusive calendar dates) during which a rule's conditions hold."""
+    rule_id: str
+    start: date
+    end: date
+    group: object = None          # e.g. a farm id when several farms are evaluated together
+
+    @property
+    def days(self):
+        return (self.end - self.start).days + 1
+
+
+def windows_to_intervals(windows_df, group_col=None):
+    """Converts the windows frame from evaluate_risk_rules() into RiskInterval objects."""
+    starts = pd.to_datetime(windows_df['start']).dt.date
+    ends = pd.to_datetime(windows_df['end']).dt.date
+    groups = windows_df[group_col] if group_col else [None] * len(windows_df)
+    return [
+        RiskInterval(rule_id, start, end, group)
+        for rule_id, start, end, group in zip(windows_df['rule_id'], starts, ends, groups)
+    ]
+
+
+def merge_risk_intervals(intervals, max_gap_days=1):
+    """
+    Merges overlapping or adjacent intervals of the same rule (and group).
+    Intervals whose start is at most max_gap_days after the previous end are
+    joined, so back-to-back windows become one continuous period. Runs in
+    O(n log n) and compares full dates, so periods crossing a year boundary
+    merge correctly.
+    """
+    ordered = sorted(intervals, key=lambda i: (str(i.group), i.rule_id, i.start, i.end))
+    merged = []
+    gap = timedelta(days=max_gap_days)
+    for interval in ordered:
+        last = merged[-1] if merged else None
+        if (last is not None and last.rule_id == interval.rule_id and last.group == interval.group
+                and interval.start <= last.end + gap):
+            if interval.end > last.end:
+                merged[-1] = RiskInterval(last.rule_id, last.start, interval.end, last.group)
+        else:
+            merged.append(interval)
+    # Present chronologically
+    return sorted(merged, key=lambda i: (i.start, i.rule_id))
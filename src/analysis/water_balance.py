@@ -0,0 +1,210 @@
+# src/analysis/water_balance.py
+"""
+Daily root-zone soil water balance following FAO Irrigation and Drainage
+Paper 56: Penman-Monteith reference evapotranspiration (ET0), single crop
+coefficients (Kc) and root-zone depletion with water-stress reduction (Ks).
+
+Every function works on NumPy arrays shaped (farms, days) (or anything that
+broadcasts to it), so a whole district's season is simulated with one array
+operation per day.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.irrigation import deduce_soil_types
+
+# --- CONSTANTS ---
+STEFAN_BOLTZMANN = 4.903e-9      # MJ K-4 m-2 day-1
+SOLAR_CONSTANT = 0.0820          # MJ m-2 min-1
+KRS_INTERIOR = 0.16              # Hargreaves radiation coefficient, interior locations
+KRS_COASTAL = 0.19               # ... coastal locations
+
+# Volumetric water content at field capacity and wilting point (m3/m3), FAO-56 Table 19
+SOIL_HYDRAULICS = {
+    "Sandy": {"field_capacity": 0.12, "wilting_point": 0.05},
+    "Loamy": {"field_capacity": 0.25, "wilting_point": 0.12},
+    "Alluvium": {"field_capacity": 0.28, "wilting_point": 0.13},
+    "Clay": {"field_capacity": 0.36, "wilting_point": 0.22},
+}
+
+# Kc (initial, mid, end), stage lengths in days (initial, development, mid, late),
+# maximum root depth (m) and depletion fraction p, FAO-56 Tables 11, 12 and 22
+CROP_PARAMETERS = {
+    "Rice": {"kc": (1.05, 1.20, 0.90), "stages": (30, 30, 60, 30), "root_depth_m": 0.5, "p": 0.20},
+    "Maize": {"kc": (0.30, 1.20, 0.60), "stages": (30, 40, 50, 30), "root_depth_m": 1.0, "p": 0.55},
+    "Jowar": {"kc": (0.30, 1.00, 0.55), "stages": (20, 35, 40, 30), "root_depth_m": 1.0, "p": 0.55},
+    "Wheat": {"kc": (0.30, 1.15, 0.25), "stages": (20, 25, 60, 30), "root_depth_m": 1.0, "p": 0.55},
+    "Sugarcane": {"kc": (0.40, 1.25, 0.75), "stages": (35, 60, 190, 120), "root_depth_m": 1.2, "p": 0.65},
+    "Masoor": {"kc": (0.40, 1.10, 0.30), "stages": (20, 30, 60, 40), "root_depth_m": 0.6, "p": 0.50},
+}
+DEFAULT_CROP = "Maize"
+
+
+# --- REFERENCE EVAPOTRANSPIRATION ---
+def _saturation_vapour_pressure(temp_c):
+    return 0.6108 * np.exp(17.27 * temp_c / (temp_c + 237.3))
+
+def extraterrestrial_radiation(lat_deg, day_of_year):
+    """Daily extraterrestrial radiation Ra (MJ m-2 day-1), FAO-56 Eq. 21."""
+    phi = np.radians(lat_deg)
+    angle = 2 * np.pi * np.asarray(day_of_year) / 365
+    inverse_distance = 1 + 0.033 * np.cos(angle)
+    declination = 0.409 * np.sin(angle - 1.39)
+    sunset_angle = np.arccos(np.clip(-np.tan(phi) * np.tan(declination), -1, 1))
+    return (24 * 60 / np.pi) * SOLAR_CONSTANT * inverse_distance * (
+        sunset_angle * np.sin(phi) * np.sin(declination)
+        + np.cos(phi) * np.cos(declination) * np.sin(sunset_angle)
+    )
+
+def wind_speed_at_2m(wind_speed_ms, height_m=10.0):
+    """Converts wind speed measured at height_m to the 2 m reference height, FAO-56 Eq. 47."""
+    return wind_speed_ms * 4.87 / np.log(67.8 * height_m - 5.42)
+
+def reference_et0(temp_max, temp_min, humidity_mean, wind_2m, lat_deg, day_of_year,
+                  elevation_m=0.0, solar_radiation=None, krs=KRS_INTERIOR):
+    """
+    FAO-56 Penman-Monteith reference evapotranspiration (mm/day), Eq. 6.
+
+    Args:
+        temp_max, temp_min: Daily air temperature extremes (°C).
+        humidity_mean: Mean relative humidity (%).
+        wind_2m: Wind speed at 2 m (m/s).
+        lat_deg, day_of_year: Location and date, for extraterrestrial radiation.
+        elevation_m: Site elevation, for atmospheric pressure.
+        solar_radiation: Measured shortwave radiation (MJ m-2 day-1). When
+            None or NaN, it is estimated from the temperature range
+            (Hargreaves, Eq. 50) with coefficient krs.
+    All inputs broadcast against each other, e.g. (farms, 1) coordinates
+    with (farms, days) weather.
+    """
+    temp_max, temp_min = np.asarray(temp_max, dtype=float), np.asarray(temp_min, dtype=float)
+    temp_mean = (temp_max + temp_min) / 2
+
+    pressure = 101.3 * ((293 - 0.0065 * elevation_m) / 293) ** 5.26
+    psychrometric = 0.000665 * pressure
+    es = (_saturation_vapour_pressure(temp_max) + _saturation_vapour_pressure(temp_min)) / 2
+    ea = np.asarray(humidity_mean, dtype=float) / 100 * es
+    slope = 4098 * _saturation_vapour_pressure(temp_mean) / (temp_mean + 237.3) ** 2
+
+    ra = extraterrestrial_radiation(lat_deg, day_of_year)
+    rs_estimate = krs * np.sqrt(np.clip(temp_max - temp_min, 0, None)) * ra
+    if solar_radiation is None:
+        rs = rs_estimate
+    else:
+        solar_radiation = np.asarray(solar_radiation, dtype=float)
+        rs = np.where(np.isnan(solar_radiation), rs_estimate, solar_radiation)
+    rso = (0.75 + 2e-5 * elevation_m) * ra
+
+    net_shortwave = 0.77 * rs
+    net_longwave = (STEFAN_BOLTZMANN * ((temp_max + 273.16) ** 4 + (temp_min + 273.16) ** 4) / 2
+                    * (0.34 - 0.14 * np.sqrt(ea))
+                    * (1.35 * np.clip(rs / rso, 0, 1) - 0.35))
+    net_radiation = net_shortwave - net_longwave      # Soil heat flux G ~ 0 for daily steps
+
+    et0 = ((0.408 * slope * net_radiation + psychrometric * 900 / (temp_mean + 273) * wind_2m * (es - ea))
+           / (slope + psychrometric * (1 + 0.34 * wind_2m)))
+    return np.clip(et0, 0, None)
+
+def et0_from_open_meteo(daily_df, lat_deg, elevation_m=0.0):
+    """
+    ET0 for an Open-Meteo daily frame (time, temperature_2m_max/min,
+    relative_humidity_2m_mean, wind_speed_10m_max in km/h and, optionally,
+    shortwave_radiation_sum).
+    """
+    doy = pd.to_datetime(daily_df['time']).dt.dayofyear.to_numpy()
+    radiation = daily_df['shortwave_radiation_sum'].to_numpy(dtype=float) \
+        if 'shortwave_radiation_sum' in daily_df else None
+    return reference_et0(
+        daily_df['temperature_2m_max'].to_numpy(dtype=float),
+        daily_df['temperature_2m_min'].to_numpy(dtype=float),
+        daily_df['relative_humidity_2m_mean'].to_numpy(dtype=float),
+        wind_speed_at_2m(daily_df['wind_speed_10m_max'].to_numpy(dtype=float) / 3.6),
+        lat_deg, doy, elevation_m=elevation_m, solar_radiation=radiation,
+    )
+
+
+# --- CROP AND SOIL PARAMETERS ---
+def crop_coefficient(crop, days_after_sowing):
+    """Kc for each day after sowing (array), interpolated between the FAO-56 stage values."""
+    params = CROP_PARAMETERS.get(crop, CROP_PARAMETERS[DEFAULT_CROP])
+    kc_ini, kc_mid, kc_end = params["kc"]
+    initial, development, mid, late = params["stages"]
+    stage_ends = np.cumsum([initial, development, mid, late])
+    # Flat initial stage, linear rise, flat mid-season, linear decline, then hold
+    return np.interp(
+        np.asarray(days_after_sowing, dtype=float),
+        [0, stage_ends[0], stage_ends[1], stage_ends[2], stage_ends[3]],
+        [kc_ini, kc_ini, kc_mid, kc_mid, kc_end],
+    )
+
+def soil_water_capacity(soil_types, crop):
+    """
+    Total and readily available water (TAW, RAW in mm) in the crop's root
+    zone for an array of soil type names ("Sandy", "Loamy", ...).
+    """
+    params = CROP_PARAMETERS.get(crop, CROP_PARAMETERS[DEFAULT_CROP])
+    soil_types = np.atleast_1d(np.asarray(soil_types, dtype=object))
+    loamy = SOIL_HYDRAULICS["Loamy"]
+    available = np.array([
+        SOIL_HYDRAULICS.get(s, loamy)["field_capacity"] - SOIL_HYDRAULICS.get(s, loamy)["wilting_point"]
+        for s in soil_types
+    ])
+    taw = 1000 * available * params["root_depth_m"]
+    return taw, params["p"] * taw
+
+def soil_water_capacity_from_soil(soil_df, crop):
+    """TAW/RAW for each row of a soil frame from smart_soil_ingestion (single or batch)."""
+    return soil_water_capacity(deduce_soil_types(soil_df), crop)
+
+
+# --- WATER BALANCE ---
+def simulate_water_balance(et0, rain, kc, taw, raw, initial_depletion=None, irrigate=True):
+    """
+    Daily root-zone depletion for many farms at once (FAO-56 Eq. 85).
+
+    Depletion grows with crop evapotranspiration (Kc * Ks * ET0) and
+    shrinks with rain; water beyond field capacity is lost to deep
+    percolation. With irrigate=True, any day that ends with depletion above
+    RAW is followed by an irrigation that refills the root zone.
+
+    Args:
+        et0, rain: (farms, days) arrays in mm/day.
+        kc: Crop coefficient, broadcastable to (farms, days).
+        taw, raw: Per-farm total/readily available water (mm), shape (farms,).
+        initial_depletion: Depletion at the start (mm); defaults to a root
+            zone at field capacity.
+    Returns:
+        dict of (farms, days) arrays: depletion (end of day), etc (actual
+        crop ET), ks, irrigation (net mm applied, recorded on the day it is
+        triggered) and deep_percolation.
+    """
+    et0 = np.atleast_2d(np.asarray(et0, dtype=float))
+    rain = np.nan_to_num(np.broadcast_to(np.asarray(rain, dtype=float), et0.shape))
+    kc = np.broadcast_to(np.asarray(kc, dtype=float), et0.shape)
+    n_farms, n_days = et0.shape
+    taw = np.broadcast_to(np.asarray(taw, dtype=float), (n_farms,))
+    raw = np.broadcast_to(np.asarray(raw, dtype=float), (n_farms,))
+    depletion = np.zeros(n_farms) if initial_depletion is None \
+        else np.broadcast_to(np.asarray(initial_depletion, dtype=float), (n_farms,)).copy()
+
+    result = {name: np.empty((n_farms, n_days))
+              for name in ("depletion", "etc", "ks", "irrigation", "deep_percolation")}
+    stress_range = np.maximum(taw - raw, 1e-9)
+    # Days depend on each other, farms do not: step through days, vectorise over farms
+    for day in range(n_days):
+        ks = np.clip((taw - depletion) / stress_range, 0, 1)
+        etc = ks * kc[:, day] * np.nan_to_num(et0[:, day])
+        balance = depletion - rain[:, day] + etc
+        deep_percolation = np.clip(-balance, 0, None)
+        depletion = np.clip(balance, 0, taw)
+
+        irrigation = np.where(irrigate & (depletion > raw), depletion, 0.0)
+        depletion = depletion - irrigation
+
+        result["depletion"][:, day] = depletion
+        result["etc"][:, day] = etc
+        result["ks"][:, day] = ks
+        result["irrigation"][:, day] = irrigation
+        result["deep_percolation"][:, day] = deep_percolation
+    return result
@@ -1,8 +1,11 @@
 import streamlit as st
 import requests
 import pandas as pd
-from datetime import datetime
-import re
+
+from src.analysis.risk_rules import (
+    DEFAULT_RISK_RULES, evaluate_risk_rules, get_risk_rule, windows_to_intervals, merge_risk_intervals,
+)
+from src.data_ingestion.api_providers import fetch_json
 
 # --- 1. Weather Forecast Data Ingestion ---
 @st.cache_data(ttl=3600) # Cache for 1 hour
@@ -18,9 +21,7 @@ def get_weather_forecast_for_risk(lat, lon, days=7):
         "forecast_days": days
     }
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(base_url, params=params, timeout=10)
         df = pd.DataFrame(data['daily'])
         df['time'] = pd.to_datetime(df['time'])
         return df
@@ -28,67 +29,50 @@ def get_weather_forecast_for_risk(lat, lon, days=7):
         return pd.DataFrame()
 
 # --- 2. The Risk Analysis Engine ---
-def analyze_forecast_for_risk(forecast_df):
+# Rules live in the declarative registry in src/analysis/risk_rules.py and are
+# all evaluated in one pass by risk_rules.evaluate_risk_rules.
+def analyze_forecast_for_risk(forecast_df, rules=DEFAULT_RISK_RULES):
     """
-    Analyzes the forecast DataFrame for predefined risk conditions.
+    Analyzes the forecast DataFrame for the registered risk conditions.
+    Returns a list of RiskInterval objects, one per qualifying window.
     """
-    alerts = []
-    
-    # Rule: Fungal Disease Risk (e.g., Common Rust)
-    # Conditions: High humidity (>80%) and warm temps (>26°C) for 3 consecutive days.
-    FUNGAL_TEMP_THRESHOLD = 26
-    FUNGAL_HUMIDITY_THRESHOLD = 80
-    CONSECUTIVE_DAYS_FOR_FUNGAL = 3
-
-    if forecast_df.empty or len(forecast_df) < CONSECUTIVE_DAYS_FOR_FUNGAL:
-        return alerts
-
-    # Use a rolling window to check for consecutive days meeting the criteria
-    for i in range(len(forecast_df) - CONSECUTIVE_DAYS_FOR_FUNGAL + 1):
-        window = forecast_df.iloc[i:i + CONSECUTIVE_DAYS_FOR_FUNGAL]
-        
-        is_temp_high = (window['temperature_2m_max'] > FUNGAL_TEMP_THRESHOLD).all()
-        is_humidity_high = (window['relative_humidity_2m_mean'] > FUNGAL_HUMIDITY_THRESHOLD).all()
-
-        if is_temp_high and is_humidity_high:
-            start_date = window['time'].iloc[0].strftime('%B %d')
-            end_date = window['time'].iloc[-1].strftime('%B %d')
-            alert_message = (
-                f"High Risk of Fungal Disease (e.g., Common Rust) between {start_date} and {end_date}. "
-                "Conditions are favorable (high temp & humidity). "
-                "Recommend inspecting crops closely."
-            )
-            if alert_message not in alerts:
-                alerts.append(alert_message)
-    return alerts
-
-def consolidate_alerts(alerts):
-    """Consolidates multiple alerts into a single, more readable one."""
-    if not alerts:
+    if forecast_df.empty:
         return []
+    return windows_to_intervals(evaluate_risk_rules(forecast_df, rules))
 
-    pattern = re.compile(r"between (\w+\s\d+) and (\w+\s\d+)")
-    all_dates = []
-
-    for alert in alerts:
-        match = pattern.search(alert)
-        if match:
-            start_str, end_str = match.groups()
-            all_dates.append(datetime.strptime(start_str, "%B %d"))
-            all_dates.append(datetime.strptime(end_str, "%B %d"))
+def consolidate_alerts(intervals):
+    """
+    Consolidates overlapping or back-to-back risk intervals of the same rule
+    into single periods. Works on typed intervals, so it never depends on the
+    display language.
+    """
+    return merge_risk_intervals(intervals)
 
-    if not all_dates:
-        return alerts
+# --- 3. Presentation (render time only) ---
+def _format_date(day, with_year):
+    return day.strftime('%B %d, %Y') if with_year else day.strftime('%B %d')
 
-    min_date = min(all_dates)
-    max_date = max(all_dates)
+def format_risk_alert(interval, t, rules=DEFAULT_RISK_RULES):
+    """Renders one RiskInterval as an alert message in the language of translation dict t."""
+    rule = get_risk_rule(interval.rule_id, rules)
+    rule_name = t.get("risk_rules", {}).get(rule.rule_id, rule.name)
+    with_year = interval.start.year != interval.end.year
+    dates = {"start": _format_date(interval.start, with_year), "end": _format_date(interval.end, with_year)}
 
-    start_date_str = min_date.strftime('%B %d')
-    end_date_str = max_date.strftime('%B %d')
+    if interval.days <= rule.min_run_days:
+        message = t.get(
+            "risk_alert_window",
+            "High Risk of {rule} between {start} and {end}. Conditions are favorable. "
+            "Recommend inspecting crops closely."
+        ).format(rule=rule_name, **dates)
+    else:
+        message = t.get(
+            "risk_alert_prolonged",
+            "High Risk of {rule} from {start} to {end}. Conditions are favorable for a prolonged period. "
+            "Recommend continuous monitoring and proactive spraying if necessary."
+        ).format(rule=rule_name, **dates)
 
-    consolidated_message = (
-        f"High Risk of Fungal Disease from {start_date_str} to {end_date_str}. "
-        "Conditions are favorable for a prolonged period. "
-        "Recommend continuous monitoring and proactive spraying if necessary."
-    )
-    return [consolidated_message]
\ No newline at end of file
+    if rule.crops:
+        crop_names = ", ".join(t.get("crops", {}).get(crop, crop) for crop in rule.crops)
+        message += " " + t.get("risk_alert_crops", "Affected crops: {crops}.").format(crops=crop_names)
+    return message
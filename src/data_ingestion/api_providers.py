@@ -0,0 +1,227 @@
+# src/data_ingestion/api_providers.py
+"""
+Single entry point for every external HTTP API the app calls (Open-Meteo,
+WeatherAPI.com, ISRIC SoilGrids, Bhuvan WFS).
+
+The backend is chosen with the AGRI_API_MODE environment variable (or
+set_api_mode()):
+    live    - call the real services (default)
+    record  - call the real services and save each response as a fixture
+    replay  - never touch the network; serve saved fixtures, or deterministic
+              synthetic responses when no fixture exists
+    standin - send every request to the local stand-in server
+              (python -m src.data_ingestion.standin_server)
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+
+from src.data_ingestion import http_client
+
+API_MODE_ENV = "AGRI_API_MODE"
+FIXTURE_DIR_ENV = "AGRI_FIXTURE_DIR"
+STANDIN_URL_ENV = "AGRI_STANDIN_URL"
+
+API_MODES = ("live", "record", "replay", "standin")
+DEFAULT_FIXTURE_DIR = 'data/fixtures'
+DEFAULT_STANDIN_URL = 'http://127.0.0.1:8765'
+
+# Query parameters that are never written to fixtures or used in fixture keys
+SECRET_PARAMS = {"key"}
+
+# (host, path) -> endpoint name used for fixtures and synthetic responses
+ENDPOINTS = {
+    ("api.open-meteo.com", "/v1/forecast"): "open_meteo_forecast",
+    ("archive-api.open-meteo.com", "/v1/archive"): "open_meteo_archive",
+    ("geocoding-api.open-meteo.com", "/v1/search"): "open_meteo_geocoding",
+    ("api.weatherapi.com", "/v1/forecast.json"): "weatherapi_forecast",
+    ("rest.isric.org", "/soilgrids/v2.0/properties/query"): "isric_soilgrids",
+    ("bhuvan-wfs.nrsc.gov.in", "/bhuvan/wfs"): "bhuvan_wfs",
+}
+
+_mode_override = None
+
+
+# --- MODE SELECTION ---
+def set_api_mode(mode):
+    """Overrides AGRI_API_MODE for this process. Pass None to go back to the environment."""
+    global _mode_override
+    if mode is not None and mode not in API_MODES:
+        raise ValueError(f"Unknown API mode '{mode}'. Expected one of {API_MODES}.")
+    _mode_override = mode
+
+def get_api_mode():
+    mode = _mode_override or os.environ.get(API_MODE_ENV, "live")
+    if mode not in API_MODES:
+        raise ValueError(f"Unknown API mode '{mode}' in {API_MODE_ENV}. Expected one of {API_MODES}.")
+    return mode
+
+def _fixture_dir():
+    return os.environ.get(FIXTURE_DIR_ENV, DEFAULT_FIXTURE_DIR)
+
+
+# --- REQUEST KEYS ---
+def endpoint_for_url(url):
+    """Returns the endpoint name for a known API URL, or None."""
+    parts = urlsplit(url)
+    return ENDPOINTS.get((parts.hostname, parts.path))
+
+def canonical_params(params):
+    """
+    Normalises query parameters (dict of scalars/lists, or parse_qs output)
+    into a sorted dict of string lists, without secrets.
+    """
+    canonical = {}
+    for name, value in (params or {}).items():
+        if name in SECRET_PARAMS:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        canonical[name] = [str(v) for v in values]
+    return dict(sorted(canonical.items()))
+
+def fixture_path(endpoint, params):
+    digest = hashlib.sha1(json.dumps(canonical_params(params)).encode()).hexdigest()[:16]
+    return os.path.join(_fixture_dir(), endpoint, f"{digest}.json")
+
+
+# --- SYNTHETIC RESPONSES ---
+def _param(params, name, default=None):
+    value = canonical_params(params).get(name)
+    return value[0] if value else default
+
+def _rng_for(endpoint, *keys):
+    # Deterministic per endpoint and location, so replays are repeatable
+    seed = hashlib.sha1(repr((endpoint,) + keys).encode()).digest()[:8]
+    return np.random.default_rng(int.from_bytes(seed, 'little'))
+
+def _synthetic_daily(variable, n, rng):
+    generators = {
+        "temperature_2m_max": lambda: rng.normal(31, 3, n),
+        "temperature_2m_min": lambda: rng.normal(23, 2, n),
+        "temperature_2m_mean": lambda: rng.normal(27, 2.5, n),
+        "relative_humidity_2m_mean": lambda: np.clip(rng.normal(75, 12, n), 20, 100),
+        "relative_humidity_2m_max": lambda: np.clip(rng.normal(90, 6, n), 30, 100),
+        "relative_humidity_2m_min": lambda: np.clip(rng.normal(55, 12, n), 10, 100),
+        "precipitation_sum": lambda: np.round(rng.gamma(0.8, 10, n) * (rng.random(n) < 0.5), 1),
+        "wind_speed_10m_max": lambda: np.abs(rng.normal(12, 4, n)),
+        "shortwave_radiation_sum": lambda: np.clip(rng.normal(18, 4, n), 4, 30),
+    }
+    values = generators.get(variable, lambda: np.zeros(n))()
+    return [round(float(v), 1) for v in values]
+
+def synthetic_response(endpoint, params):
+    """Builds a plausible, deterministic response body for a known endpoint."""
+    lat = _param(params, "latitude", _param(params, "lat"))
+    lon = _param(params, "longitude", _param(params, "lon"))
+
+    if endpoint in ("open_meteo_forecast", "open_meteo_archive"):
+        if endpoint == "open_meteo_forecast":
+            start = date.today()
+            n_days = int(_param(params, "forecast_days", 7))
+        else:
+            start = date.fromisoformat(_param(params, "start_date"))
+            n_days = (date.fromisoformat(_param(params, "end_date")) - start).days + 1
+        rng = _rng_for(endpoint, lat, lon, start.isoformat())
+        daily = {"time": [(start + timedelta(days=i)).isoformat() for i in range(n_days)]}
+        for variable in ",".join(canonical_params(params).get("daily", [])).split(","):
+            if variable:
+                daily[variable] = _synthetic_daily(variable, n_days, rng)
+        return {"latitude": float(lat), "longitude": float(lon), "daily": daily}
+
+    if endpoint == "open_meteo_geocoding":
+        name = _param(params, "name", "")
+        rng = _rng_for(endpoint, name.lower())
+        # Place unknown names somewhere inside Odisha
+        return {"results": [{
+            "name": name,
+            "latitude": round(float(rng.uniform(18.5, 22.0)), 4),
+            "longitude": round(float(rng.uniform(82.0, 87.0)), 4),
+        }]}
+
+    if endpoint == "weatherapi_forecast":
+        query = _param(params, "q", "20.46,85.88")
+        n_days = int(_param(params, "days", 5))
+        rng = _rng_for(endpoint, query, date.today().isoformat())
+        temps = _synthetic_daily("temperature_2m_mean", n_days, rng)
+        rain = _synthetic_daily("precipitation_sum", n_days, rng)
+        humidity = _synthetic_daily("relative_humidity_2m_mean", n_days, rng)
+        wind = _synthetic_daily("wind_speed_10m_max", n_days, rng)
+        return {"forecast": {"forecastday": [
+            {
+                "date": (date.today() + timedelta(days=i)).isoformat(),
+                "day": {
+                    "avgtemp_c": temps[i], "maxtemp_c": round(temps[i] + 4, 1), "mintemp_c": round(temps[i] - 4, 1),
+                    "totalprecip_mm": rain[i], "avghumidity": round(humidity[i]), "maxwind_kph": wind[i],
+                },
+            }
+            for i in range(n_days)
+        ]}}
+
+    if endpoint == "isric_soilgrids":
+        rng = _rng_for(endpoint, lat, lon)
+        typical = {"phh2o": 60, "soc": 45, "nitrogen": 7, "cec": 150, "clay": 300, "sand": 400}
+        layers = [
+            {"name": prop, "depths": [{"label": "0-30cm",
+                                       "values": {"mean": round(typical.get(prop, 100) * rng.uniform(0.85, 1.15))}}]}
+            for prop in canonical_params(params).get("property", [])
+        ]
+        return {"type": "Feature", "properties": {"layers": layers}}
+
+    if endpoint == "bhuvan_wfs":
+        rng = _rng_for(endpoint, _param(params, "bbox"))
+        soils = ["Deep red loamy soils", "Moderately deep red loamy soils", "Slightly acidic alluvium-derived soils"]
+        return {"type": "FeatureCollection",
+                "features": [{"type": "Feature", "properties": {"SOIL_DECOR": soils[rng.integers(len(soils))]}}]}
+
+    raise ValueError(f"No synthetic response available for endpoint '{endpoint}'.")
+
+def replay_response(endpoint, params):
+    """Returns the saved fixture for this request (exact match, then the endpoint default), or a synthetic one."""
+    for path in (fixture_path(endpoint, params), os.path.join(_fixture_dir(), endpoint, "default.json")):
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)["response"]
+    return synthetic_response(endpoint, params)
+
+def _record_fixture(endpoint, params, body):
+    path = fixture_path(endpoint, params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"endpoint": endpoint, "params": canonical_params(params), "response": body}, f)
+
+
+# --- THE PROVIDER CALL ---
+def fetch_json(url, params=None, timeout=10, session=None, deadline=None):
+    """
+    Performs a GET against one of the external APIs through the active backend
+    and returns the decoded JSON body. Network calls go through the shared
+    pooled client (retries, circuit breakers; deadline is passed on to
+    http_client.get). Failures surface as the usual
+    requests.exceptions.RequestException subclasses in every mode.
+    """
+    mode = get_api_mode()
+    endpoint = endpoint_for_url(url)
+
+    if mode == "replay":
+        if endpoint is None:
+            raise requests.exceptions.ConnectionError(f"Replay mode has no provider for {url}")
+        return replay_response(endpoint, params)
+
+    if mode == "standin":
+        parts = urlsplit(url)
+        standin = os.environ.get(STANDIN_URL_ENV, DEFAULT_STANDIN_URL).rstrip('/')
+        url = f"{standin}/{parts.hostname}{parts.path}"
+
+    response = http_client.get(url, params=params, timeout=timeout, session=session, deadline=deadline)
+    response.raise_for_status()
+    body = response.json()
+
+    if mode == "record" and endpoint is not None:
+        _record_fixture(endpoint, params, body)
+    return body
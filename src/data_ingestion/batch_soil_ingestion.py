@@ -0,0 +1,122 @@
+# src/data_ingestion/batch_soil_ingestion.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.data_ingestion import soil_cache
+from src.data_ingestion.smart_soil_ingestion import (
+    SOIL_COLUMNS, TIER_INVALID_COORDINATES, resolve_soil_tiers, quiet_progress,
+)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+# --- INPUT HANDLING ---
+def _coerce_coordinates(coords, lat_col='lat', lon_col='lon'):
+    """Accepts a DataFrame with lat/lon columns or an (N, 2) array of (lat, lon) pairs."""
+    if isinstance(coords, pd.DataFrame):
+        missing = [col for col in (lat_col, lon_col) if col not in coords.columns]
+        if missing:
+            raise ValueError(f"Coordinate DataFrame is missing column(s): {missing}")
+        lats = coords[lat_col].to_numpy(dtype=float)
+        lons = coords[lon_col].to_numpy(dtype=float)
+    else:
+        arr = np.asarray(coords, dtype=float)
+        if arr.ndim != 2 or arr.shape[1] != 2:
+            raise ValueError("Coordinates must be an (N, 2) array of (lat, lon) pairs.")
+        lats, lons = arr[:, 0], arr[:, 1]
+    return pd.DataFrame({'lat': lats, 'lon': lons})
+
+def valid_coordinates(lats, lons):
+    """Boolean mask of the points with a finite, in-range latitude and longitude."""
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    with np.errstate(invalid='ignore'):
+        return np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+
+
+# --- BATCH INGESTION ---
+def get_smart_soil_data_batch(coords, max_workers=DEFAULT_MAX_WORKERS, lat_col='lat', lon_col='lon',
+                              use_cache=True, cell_deg=soil_cache.SOIL_CACHE_CELL_DEG, use_remote_tiers=True):
+    """
+    Resolves soil profiles for many coordinates at once.
+
+    Points are deduplicated by soil-cache grid cell, cached cells are served
+    directly, and the remaining cells are resolved through the usual tier
+    chain on a bounded thread pool. All requests share the keep-alive
+    connection pools of src.data_ingestion.http_client.
+
+    Args:
+        coords: DataFrame with lat/lon columns, or an (N, 2) array of (lat, lon).
+        max_workers (int): Maximum number of cells resolved concurrently
+            (in-flight requests are further capped by http_client.MAX_CONCURRENT_REQUESTS).
+        use_remote_tiers (bool): If False, only the offline district/state tiers are used.
+    Returns:
+        pd.DataFrame: One row per input point (in input order) with columns
+        lat, lon, cell_lat, cell_lon, the soil properties and 'tier'. Points
+        with a missing or out-of-range coordinate get NaN soil values and the
+        tier TIER_INVALID_COORDINATES instead of failing the batch.
+    """
+    start = time.perf_counter()
+    points = _coerce_coordinates(coords, lat_col, lon_col)
+    valid = valid_coordinates(points['lat'], points['lon'])
+    points['cell_lat'] = np.round(np.round(points['lat'].where(valid) / cell_deg) * cell_deg, 6)
+    points['cell_lon'] = np.round(np.round(points['lon'].where(valid) / cell_deg) * cell_deg, 6)
+    empty_result = points.reindex(columns=[*points.columns, *SOIL_COLUMNS, 'tier']).astype({'tier': object})
+    if not valid.any():
+        # Nothing to resolve; keep the output columns so callers can still select them
+        empty_result.loc[:, 'tier'] = TIER_INVALID_COORDINATES
+        if len(points):
+            print(f"--- Batch soil ingestion: {len(points)} points, all with invalid coordinates ---")
+        return empty_result
+
+    cells = points.loc[valid, ['cell_lat', 'cell_lon']].drop_duplicates().itertuples(index=False, name=None)
+    records = {}
+    to_fetch = []
+    for cell in cells:
+        cached = soil_cache.get_cached_soil(*cell, cell_deg=cell_deg) if use_cache else None
+        if cached is not None:
+            soil_df, tier = cached
+            records[cell] = {**soil_df.iloc[0].to_dict(), 'tier': tier}
+        else:
+            to_fetch.append(cell)
+
+    def fetch_cell(cell):
+        with quiet_progress():
+            soil_df, tier = resolve_soil_tiers(*cell, use_remote_tiers=use_remote_tiers)
+        if use_cache and not soil_df.empty:
+            soil_cache.put_cached_soil(*cell, soil_df, tier, cell_deg=cell_deg)
+        record = soil_df.iloc[0].to_dict() if not soil_df.empty else {}
+        return cell, {**record, 'tier': tier}
+
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="soil-batch") as pool:
+            for cell, record in pool.map(fetch_cell, to_fetch):
+                records[cell] = record
+
+    cell_table = pd.DataFrame.from_dict(records, orient='index')
+    cell_table.index = pd.MultiIndex.from_tuples(cell_table.index, names=['cell_lat', 'cell_lon'])
+    result = points.join(cell_table, on=['cell_lat', 'cell_lon'])
+    result.loc[~valid, 'tier'] = TIER_INVALID_COORDINATES
+
+    elapsed = time.perf_counter() - start
+    invalid_note = f", {int((~valid).sum())} with invalid coordinates" if not valid.all() else ""
+    print(f"--- Batch soil ingestion: {len(points)} points{invalid_note}, {len(records)} cells "
+          f"({len(records) - len(to_fetch)} cached, {len(to_fetch)} fetched) in {elapsed:.2f}s ---")
+    return result
+
+
+# --- Example Usage ---
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    # 1,000 plots scattered around Cuttack
+    sample = pd.DataFrame({
+        'lat': 20.46 + rng.uniform(-0.05, 0.05, 1000),
+        'lon': 85.88 + rng.uniform(-0.05, 0.05, 1000),
+    })
+    batch_df = get_smart_soil_data_batch(sample, max_workers=16)
+    print(batch_df.head().to_string())
+    print(batch_df['tier'].value_counts().to_string())
@@ -0,0 +1,181 @@
+# src/data_ingestion/crop_dataset.py
+"""
+Columnar cache of the historical crop yield dataset.
+
+data/crop_yield.csv is parsed once into a cleaned, typed Parquet dataset
+partitioned by state (data/cache/crop_yield/<version>/state=<State>/...).
+Each build goes into a new version directory and the CURRENT file, which
+names the version to read, is replaced atomically once it is complete, so
+readers never see a missing or half-written cache. Column names
+are normalised (lower case, underscores), padded strings such as
+"Kharif     " are stripped, and crop/season/state are categorical.
+load_crop_data() reads only the partitions and columns it is asked for; the
+cache is rebuilt automatically when the CSV changes.
+
+Usage:
+    python -m src.data_ingestion.crop_dataset          # (re)build the cache
+"""
+
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.config import CROP_DATA_FILE
+
+CROP_CACHE_DIR = 'data/cache/crop_yield'
+MANIFEST_FILE = '_manifest.json'   # The leading underscore keeps pyarrow from reading it as data
+CURRENT_FILE = 'CURRENT'
+CACHE_FORMAT_VERSION = 1          # Bump when the cleaning rules change
+
+CATEGORICAL_COLUMNS = ['crop', 'season', 'state']
+COLUMN_TYPES = {
+    'crop_year': 'int16',
+    'area': 'float64',
+    'production': 'float64',
+    'annual_rainfall': 'float64',
+    'fertilizer': 'float64',
+    'pesticide': 'float64',
+    'yield': 'float64',
+}
+
+
+# --- CLEANING ---
+def clean_crop_data(raw_df):
+    """Normalises column names, strips padded strings and applies the cache dtypes."""
+    df = raw_df.copy()
+    df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype(str).str.strip().astype('category')
+    for col, dtype in COLUMN_TYPES.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+# --- CACHE BUILD ---
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {"source": os.path.abspath(csv_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "version": CACHE_FORMAT_VERSION}
+
+def current_cache_dir(cache_dir=CROP_CACHE_DIR):
+    """Directory of the published cache version, or None if nothing has been built."""
+    try:
+        with open(os.path.join(cache_dir, CURRENT_FILE), 'r') as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(cache_dir, version) if version else None
+
+def _read_manifest(cache_dir):
+    version_dir = current_cache_dir(cache_dir)
+    if version_dir is None:
+        return None
+    try:
+        with open(os.path.join(version_dir, MANIFEST_FILE), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def cache_is_fresh(csv_path=CROP_DATA_FILE, cache_dir=CROP_CACHE_DIR):
+    manifest = _read_manifest(cache_dir)
+    return manifest is not None and manifest.get("signature") == _source_signature(csv_path)
+
+def _publish(cache_dir, version):
+    """Points CURRENT at version (atomic replace)."""
+    tmp_path = os.path.join(cache_dir, f".{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(tmp_path, 'w') as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(cache_dir, CURRENT_FILE))
+
+def _prune(cache_dir, keep):
+    # Builds in progress are dot-prefixed; everything else but the kept versions is stale
+    for name in os.listdir(cache_dir):
+        if name in keep or name == CURRENT_FILE or name.startswith('.'):
+            continue
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+def build_crop_cache(csv_path=CROP_DATA_FILE, cache_dir=CROP_CACHE_DIR):
+    """
+    Parses the CSV and writes the state-partitioned Parquet dataset into a
+    new version directory, then publishes it through CURRENT. The version
+    it replaces is kept until the next build, so readers still scanning it
+    are not cut off; older versions are removed.
+    """
+    start = time.perf_counter()
+    df = clean_crop_data(pd.read_csv(csv_path))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    version = f"{time.strftime('%Y%m%d-%H%M%S')}.{time.time_ns() % 1_000_000_000:09d}-{os.getpid()}"
+    staging_dir = os.path.join(cache_dir, f".{version}.tmp")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    table = pa.Table.from_pandas(df.astype({'state': str}), preserve_index=False)
+    ds.write_dataset(
+        table, staging_dir, format="parquet",
+        partitioning=ds.partitioning(pa.schema([("state", pa.string())]), flavor="hive"),
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    with open(os.path.join(staging_dir, MANIFEST_FILE), 'w') as f:
+        json.dump({
+            "signature": _source_signature(csv_path),
+            "rows": len(df),
+            "states": sorted(df['state'].cat.categories),
+        }, f, indent=2)
+
+    previous_dir = current_cache_dir(cache_dir)
+    os.replace(staging_dir, os.path.join(cache_dir, version))
+    _publish(cache_dir, version)
+    _prune(cache_dir, keep={version, os.path.basename(previous_dir) if previous_dir else version})
+
+    print(f"--- Crop dataset cache built: {len(df)} rows, {df['state'].nunique()} states "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms ---")
+    return df
+
+def ensure_crop_cache(csv_path=CROP_DATA_FILE, cache_dir=CROP_CACHE_DIR):
+    """Builds the cache if it is missing or older than the CSV. Returns the directory of the current version."""
+    if not cache_is_fresh(csv_path, cache_dir):
+        build_crop_cache(csv_path, cache_dir)
+    return current_cache_dir(cache_dir)
+
+
+# --- LOADING ---
+def load_crop_data(states=None, columns=None, filter_expr=None, csv_path=CROP_DATA_FILE, cache_dir=CROP_CACHE_DIR):
+    """
+    Loads the cleaned crop dataset, reading only what is needed.
+
+    Args:
+        states (str | list): State name(s); only their partitions are read.
+        columns (list): Columns to load (default: all, including 'state').
+        filter_expr (pyarrow.dataset.Expression): Extra row filter pushed down
+            to the Parquet scan, e.g. ds.field('crop_year') >= 2010.
+    Returns:
+        pd.DataFrame: crop/season/state as categoricals holding only the
+        levels present in the result.
+    """
+    dataset = ds.dataset(ensure_crop_cache(csv_path, cache_dir), format="parquet", partitioning="hive")
+
+    expression = filter_expr
+    if states is not None:
+        states = [states] if isinstance(states, str) else list(states)
+        state_filter = ds.field('state').isin([s.strip() for s in states])
+        expression = state_filter if expression is None else expression & state_filter
+
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category').cat.remove_unused_categories()
+    return df
+
+
+if __name__ == '__main__':
+    build_crop_cache()
+    print(json.dumps(_read_manifest(CROP_CACHE_DIR), indent=2))
@@ -0,0 +1,139 @@
+# src/data_ingestion/district_soil_index.py
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# District headquarters coordinates, used as the reference point for each district
+DISTRICT_CENTROIDS_FILE = 'data/odisha_district_centroids.csv'
+INDEX_CELL_DEG = 0.05           # Resolution of the precomputed lookup grid (~5.5 km)
+MAX_DISTRICT_DISTANCE_KM = 75   # Beyond this, a point is considered outside the covered districts
+EARTH_RADIUS_KM = 6371.0
+
+_index_cache = {}               # (path, districts) -> (mtime, index dict), one entry per district subset
+_index_lock = threading.Lock()
+
+
+# --- DISTANCE HELPER ---
+def _haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+# --- INDEX CONSTRUCTION ---
+def build_district_index(centroids_df, cell_deg=INDEX_CELL_DEG, max_distance_km=MAX_DISTRICT_DISTANCE_KM):
+    """
+    Precomputes a lat/lon grid over the district centroids. Each grid cell
+    stores the indices of every district that can be nearest to some point in
+    the cell (within the cell-centre nearest distance plus one cell diagonal),
+    so a query is one array lookup plus a handful of exact distance checks.
+
+    Args:
+        centroids_df (pd.DataFrame): Columns District, Latitude, Longitude.
+    Returns:
+        dict: The index arrays used by query_nearest_districts().
+    """
+    names = centroids_df['District'].astype(str).str.strip().to_numpy()
+    c_lat = centroids_df['Latitude'].to_numpy(dtype=float)
+    c_lon = centroids_df['Longitude'].to_numpy(dtype=float)
+
+    # Pad the bounding box so points up to max_distance_km away still land on the grid
+    pad_lat = max_distance_km / 111.0
+    pad_lon = pad_lat / np.cos(np.radians(np.abs(c_lat).max() + pad_lat))
+    lat0, lat1 = c_lat.min() - pad_lat, c_lat.max() + pad_lat
+    lon0, lon1 = c_lon.min() - pad_lon, c_lon.max() + pad_lon
+    n_lat = int(np.ceil((lat1 - lat0) / cell_deg))
+    n_lon = int(np.ceil((lon1 - lon0) / cell_deg))
+
+    centre_lat = lat0 + (np.arange(n_lat) + 0.5) * cell_deg
+    centre_lon = lon0 + (np.arange(n_lon) + 0.5) * cell_deg
+    grid_lat, grid_lon = np.meshgrid(centre_lat, centre_lon, indexing='ij')
+
+    # (cells, districts) distance matrix; small enough to build in one go
+    dist = _haversine_km(grid_lat.reshape(-1, 1), grid_lon.reshape(-1, 1), c_lat, c_lon)
+    order = np.argsort(dist, axis=1)
+    sorted_dist = np.take_along_axis(dist, order, axis=1)
+    # By the triangle inequality, the nearest district of any point in a cell is
+    # within (centre's nearest distance + cell diagonal) of the cell centre
+    cell_diagonal_km = cell_deg * 111.0 * np.sqrt(2)
+    n_candidates = (sorted_dist <= sorted_dist[:, :1] + cell_diagonal_km).sum(axis=1)
+    k = int(n_candidates.max())
+    candidates = order[:, :k].copy()
+    # Pad short candidate lists with the cell's nearest district
+    padding = np.arange(k) >= n_candidates[:, None]
+    candidates[padding] = np.broadcast_to(candidates[:, :1], candidates.shape)[padding]
+    candidates = candidates.reshape(n_lat, n_lon, k)
+
+    return {
+        'names': names, 'lat': c_lat, 'lon': c_lon,
+        'origin': (lat0, lon0), 'shape': (n_lat, n_lon), 'cell_deg': cell_deg,
+        'candidates': candidates.astype(np.int32),
+    }
+
+
+def get_district_index(districts=None, centroids_file=DISTRICT_CENTROIDS_FILE):
+    """
+    Returns the (lazily built, cached) district index, optionally restricted to
+    the given district names. Rebuilt when the centroids file changes.
+    """
+    mtime = os.path.getmtime(centroids_file)
+    wanted = frozenset(str(d).strip().lower() for d in districts) if districts is not None else None
+    key = (centroids_file, wanted)
+    with _index_lock:
+        cached = _index_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        centroids_df = pd.read_csv(centroids_file)
+        if wanted is not None:
+            centroids_df = centroids_df[centroids_df['District'].str.strip().str.lower().isin(wanted)]
+        index = build_district_index(centroids_df)
+        _index_cache[key] = (mtime, index)
+        return index
+
+
+# --- QUERIES ---
+def query_nearest_districts(index, lats, lons, max_distance_km=MAX_DISTRICT_DISTANCE_KM):
+    """
+    Vectorised nearest-district lookup for arrays of coordinates.
+    Returns (names, distances_km); points off the grid or farther than
+    max_distance_km get None and NaN.
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    lat0, lon0 = index['origin']
+    n_lat, n_lon = index['shape']
+
+    row = np.floor((lats - lat0) / index['cell_deg']).astype(int)
+    col = np.floor((lons - lon0) / index['cell_deg']).astype(int)
+    on_grid = (row >= 0) & (row < n_lat) & (col >= 0) & (col < n_lon)
+
+    names = np.full(len(lats), None, dtype=object)
+    distances = np.full(len(lats), np.nan)
+    if not on_grid.any():
+        return names, distances
+
+    cand = index['candidates'][row[on_grid], col[on_grid]]                  # (m, k)
+    cand_dist = _haversine_km(lats[on_grid, None], lons[on_grid, None],
+                              index['lat'][cand], index['lon'][cand])        # (m, k)
+    best = np.argmin(cand_dist, axis=1)
+    best_idx = cand[np.arange(len(cand)), best]
+    best_dist = cand_dist[np.arange(len(cand)), best]
+
+    within = best_dist <= max_distance_km
+    hit = np.flatnonzero(on_grid)[within]
+    names[hit] = index['names'][best_idx[within]]
+    distances[hit] = best_dist[within]
+    return names, distances
+
+
+def nearest_district(lat, lon, districts=None, max_distance_km=MAX_DISTRICT_DISTANCE_KM):
+    """Returns (district_name, distance_km) for one point, or (None, None) if out of range."""
+    index = get_district_index(districts)
+    names, distances = query_nearest_districts(index, [lat], [lon], max_distance_km)
+    if names[0] is None:
+        return None, None
+    return names[0], float(distances[0])
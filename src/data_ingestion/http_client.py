@@ -0,0 +1,160 @@
+# src/data_ingestion/http_client.py
+
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- CONFIGURATION ---
+POOL_CONNECTIONS = 10            # Number of hosts with their own keep-alive pool
+POOL_MAXSIZE = 32                # Connections kept alive per host
+MAX_CONCURRENT_REQUESTS = 32     # Process-wide cap on in-flight requests (never above POOL_MAXSIZE)
+
+RETRY_ATTEMPTS = 3               # Total tries for connection errors and retryable statuses
+RETRY_BACKOFF_S = 0.5            # Base of the exponential backoff
+RETRY_MAX_BACKOFF_S = 4.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BREAKER_FAILURE_THRESHOLD = 5    # Consecutive failures before a host is skipped
+BREAKER_COOLOFF_S = 300          # How long a failing host is skipped before it is tried again
+
+_session = None
+_session_lock = threading.Lock()
+_request_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+_breakers = {}                   # host[:port] -> {"failures": int, "open_until": float}
+_breaker_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+
+# --- SHARED SESSION ---
+def get_session():
+    """Returns the process-wide requests Session with keep-alive connection pools."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are handled below, so urllib3's own retry logic stays off
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+# --- CIRCUIT BREAKER ---
+def _check_breaker(host):
+    with _breaker_lock:
+        state = _breakers.get(host)
+        if state is not None and state["open_until"] > time.monotonic():
+            remaining = state["open_until"] - time.monotonic()
+            raise CircuitOpenError(
+                f"Circuit open for {host} after {state['failures']} consecutive failures; "
+                f"retrying in {remaining:.0f}s."
+            )
+
+def _record_success(host):
+    with _breaker_lock:
+        _breakers.pop(host, None)
+
+def _record_failure(host):
+    with _breaker_lock:
+        state = _breakers.setdefault(host, {"failures": 0, "open_until": 0.0})
+        state["failures"] += 1
+        # Once tripped, every further failure (including the trial call after
+        # the cool-off) keeps the circuit open for another cool-off period
+        if state["failures"] >= BREAKER_FAILURE_THRESHOLD:
+            state["open_until"] = time.monotonic() + BREAKER_COOLOFF_S
+
+def circuit_breaker_status():
+    """Returns {host: {"failures": n, "open": bool, "open_for_s": seconds}} for hosts with recent failures."""
+    now = time.monotonic()
+    with _breaker_lock:
+        return {
+            host: {
+                "failures": state["failures"],
+                "open": state["open_until"] > now,
+                "open_for_s": max(state["open_until"] - now, 0.0),
+            }
+            for host, state in _breakers.items()
+        }
+
+def reset_circuit_breakers():
+    with _breaker_lock:
+        _breakers.clear()
+
+
+# --- THE REQUEST ---
+def _backoff_delay(attempt, response=None):
+    # Honour a numeric Retry-After (e.g. on 429), otherwise full-jitter exponential backoff
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_MAX_BACKOFF_S)
+    return random.uniform(0, min(RETRY_MAX_BACKOFF_S, RETRY_BACKOFF_S * 2 ** attempt))
+
+def _attempt_timeout(timeout, deadline):
+    # The per-attempt timeout, cut down to what is left before the deadline (a time.monotonic() value)
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise requests.exceptions.Timeout("Deadline reached before the request could be (re)tried.")
+    return min(timeout, remaining)
+
+def _retry_fits(delay, deadline):
+    return deadline is None or time.monotonic() + delay < deadline
+
+def get(url, params=None, timeout=10, attempts=RETRY_ATTEMPTS, session=None, deadline=None):
+    """
+    GET through the shared pooled session, with bounded concurrency, jittered
+    retries and a per-host circuit breaker.
+
+    Connection errors and 429/5xx responses are retried. Timeouts are not,
+    because the caller's timeout is its latency budget. With a deadline
+    (a time.monotonic() value), every attempt's timeout is capped at the time
+    left and no retry starts past it, so the whole call ends around the
+    deadline. Returns the final response; raises CircuitOpenError or the
+    usual requests exceptions.
+    """
+    host = urlsplit(url).netloc
+    _check_breaker(host)
+    http = session if session is not None else get_session()
+
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        attempt_timeout = _attempt_timeout(timeout, deadline)   # Raises Timeout once the deadline has passed
+        try:
+            with _request_slots:
+                response = http.get(url, params=params, timeout=attempt_timeout)
+        except requests.exceptions.Timeout:
+            _record_failure(host)
+            raise
+        except requests.exceptions.ConnectionError:
+            _record_failure(host)
+            delay = _backoff_delay(attempt)
+            if last_attempt or not _retry_fits(delay, deadline):
+                raise
+            time.sleep(delay)
+            _check_breaker(host)
+            continue
+
+        if response.status_code in RETRY_STATUSES:
+            if response.status_code >= 500:
+                _record_failure(host)
+            delay = _backoff_delay(attempt, response)
+            if not last_attempt and _retry_fits(delay, deadline):
+                time.sleep(delay)
+                _check_breaker(host)
+                continue
+            return response
+
+        # Any other answer (including 4xx) means the service itself is up
+        _record_success(host)
+        return response
@@ -2,12 +2,51 @@
 
 import requests
 import pandas as pd
-from owslib.wfs import WebFeatureService
-import io
+import os
+import time
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.data_ingestion import soil_cache, district_soil_index
+from src.data_ingestion.api_providers import fetch_json
+
+# Names recorded alongside every soil profile so callers know where it came from
+TIER_ISRIC = "isric"
+TIER_BHUVAN = "bhuvan"
+TIER_DISTRICT = "district"
+TIER_STATE_AVERAGE = "state_average"
+TIER_INVALID_COORDINATES = "invalid_coordinates"   # Batch rows with a missing or out-of-range lat/lon
+
+# Overall deadline for the concurrent (hedged) mode of get_smart_soil_data.
+# ISRIC is the richer source, so a Bhuvan answer is held until ISRIC answers
+# or fails: when Bhuvan is fast and ISRIC hangs, the caller waits the full
+# deadline for a Bhuvan result it already had. Lower this to trade ISRIC
+# coverage for latency. No remote call (retries included) runs past it.
+SOIL_TIER_DEADLINE_S = 12.0
+
+# --- PROGRESS OUTPUT ---
+_output_state = threading.local()
+
+def _log(message):
+    """Prints tier progress unless the current thread is inside quiet_progress()."""
+    if not getattr(_output_state, 'quiet', False):
+        print(message)
+
+@contextmanager
+def quiet_progress():
+    """Silences tier progress messages for the current thread (used by batch ingestion)."""
+    previous = getattr(_output_state, 'quiet', False)
+    _output_state.quiet = True
+    try:
+        yield
+    finally:
+        _output_state.quiet = previous
 
 # --- TIER 1: ISRIC SoilGrids FUNCTION (Improved) ---
-def get_soil_data_isric(lat, lon):
-    print("  -> Attempting Tier 1: ISRIC SoilGrids...")
+def get_soil_data_isric(lat, lon, timeout=15, session=None, deadline=None):
+    _log("  -> Attempting Tier 1: ISRIC SoilGrids...")
     base_url = "https://rest.isric.org/soilgrids/v2.0/properties/query"
     properties = ["phh2o", "soc", "nitrogen", "cec", "clay", "sand"]
     params = {
@@ -18,9 +57,8 @@ def get_soil_data_isric(lat, lon):
         "value": ["mean"]
     }
     try:
-        response = requests.get(base_url, params=params, timeout=15)
-        response.raise_for_status() # Raises an HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
+        # Raises an HTTPError for bad responses (4xx or 5xx); a shared session reuses pooled connections
+        data = fetch_json(base_url, params=params, timeout=timeout, session=session, deadline=deadline)
         
         soil_data = {}
         # Check if the 'properties' and 'layers' keys exist and are not empty
@@ -38,55 +76,51 @@ def get_soil_data_isric(lat, lon):
                         soil_data['nitrogen_kg_ha'] = round(prop['depths'][0]['values']['mean'] * 15, 2)
         
         if not soil_data or 'ph' not in soil_data:
-            print("  -> ISRIC response received, but contained no usable data for this location.")
+            _log("  -> ISRIC response received, but contained no usable data for this location.")
             return pd.DataFrame()
 
-        print("  ✅ Success from Tier 1: ISRIC SoilGrids.")
+        _log("  ✅ Success from Tier 1: ISRIC SoilGrids.")
         return pd.DataFrame([soil_data])
 
     except requests.exceptions.Timeout:
-        print("  -> ISRIC API request timed out.")
+        _log("  -> ISRIC API request timed out.")
         return pd.DataFrame()
     except requests.exceptions.RequestException as e:
-        print(f"  -> ISRIC API request failed: {e}")
+        _log(f"  -> ISRIC API request failed: {e}")
         return pd.DataFrame()
 
 
 # --- TIER 2: BHUVAN API FUNCTION (Improved) ---
-def get_soil_type_bhuvan(lat, lon):
-    print("  -> Attempting Tier 2: Bhuvan API...")
+def get_soil_type_bhuvan(lat, lon, timeout=20, deadline=None):
+    _log("  -> Attempting Tier 2: Bhuvan API...")
     try:
         wfs_url = "https://bhuvan-wfs.nrsc.gov.in/bhuvan/wfs"
-        wfs = WebFeatureService(url=wfs_url, version='1.1.0', timeout=20)
         layer_name = 'india_soil:IND_SOIL_250K_POLY'
-        
-        response = wfs.getfeature(
-            typename=layer_name,
-            bbox=(lon, lat, lon, lat),
-            outputFormat='json'
-        )
-        # Use io.BytesIO to handle potential encoding issues
-        data_bytes = io.BytesIO(response.read())
-        
-        # Check if response is empty
-        if data_bytes.getbuffer().nbytes == 0:
-            print("  -> Bhuvan returned an empty response.")
-            return None
-        
-        df = pd.read_json(data_bytes)
-        
-        if 'features' in df and not df['features'].empty:
-            soil_description = df['features'].iloc[0]['properties']['SOIL_DECOR']
-            print(f"  ✅ Success from Tier 2: Bhuvan. Found soil type: {soil_description}")
+
+        # Plain WFS 1.1.0 GetFeature request (skips the GetCapabilities round trip)
+        params = {
+            "service": "WFS",
+            "version": "1.1.0",
+            "request": "GetFeature",
+            "typename": layer_name,
+            "bbox": f"{lon},{lat},{lon},{lat}",
+            "outputFormat": "json",
+        }
+        data = fetch_json(wfs_url, params=params, timeout=timeout, deadline=deadline)
+
+        features = data.get('features') or []
+        if features:
+            soil_description = features[0]['properties']['SOIL_DECOR']
+            _log(f"  ✅ Success from Tier 2: Bhuvan. Found soil type: {soil_description}")
             return soil_description
         else:
-            print("  -> Bhuvan responded, but found no soil feature for this location.")
+            _log("  -> Bhuvan responded, but found no soil feature for this location.")
             return None
 
     except Exception as e:
         # This will now catch network errors like "Failed to resolve"
-        print(f"  -> Bhuvan API query failed. The service may be down or your network has issues.")
-        print(f"     Error details: {e}")
+        _log(f"  -> Bhuvan API query failed. The service may be down or your network has issues.")
+        _log(f"     Error details: {e}")
         return None
 
 # --- TIER 2.5: THE LOOKUP TABLE ---
@@ -98,46 +132,247 @@ BHUVAN_SOIL_LOOKUP = {
 }
 
 # --- TIER 3: STATE-LEVEL AVERAGE (Our reliable fallback) ---
-def get_state_average_fallback(soil_csv_file='data/odisha_soil_data1.csv'):
-    print("  -> Tiers 1 & 2 failed. Using Tier 3: State-Level Average Fallback.")
-    try:
+SOIL_FALLBACK_FILE = 'data/odisha_soil_data1.csv'
+SOIL_COLUMNS = ['ph', 'nitrogen_kg_ha', 'phosphorus_kg_ha', 'potassium_kg_ha', 'organic_carbon_percent']
+
+# path -> (mtime, state_average_df, district_df); filled lazily, reloaded when the file changes
+_fallback_tables = {}
+_fallback_lock = threading.Lock()
+
+def load_fallback_tables(soil_csv_file=SOIL_FALLBACK_FILE):
+    """
+    Returns (state_average_df, district_df) for the fallback CSV, keeping the
+    parsed tables in memory and re-reading the file only when its mtime changes.
+    district_df is indexed by district name (empty if the CSV has no District column).
+    Raises FileNotFoundError if the CSV does not exist.
+    """
+    mtime = os.path.getmtime(soil_csv_file)
+    with _fallback_lock:
+        cached = _fallback_tables.get(soil_csv_file)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+
         soil_df = pd.read_csv(soil_csv_file)
+        # Standardize column names to match what the model expects
+        soil_df.columns = [str(col).lower().replace(' ', '_') for col in soil_df.columns]
         # Ensure we only calculate mean for numeric columns
         numeric_cols = soil_df.select_dtypes(include='number')
         averages = numeric_cols.mean().to_frame().T
-        # Standardize column names to match what the model expects
-        averages.columns = [str(col).lower().replace(' ', '_') for col in averages.columns]
-        print("  ✅ Success from Tier 3: Fallback.")
-        return averages
+        if 'district' in soil_df.columns:
+            district_df = numeric_cols.set_index(soil_df['district'].astype(str).str.strip())
+        else:
+            district_df = numeric_cols.iloc[0:0]
+
+        _fallback_tables[soil_csv_file] = (mtime, averages, district_df)
+        return averages, district_df
+
+def get_state_average_fallback(soil_csv_file=SOIL_FALLBACK_FILE):
+    _log("  -> Tiers 1 & 2 failed. Using Tier 3: State-Level Average Fallback.")
+    try:
+        averages, _ = load_fallback_tables(soil_csv_file)
+        _log("  ✅ Success from Tier 3: Fallback.")
+        return averages.copy()
     except FileNotFoundError:
-        print(f"  ❌ Fallback CSV file not found at '{soil_csv_file}'!")
+        _log(f"  ❌ Fallback CSV file not found at '{soil_csv_file}'!")
         # Return an empty dataframe with expected columns for consistency
-        return pd.DataFrame(columns=['ph', 'nitrogen_kg_ha', 'phosphorus_kg_ha', 'potassium_kg_ha', 'organic_carbon_percent'])
+        return pd.DataFrame(columns=SOIL_COLUMNS)
+
+def get_district_soil_profile(district, soil_csv_file=SOIL_FALLBACK_FILE):
+    """
+    Returns the soil row for a district (case-insensitive) from the fallback CSV
+    as a one-row DataFrame, or an empty DataFrame if the district is unknown.
+    """
+    try:
+        _, district_df = load_fallback_tables(soil_csv_file)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=SOIL_COLUMNS)
+    matches = district_df[district_df.index.str.lower() == str(district).strip().lower()]
+    return matches.iloc[:1].reset_index(drop=True)
+
+def get_district_soil_table(soil_csv_file=SOIL_FALLBACK_FILE):
+    """Returns all per-district soil rows, indexed by district name."""
+    try:
+        _, district_df = load_fallback_tables(soil_csv_file)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=SOIL_COLUMNS)
+    return district_df.copy()
+
+def get_nearest_district_soil(lat, lon, max_distance_km=district_soil_index.MAX_DISTRICT_DISTANCE_KM,
+                              soil_csv_file=SOIL_FALLBACK_FILE):
+    """
+    Returns the soil row of the district nearest to (lat, lon), found through
+    the offline district index (no network). Returns an empty DataFrame if the
+    point is not within max_distance_km of any district in the fallback CSV.
+    """
+    try:
+        _, district_df = load_fallback_tables(soil_csv_file)
+        index = district_soil_index.get_district_index(districts=district_df.index)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=SOIL_COLUMNS)
+    names, _ = district_soil_index.query_nearest_districts(index, [lat], [lon], max_distance_km)
+    if names[0] is None:
+        return pd.DataFrame(columns=SOIL_COLUMNS)
+    _log(f"  ✅ Success from Tier 3: nearest district ({names[0]}).")
+    return district_df.loc[[names[0]]].reset_index(drop=True)
+
+
+# --- TIER LATENCY TRACKING ---
+# Recent latencies (seconds) per tier, used to tune SOIL_TIER_DEADLINE_S
+_tier_latency_history = defaultdict(lambda: deque(maxlen=500))
+_tier_latency_lock = threading.Lock()
+
+def _timed_tier_call(tier, func, *args, **kwargs):
+    """Calls a tier function and records how long it took and whether it produced data."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    if tier == TIER_BHUVAN:
+        succeeded = result in BHUVAN_SOIL_LOOKUP
+    else:
+        succeeded = result is not None and not result.empty
+    with _tier_latency_lock:
+        _tier_latency_history[tier].append((elapsed, succeeded))
+    return result
+
+def get_tier_latency_stats():
+    """
+    Summarises the recorded tier latencies.
+    Returns a DataFrame with one row per tier: calls, success rate, p50/p95/max seconds.
+    """
+    rows = []
+    with _tier_latency_lock:
+        history = {tier: list(samples) for tier, samples in _tier_latency_history.items()}
+    for tier, samples in history.items():
+        latencies = pd.Series([elapsed for elapsed, _ in samples])
+        rows.append({
+            "tier": tier,
+            "calls": len(samples),
+            "success_rate": sum(ok for _, ok in samples) / len(samples),
+            "p50_s": latencies.quantile(0.5),
+            "p95_s": latencies.quantile(0.95),
+            "max_s": latencies.max(),
+        })
+    return pd.DataFrame(rows, columns=["tier", "calls", "success_rate", "p50_s", "p95_s", "max_s"])
 
 
 # --- THE MAIN "SMART" FUNCTION ---
-def get_smart_soil_data(lat, lon):
-    print(f"\n--- Starting Smart Soil Data Ingestion for lat={lat}, lon={lon} ---")
+def _fill_missing_from_fallback(soil_df):
+    # We need to ensure all required columns are present for the model
+    # If some are missing from ISRIC, we can fill them from the fallback
+    try:
+        fallback_df, _ = load_fallback_tables()
+    except FileNotFoundError:
+        return soil_df
+    for col in fallback_df.columns:
+        if col not in soil_df.columns:
+            soil_df[col] = fallback_df[col].iloc[0]
+    return soil_df
+
+
+def _resolve_local_tiers(lat, lon):
+    """Offline tiers: nearest district profile, then the state average."""
+    soil_df = get_nearest_district_soil(lat, lon)
+    if not soil_df.empty:
+        return soil_df, TIER_DISTRICT
+    return get_state_average_fallback(), TIER_STATE_AVERAGE
+
+
+def resolve_soil_tiers(lat, lon, session=None, use_remote_tiers=True):
+    """
+    Walks the tiers in order and returns a tuple (soil_df, tier) for the first
+    one that produced data. Does not consult the soil cache.
+    With use_remote_tiers=False, only the offline district/state tiers are used.
+    """
+    if not use_remote_tiers:
+        return _resolve_local_tiers(lat, lon)
 
     # 1. Try ISRIC SoilGrids
-    soil_df = get_soil_data_isric(lat, lon)
+    soil_df = _timed_tier_call(TIER_ISRIC, get_soil_data_isric, lat, lon, session=session)
     if not soil_df.empty:
-        # We need to ensure all required columns are present for the model
-        # If some are missing from ISRIC, we can fill them from the fallback
-        fallback_df = get_state_average_fallback()
-        for col in fallback_df.columns:
-            if col not in soil_df.columns:
-                soil_df[col] = fallback_df[col].iloc[0]
-        return soil_df
+        return _fill_missing_from_fallback(soil_df), TIER_ISRIC
 
     # 2. Try Bhuvan
-    soil_type = get_soil_type_bhuvan(lat, lon)
+    soil_type = _timed_tier_call(TIER_BHUVAN, get_soil_type_bhuvan, lat, lon)
     if soil_type and soil_type in BHUVAN_SOIL_LOOKUP:
         soil_data = BHUVAN_SOIL_LOOKUP[soil_type]
-        return pd.DataFrame([soil_data])
+        return pd.DataFrame([soil_data]), TIER_BHUVAN
+
+    # 3. Use Fallback (nearest district, then state average)
+    return _resolve_local_tiers(lat, lon)
+
+
+def resolve_soil_tiers_concurrent(lat, lon, deadline=SOIL_TIER_DEADLINE_S):
+    """
+    Hedged variant of resolve_soil_tiers: starts ISRIC and Bhuvan together and
+    returns the best tier that answered within the overall deadline. A Bhuvan
+    answer is held until ISRIC either fails or the deadline passes (see
+    SOIL_TIER_DEADLINE_S). The remote calls share the same absolute deadline:
+    each attempt only gets the time left and no retry starts after it, so an
+    abandoned call ends on its own instead of holding a connection.
+    """
+    deadline_at = time.monotonic() + deadline
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="soil-tier")
+    futures = {
+        executor.submit(_timed_tier_call, TIER_ISRIC, get_soil_data_isric, lat, lon,
+                        timeout=deadline, deadline=deadline_at): TIER_ISRIC,
+        executor.submit(_timed_tier_call, TIER_BHUVAN, get_soil_type_bhuvan, lat, lon,
+                        timeout=deadline, deadline=deadline_at): TIER_BHUVAN,
+    }
+    bhuvan_data = None
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                _log(f"  -> Soil tier deadline of {deadline:.1f}s reached.")
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if futures[future] == TIER_ISRIC:
+                    soil_df = future.result()
+                    if not soil_df.empty:
+                        return _fill_missing_from_fallback(soil_df), TIER_ISRIC
+                else:
+                    soil_type = future.result()
+                    if soil_type and soil_type in BHUVAN_SOIL_LOOKUP:
+                        bhuvan_data = BHUVAN_SOIL_LOOKUP[soil_type]
+    finally:
+        # Don't block on the slower call; its result is discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if bhuvan_data is not None:
+        return pd.DataFrame([bhuvan_data]), TIER_BHUVAN
+    return _resolve_local_tiers(lat, lon)
+
+
+def get_smart_soil_data(lat, lon, use_cache=True, return_tier=False, concurrent=False,
+                        deadline=SOIL_TIER_DEADLINE_S, use_remote_tiers=True):
+    """
+    Returns the soil profile for a location, checking the persistent soil
+    cache (keyed on a snapped grid cell) before walking the remote tiers.
+    With concurrent=True, ISRIC and Bhuvan are queried in parallel under an
+    overall deadline instead of one after the other. With
+    use_remote_tiers=False, only the offline district/state tiers are used.
+    With return_tier=True, returns a tuple (soil_df, tier) instead.
+    """
+    _log(f"\n--- Starting Smart Soil Data Ingestion for lat={lat}, lon={lon} ---")
+
+    if use_cache:
+        cached = soil_cache.get_cached_soil(lat, lon)
+        if cached is not None:
+            soil_df, tier = cached
+            _log(f"  ✅ Served from soil cache (tier: {tier}).")
+            return (soil_df, tier) if return_tier else soil_df
 
-    # 3. Use Fallback
-    return get_state_average_fallback()
+    if not use_remote_tiers:
+        soil_df, tier = resolve_soil_tiers(lat, lon, use_remote_tiers=False)
+    elif concurrent:
+        soil_df, tier = resolve_soil_tiers_concurrent(lat, lon, deadline=deadline)
+    else:
+        soil_df, tier = resolve_soil_tiers(lat, lon)
+    if use_cache and not soil_df.empty:
+        soil_cache.put_cached_soil(lat, lon, soil_df, tier)
+    return (soil_df, tier) if return_tier else soil_df
 
 # --- Example Usage ---
 if __name__ == '__main__':
@@ -0,0 +1,205 @@
+# src/data_ingestion/soil_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# --- CONFIGURATION ---
+SOIL_CACHE_DB = 'data/cache/soil_cache.sqlite'
+SOIL_CACHE_CELL_DEG = 0.01        # ~1.1 km grid cells; nearby farms share one entry
+SOIL_CACHE_MAX_ENTRIES = 100000   # Least-recently used cells are evicted beyond this
+SOIL_CACHE_TTL_S = 30 * 86400     # Default time-to-live for a cached cell
+SOIL_CACHE_EVICT_EVERY = 256      # Writes between eviction passes (the table may overshoot max_entries by this much)
+
+# Fallback tiers are cached only briefly, so a transient outage of the remote
+# services doesn't pin a farm to the state average for a month.
+TIER_TTL_S = {
+    "isric": 30 * 86400,
+    "bhuvan": 30 * 86400,
+    "district": 6 * 3600,
+    "state_average": 3600,
+}
+
+_memory_cache = OrderedDict()     # (db_path, cell) -> (expires_at, tier, record)
+_memory_lock = threading.Lock()
+_writes_since_eviction = {}       # db_path -> writes by this process since its last eviction pass
+_thread_state = threading.local()
+
+
+# --- GRID SNAPPING ---
+def snap_to_cell(lat, lon, cell_deg=SOIL_CACHE_CELL_DEG):
+    """Snaps a coordinate to the centre of its grid cell. Returns (cell_lat, cell_lon)."""
+    cell_lat = round(round(float(lat) / cell_deg) * cell_deg, 6)
+    cell_lon = round(round(float(lon) / cell_deg) * cell_deg, 6)
+    return cell_lat, cell_lon
+
+
+# --- SQLITE STORAGE ---
+def _get_connection(db_path):
+    """Returns a per-thread SQLite connection, creating the cache table on first use."""
+    connections = getattr(_thread_state, 'connections', None)
+    if connections is None:
+        connections = _thread_state.connections = {}
+    if db_path in connections:
+        return connections[db_path]
+
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # WAL lets several app workers read while one of them writes
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS soil_cache (
+               cell_lat REAL NOT NULL,
+               cell_lon REAL NOT NULL,
+               tier TEXT NOT NULL,
+               record TEXT NOT NULL,
+               created_at REAL NOT NULL,
+               expires_at REAL NOT NULL,
+               accessed_at REAL NOT NULL,
+               PRIMARY KEY (cell_lat, cell_lon)
+           )"""
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_soil_cache_accessed ON soil_cache (accessed_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_soil_cache_expires ON soil_cache (expires_at)")
+    conn.commit()
+    connections[db_path] = conn
+    return conn
+
+
+def _remember(key, expires_at, tier, record, max_entries):
+    with _memory_lock:
+        _memory_cache[key] = (expires_at, tier, record)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > max_entries:
+            _memory_cache.popitem(last=False)
+
+
+def _eviction_due(db_path):
+    with _memory_lock:
+        writes = _writes_since_eviction.get(db_path, 0)
+        _writes_since_eviction[db_path] = (writes + 1) % SOIL_CACHE_EVICT_EVERY
+        return writes == 0
+
+
+def _evict(conn, now, max_entries):
+    # Size-bounded eviction: drop expired rows (indexed), then the least recently used overflow
+    conn.execute("DELETE FROM soil_cache WHERE expires_at <= ?", (now,))
+    conn.execute(
+        """DELETE FROM soil_cache WHERE rowid IN (
+               SELECT rowid FROM soil_cache ORDER BY accessed_at ASC
+               LIMIT MAX((SELECT COUNT(*) FROM soil_cache) - ?, 0)
+           )""",
+        (max_entries,),
+    )
+
+
+# --- PUBLIC API ---
+def get_cached_soil(lat, lon, db_path=SOIL_CACHE_DB, cell_deg=SOIL_CACHE_CELL_DEG,
+                    max_entries=SOIL_CACHE_MAX_ENTRIES):
+    """
+    Looks up the soil profile for the grid cell containing (lat, lon).
+    Returns a tuple (soil_df, tier) on a hit, or None on a miss or expired entry.
+    """
+    cell = snap_to_cell(lat, lon, cell_deg)
+    key = (db_path, cell)
+    now = time.time()
+
+    # 1. In-process memory layer (microseconds)
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _memory_cache.move_to_end(key)
+                return pd.DataFrame([entry[2]]), entry[1]
+            del _memory_cache[key]
+
+    # 2. Shared on-disk layer (survives restarts, shared between processes)
+    try:
+        conn = _get_connection(db_path)
+        row = conn.execute(
+            "SELECT tier, record, expires_at FROM soil_cache WHERE cell_lat = ? AND cell_lon = ?",
+            cell,
+        ).fetchone()
+        if row is None:
+            return None
+        tier, record_json, expires_at = row
+        if expires_at <= now:
+            conn.execute("DELETE FROM soil_cache WHERE cell_lat = ? AND cell_lon = ?", cell)
+            conn.commit()
+            return None
+        conn.execute(
+            "UPDATE soil_cache SET accessed_at = ? WHERE cell_lat = ? AND cell_lon = ?",
+            (now, *cell),
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"  -> Soil cache read failed: {e}")
+        return None
+
+    record = json.loads(record_json)
+    _remember(key, expires_at, tier, record, max_entries)
+    return pd.DataFrame([record]), tier
+
+
+def put_cached_soil(lat, lon, soil_df, tier, ttl=None, db_path=SOIL_CACHE_DB,
+                    cell_deg=SOIL_CACHE_CELL_DEG, max_entries=SOIL_CACHE_MAX_ENTRIES):
+    """
+    Stores the first row of soil_df for the grid cell containing (lat, lon),
+    tagged with the tier it came from. Evicts least-recently used cells when
+    the cache grows beyond max_entries (checked every SOIL_CACHE_EVICT_EVERY
+    writes, so a write doesn't pay for scanning the whole table).
+    """
+    if soil_df is None or soil_df.empty:
+        return
+    if ttl is None:
+        ttl = TIER_TTL_S.get(tier, SOIL_CACHE_TTL_S)
+
+    cell = snap_to_cell(lat, lon, cell_deg)
+    record = {col: (None if pd.isna(val) else float(val)) for col, val in soil_df.iloc[0].items()}
+    now = time.time()
+    expires_at = now + ttl
+
+    try:
+        conn = _get_connection(db_path)
+        conn.execute(
+            "INSERT OR REPLACE INTO soil_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*cell, tier, json.dumps(record), now, expires_at, now),
+        )
+        if _eviction_due(db_path):
+            _evict(conn, now, max_entries)
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"  -> Soil cache write failed: {e}")
+
+    _remember((db_path, cell), expires_at, tier, record, max_entries)
+
+
+def clear_soil_cache(db_path=SOIL_CACHE_DB):
+    """Removes every cached cell from memory and from disk."""
+    with _memory_lock:
+        for key in [k for k in _memory_cache if k[0] == db_path]:
+            del _memory_cache[key]
+        _writes_since_eviction.pop(db_path, None)
+    try:
+        conn = _get_connection(db_path)
+        conn.execute("DELETE FROM soil_cache")
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"  -> Soil cache clear failed: {e}")
+
+
+def soil_cache_stats(db_path=SOIL_CACHE_DB):
+    """Returns a DataFrame with the number of cached cells per tier."""
+    conn = _get_connection(db_path)
+    return pd.read_sql_query(
+        "SELECT tier, COUNT(*) AS cells FROM soil_cache GROUP BY tier ORDER BY cells DESC",
+        conn,
+    )
@@ -0,0 +1,155 @@
+# src/data_ingestion/soil_join.py
+"""
+Attaches soil profiles to crop records by key.
+
+The historical crop dataset only identifies a record by state (and, where
+available, district), so soil is looked up once per key and joined onto all
+records in one vectorised merge:
+
+  * states covered by the district soil CSV (odisha_soil_data1.csv) use the
+    mean of their district profiles; records that carry a district column
+    can join on (state, district) instead,
+  * every other state is resolved at its centroid through the batch soil
+    ingestion (ISRIC and Bhuvan, served from the persistent soil cache after
+    the first run).
+
+States that cannot be resolved get NaN soil values and soil_source
+'unresolved', so callers can drop or impute them explicitly.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.data_ingestion import district_soil_index
+from src.data_ingestion.batch_soil_ingestion import get_smart_soil_data_batch
+from src.data_ingestion.smart_soil_ingestion import (
+    SOIL_COLUMNS, SOIL_FALLBACK_FILE, TIER_BHUVAN, TIER_ISRIC, load_fallback_tables,
+)
+
+STATE_CENTROIDS_FILE = 'data/india_state_centroids.csv'
+DISTRICT_SOIL_STATE = 'Odisha'    # The state whose districts are listed in SOIL_FALLBACK_FILE
+# How close to a district HQ a point must be to count as inside DISTRICT_SOIL_STATE: about the
+# radius of an average Odisha district (155,707 km² / 30 districts). The index's own 75 km reach
+# takes in farms across the border in West Bengal, Jharkhand, Chhattisgarh and Andhra Pradesh.
+DISTRICT_STATE_MATCH_KM = 40
+
+SOURCE_DISTRICT_MEAN = "district_mean"
+SOURCE_DISTRICT = "district"
+SOURCE_UNRESOLVED = "unresolved"
+
+_state_centroids = {}             # path -> (mtime, centroids DataFrame)
+_state_centroids_lock = threading.Lock()
+
+
+# --- KEY TABLES ---
+def load_state_centroids(centroids_file=STATE_CENTROIDS_FILE):
+    """
+    Returns a DataFrame with columns state, lat, lon, keeping it in memory and
+    re-reading the file only when its mtime changes. Callers must not modify it.
+    """
+    mtime = os.path.getmtime(centroids_file)
+    with _state_centroids_lock:
+        cached = _state_centroids.get(centroids_file)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        centroids = pd.read_csv(centroids_file)
+        table = pd.DataFrame({
+            'state': centroids['State'].astype(str).str.strip(),
+            'lat': centroids['Latitude'].astype(float),
+            'lon': centroids['Longitude'].astype(float),
+        })
+        _state_centroids[centroids_file] = (mtime, table)
+        return table
+
+def nearest_states(lats, lons, centroids_file=STATE_CENTROIDS_FILE):
+    """
+    Best-effort state for each coordinate, fully offline: points within
+    DISTRICT_STATE_MATCH_KM of a district HQ in the offline district index,
+    and nearer to it than to any other state's centroid, belong to
+    DISTRICT_SOIL_STATE; other points get the state whose centroid is nearest.
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=float))
+    lons = np.atleast_1d(np.asarray(lons, dtype=float))
+    centroids = load_state_centroids(centroids_file)
+    distances = district_soil_index._haversine_km(lats[:, None], lons[:, None],
+                                                  centroids['lat'].to_numpy()[None, :],
+                                                  centroids['lon'].to_numpy()[None, :])
+    states = centroids['state'].to_numpy(dtype=object)[np.argmin(distances, axis=1)]
+
+    _, district_km = district_soil_index.query_nearest_districts(district_soil_index.get_district_index(), lats, lons,
+                                                                 max_distance_km=DISTRICT_STATE_MATCH_KM)
+    other_states = (centroids['state'] != DISTRICT_SOIL_STATE).to_numpy()
+    nearest_other_km = distances[:, other_states].min(axis=1) if other_states.any() else np.full(len(lats), np.inf)
+    with np.errstate(invalid='ignore'):
+        states[district_km < nearest_other_km] = DISTRICT_SOIL_STATE
+    return states
+
+def build_district_soil_table(soil_csv_file=SOIL_FALLBACK_FILE, state=DISTRICT_SOIL_STATE):
+    """Per-district soil rows as a flat table: state, district, soil columns, soil_source."""
+    _, district_df = load_fallback_tables(soil_csv_file)
+    table = district_df.reindex(columns=SOIL_COLUMNS).rename_axis('district').reset_index()
+    table.insert(0, 'state', state)
+    table['soil_source'] = SOURCE_DISTRICT
+    return table
+
+def build_state_soil_table(states=None, use_remote_tiers=True, use_cache=True,
+                           centroids_file=STATE_CENTROIDS_FILE, soil_csv_file=SOIL_FALLBACK_FILE):
+    """
+    One soil profile per state: state, soil columns, soil_source.
+
+    Args:
+        states (list): States to resolve (default: every state with a centroid).
+        use_remote_tiers (bool): If False, only the district CSV is used and
+            other states stay unresolved.
+    """
+    centroids = load_state_centroids(centroids_file)
+    states = centroids['state'].tolist() if states is None else [str(s).strip() for s in states]
+    table = pd.DataFrame({'state': states}).drop_duplicates().reset_index(drop=True)
+    table = table.join(centroids.set_index('state'), on='state')
+    for col in SOIL_COLUMNS:
+        table[col] = np.nan
+    table['soil_source'] = SOURCE_UNRESOLVED
+
+    is_district_state = table['state'] == DISTRICT_SOIL_STATE
+    if is_district_state.any():
+        district_soil = build_district_soil_table(soil_csv_file)[SOIL_COLUMNS]
+        table.loc[is_district_state, SOIL_COLUMNS] = district_soil.mean().to_numpy()
+        table.loc[is_district_state, 'soil_source'] = SOURCE_DISTRICT_MEAN
+
+    to_fetch = ~is_district_state & table['lat'].notna()
+    if use_remote_tiers and to_fetch.any():
+        fetched = get_smart_soil_data_batch(table.loc[to_fetch, ['lat', 'lon']], use_cache=use_cache)
+        # The offline tiers only know the district CSV's state; elsewhere they are not a real answer
+        remote = fetched['tier'].isin([TIER_ISRIC, TIER_BHUVAN]).to_numpy()
+        rows = table.index[to_fetch][remote]
+        table.loc[rows, SOIL_COLUMNS] = fetched.loc[remote, SOIL_COLUMNS].to_numpy(dtype=float)
+        table.loc[rows, 'soil_source'] = fetched.loc[remote, 'tier'].to_numpy()
+
+    return table.drop(columns=['lat', 'lon'])
+
+
+# --- THE JOIN ---
+def attach_soil(records, soil_table, keys=('state',)):
+    """
+    Left-joins soil_table onto records by keys (e.g. ('state',) or
+    ('state', 'district')) in a single merge. Existing soil columns in records
+    are replaced; records without a matching key get NaN soil values.
+    Returns a new DataFrame in the original row order.
+    """
+    keys = list(keys)
+    lookup = soil_table[keys + [c for c in soil_table.columns if c not in keys]].copy()
+    for key in keys:
+        lookup[key] = lookup[key].astype(str).str.strip()
+    lookup = lookup.drop_duplicates(subset=keys).set_index(keys)
+
+    left = records.drop(columns=[c for c in lookup.columns if c in records.columns])
+    # Join on normalised copies of the keys so categorical/padded values still match
+    join_keys = [f"_{key}_key" for key in keys]
+    for key, join_key in zip(keys, join_keys):
+        left[join_key] = left[key].astype(str).str.strip()
+    lookup.index = lookup.index.set_names(join_keys)
+    return left.join(lookup, on=join_keys).drop(columns=join_keys)
+
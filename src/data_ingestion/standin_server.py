@@ -0,0 +1,77 @@
+# src/data_ingestion/standin_server.py
+"""
+Local HTTP stand-in for the external APIs, for load tests and benchmarks
+without network access. Requests are routed by /<original-host>/<original-path>
+(which is what api_providers sends in "standin" mode) and answered from the
+replay fixtures or synthetic responses.
+
+Usage:
+    python -m src.data_ingestion.standin_server --port 8765 --latency-ms 0
+    AGRI_API_MODE=standin streamlit run app/Home.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from src.data_ingestion.api_providers import ENDPOINTS, replay_response
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency_s = 0.0        # Optional artificial delay to mimic real network latency
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True   # Headers and body are written separately; avoid 40 ms delayed-ACK stalls
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        host, _, path = parts.path.lstrip('/').partition('/')
+        endpoint = ENDPOINTS.get((host, '/' + path))
+        if endpoint is None:
+            self._send(404, {"error": f"No stand-in for {parts.path}"})
+            return
+        try:
+            body = replay_response(endpoint, parse_qs(parts.query))
+        except (ValueError, KeyError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self._send(200, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def start_standin_server(host="127.0.0.1", port=8765, latency_ms=0, background=True):
+    """
+    Starts the stand-in server. With background=True, returns the server
+    running on a daemon thread (call server.shutdown() to stop it).
+    """
+    handler = type("ConfiguredStandInHandler", (StandInHandler,), {"latency_s": latency_ms / 1000.0})
+    server = ThreadingHTTPServer((host, port), handler)
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local stand-in for the external weather and soil APIs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Artificial delay added to every response.")
+    args = parser.parse_args()
+    print(f"--- Stand-in API server on http://{args.host}:{args.port} (latency {args.latency_ms} ms) ---")
+    start_standin_server(args.host, args.port, args.latency_ms, background=False)
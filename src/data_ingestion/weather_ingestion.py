@@ -0,0 +1,41 @@
+# src/data_ingestion/weather_ingestion.py
+
+import pandas as pd
+
+from src.data_ingestion.api_providers import fetch_json
+
+WEATHERAPI_FORECAST_URL = "https://api.weatherapi.com/v1/forecast.json"
+FORECAST_COLUMNS = ["Date", "precipitation_sum", "temp_celsius", "humidity_percent", "wind_speed_ms"]
+
+
+# --- WeatherAPI.com daily forecast ---
+def get_weatherapi_forecast(lat, lon, api_key, days=5, timeout=15, session=None):
+    """
+    Fetches the WeatherAPI.com daily forecast for one location.
+
+    Returns:
+        pd.DataFrame: Columns Date, precipitation_sum (mm), temp_celsius,
+        humidity_percent and wind_speed_ms; empty if the API returned no days.
+    Raises:
+        requests.exceptions.RequestException: If the request fails.
+    """
+    params = {"key": api_key, "q": f"{lat},{lon}", "days": days, "aqi": "no", "alerts": "no"}
+    data = fetch_json(WEATHERAPI_FORECAST_URL, params=params, timeout=timeout, session=session)
+    forecast_days = data.get("forecast", {}).get("forecastday", [])
+    if not forecast_days:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+
+    rows = [
+        {
+            "Date": pd.to_datetime(d.get("date")),
+            "precipitation_sum": d.get("day", {}).get("totalprecip_mm", 0),
+            "temp_celsius": d.get("day", {}).get("avgtemp_c", 0),
+            "humidity_percent": d.get("day", {}).get("avghumidity"),
+            "wind_speed_ms": d.get("day", {}).get("maxwind_kph"),
+        }
+        for d in forecast_days
+    ]
+    forecast = pd.DataFrame(rows, columns=FORECAST_COLUMNS)
+    # WeatherAPI reports km/h (missing or null becomes NaN); the evaporation check expects m/s
+    forecast["wind_speed_ms"] = pd.to_numeric(forecast["wind_speed_ms"], errors="coerce") / 3.6
+    return forecast
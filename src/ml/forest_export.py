@@ -0,0 +1,216 @@
+# src/ml/forest_export.py
+"""
+Compact export of the RandomForest yield model.
+
+The trees are flattened into a handful of contiguous NumPy arrays (split
+feature, threshold, child indices, leaf value), and FlatForest evaluates all
+trees together with vectorised array steps. Predictions match sklearn's.
+The export is built for the app's request path: single-row and small-batch
+latency drops sharply (no per-tree Python or joblib overhead) and the file
+is small and can be memory-mapped. Bulk scoring is a different story: on
+hundreds of thousands of rows sklearn's compiled per-tree loops are about
+2-3x faster, so offline scoring of large tables should keep using the
+original model (MODEL_PATH).
+
+Usage:
+    python -m src.ml.forest_export                  # export, fidelity check, benchmark
+    python -m src.ml.forest_export --rows 1000000   # larger throughput benchmark
+"""
+
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.ml import model_registry
+from src.ml.yield_predictor import MODEL_PATH, compile_feature_encoder, encode_features
+
+FLAT_MODEL_PATH = "models/crop_yield_model_flat.joblib"
+PREDICT_CHUNK_ROWS = 512         # Rows evaluated together; keeps the (rows x trees) working set in cache
+COMPACT_EVERY_STEPS = 4          # Finished (row, tree) pairs are dropped every few traversal steps
+
+
+# --- THE FLAT MODEL ---
+class FlatForest:
+    """
+    A tree ensemble stored as flat node arrays. All trees share one node
+    numbering and roots[t] is the first node of tree t. Leaves point to
+    themselves in children and have threshold +inf, so a traversal step is
+    the same array expression for every node. predict() returns the mean
+    leaf value over the trees, exactly like RandomForestRegressor.predict.
+    """
+
+    def __init__(self, feature, threshold, children, missing_left, is_leaf, value, roots, n_features):
+        self.feature = feature               # (nodes,) split feature (0 for leaves)
+        self.threshold = threshold           # (nodes,) go left when x <= threshold
+        self.children = children             # (nodes * 2,) left/right child, interleaved
+        self.missing_left = missing_left     # (nodes,) where NaN features go
+        self.is_leaf = is_leaf
+        self.value = value                   # (nodes,) leaf prediction
+        self.roots = roots
+        self.n_features_in_ = n_features
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _leaf_values_chunk(self, X):
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+        flat_x = X.ravel()
+        has_nan = np.isnan(flat_x).any()
+
+        # One entry per (row, tree) pair; finished pairs are dropped every few steps
+        leaf_of = np.empty(n_rows * n_trees, dtype=np.intp)
+        pending = np.arange(n_rows * n_trees)
+        node = np.tile(self.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * n_features, n_trees)
+        step = 0
+        while pending.size:
+            x = flat_x[row_offset + self.feature[node]]
+            go_right = ~(x <= self.threshold[node])
+            if has_nan:
+                go_right = np.where(np.isnan(x), ~self.missing_left[node], go_right)
+            node = self.children[2 * node + go_right]
+            step += 1
+            if step % COMPACT_EVERY_STEPS == 0:
+                done = self.is_leaf[node]
+                leaf_of[pending[done]] = node[done]
+                pending, node, row_offset = pending[~done], node[~done], row_offset[~done]
+        return self.value[leaf_of].reshape(n_rows, n_trees)
+
+    def predict_trees(self, X):
+        """Per-tree predictions, shape (rows, trees)."""
+        # sklearn compares float32 features with float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected a 2-D array with {self.n_features_in_} features, got shape {X.shape}.")
+        X = X.astype(np.float64)
+        if not len(X):
+            return np.empty((0, len(self.roots)))
+        return np.concatenate([
+            self._leaf_values_chunk(X[start:start + PREDICT_CHUNK_ROWS])
+            for start in range(0, len(X), PREDICT_CHUNK_ROWS)
+        ])
+
+    def predict(self, X):
+        return self.predict_trees(X).mean(axis=1)
+
+
+# --- EXPORT ---
+def flatten_forest(model):
+    """Flattens a fitted RandomForestRegressor (or any single-output tree ensemble) into a FlatForest."""
+    features, thresholds, lefts, rights, missing, leaves, values, roots = [], [], [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        nodes = tree.__getstate__()["nodes"]
+        is_leaf = tree.children_left < 0
+        own = np.arange(tree.node_count) + offset
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+        rights.append(np.where(is_leaf, own, tree.children_right + offset))
+        missing.append(nodes["missing_go_to_left"].astype(bool) if "missing_go_to_left" in nodes.dtype.names
+                       else np.zeros(tree.node_count, dtype=bool))
+        leaves.append(is_leaf)
+        values.append(tree.value[:, 0, 0])
+        offset += tree.node_count
+
+    return FlatForest(
+        feature=np.concatenate(features).astype(np.intp),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        children=np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).astype(np.intp).ravel(),
+        missing_left=np.concatenate(missing),
+        is_leaf=np.concatenate(leaves),
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.array(roots, dtype=np.intp),
+        n_features=model.n_features_in_,
+    )
+
+def export_yield_model(model_path=MODEL_PATH, flat_path=FLAT_MODEL_PATH):
+    """
+    Writes a payload with the same keys as the original ("model",
+    "columns", ...) but a FlatForest as the model, so it works unchanged with
+    yield_predictor.predict_batch(). Saved uncompressed so it can be memory-mapped.
+    """
+    payload = joblib.load(model_path)
+    flat_payload = {**payload, "model": flatten_forest(payload["model"])}
+    joblib.dump(flat_payload, flat_path)
+    return flat_payload
+
+def load_flat_model_payload(mmap_mode=None, flat_path=FLAT_MODEL_PATH):
+    """Loads the exported flat payload through the model registry."""
+    return model_registry.get_model(flat_path, mmap_mode=mmap_mode)
+
+
+# --- FIDELITY & BENCHMARK ---
+def check_fidelity(model, flat, X, rtol=1e-9):
+    """Compares FlatForest and sklearn predictions on X. Returns the largest absolute difference."""
+    if not len(X):
+        return 0.0                   # sklearn refuses empty input; there is nothing to compare
+    expected = model.predict(X)
+    actual = flat.predict(X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    if not np.allclose(actual, expected, rtol=rtol, atol=1e-12):
+        raise AssertionError(f"Flat forest diverges from sklearn (max abs diff {max_diff:.3e}).")
+    return max_diff
+
+def _sample_features(payload, n_rows, seed=0):
+    # Realistic rows: random crop/season one-hots with numeric features in typical ranges
+    rng = np.random.default_rng(seed)
+    crops = [c[len("crop_"):] for c in payload["columns"] if c.startswith("crop_")]
+    seasons = [c[len("season_"):] for c in payload["columns"] if c.startswith("season_")]
+    rows = pd.DataFrame({
+        'crop': rng.choice(np.array(crops, dtype=object), n_rows),
+        'season': rng.choice(np.array(seasons, dtype=object), n_rows),
+        'area': rng.lognormal(8, 2, n_rows),
+        'annual_rainfall': rng.uniform(500, 3500, n_rows),
+    })
+    typical = {'ph': (5.5, 7.5), 'nitrogen_kg_ha': (80, 200), 'phosphorus_kg_ha': (8, 25),
+               'potassium_kg_ha': (120, 260), 'organic_carbon_percent': (0.3, 0.8)}
+    for col, (low, high) in typical.items():
+        rows[col] = rng.uniform(low, high, n_rows)
+    return encode_features(rows, compile_feature_encoder(tuple(payload["columns"])))
+
+def benchmark(model, flat, X, single_row_repeats=200):
+    """Returns single-row latency (ms) and bulk throughput (rows/s) for sklearn and the flat forest."""
+    results = {}
+    for name, predictor in (("sklearn", model), ("flat", flat)):
+        start = time.perf_counter()
+        for i in range(single_row_repeats):
+            predictor.predict(X[i % len(X)][None, :])
+        latency_ms = (time.perf_counter() - start) / single_row_repeats * 1000
+
+        start = time.perf_counter()
+        predictor.predict(X)
+        throughput = len(X) / (time.perf_counter() - start)
+        results[name] = {"latency_ms": latency_ms, "rows_per_s": throughput}
+    return results
+
+
+if __name__ == '__main__':
+    import warnings
+
+    parser = argparse.ArgumentParser(description="Export the yield RandomForest as flat arrays and benchmark it.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows for the throughput benchmark.")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+    # Pickle FlatForest under its importable name, not __main__.FlatForest
+    from src.ml.forest_export import export_yield_model
+
+    payload = joblib.load(MODEL_PATH)
+    flat_payload = export_yield_model()
+    flat = flat_payload["model"]
+    print(f"--- Exported {len(flat.roots)} trees / {flat.n_nodes} nodes to {FLAT_MODEL_PATH} ---")
+
+    X = _sample_features(payload, args.rows)
+    max_diff = check_fidelity(payload["model"], flat, X[:100_000])
+    print(f"✅ Fidelity: max |flat - sklearn| = {max_diff:.3e} on {min(len(X), 100_000)} rows")
+
+    for name, stats in benchmark(payload["model"], flat, X).items():
+        print(f"  {name:8s} single row: {stats['latency_ms']:.2f} ms   bulk ({len(X)} rows): {stats['rows_per_s']:,.0f} rows/s")
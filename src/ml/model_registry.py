@@ -0,0 +1,82 @@
+# src/ml/model_registry.py
+
+import os
+import threading
+
+import joblib
+
+# Set to "r" to memory-map model arrays, so several worker processes share the same pages
+MODEL_MMAP_ENV = "AGRI_MODEL_MMAP"
+
+_models = {}                     # (path, mmap_mode, loader) -> {"mtime": float, "model": object, "failed_mtime": float}
+_lock = threading.Lock()
+
+
+def _default_mmap_mode():
+    return os.environ.get(MODEL_MMAP_ENV) or None
+
+def get_model(path, mmap_mode=None, loader=None):
+    """
+    Returns the model stored at path, loading it at most once per process.
+
+    The file's modification time is checked on every call; when the
+    artifact is replaced (e.g. after retraining), the new version is loaded
+    and served from then on. If loading the new version fails, the error is
+    reported and the previously loaded model keeps being served (the same
+    file version is not retried); with nothing loaded yet, the error is raised.
+
+    Args:
+        path (str): Model artifact file.
+        mmap_mode (str): joblib mmap_mode ("r" or "c") to memory-map the
+            model's NumPy arrays instead of reading them into memory. Only
+            applies to uncompressed joblib dumps. Defaults to AGRI_MODEL_MMAP.
+        loader (callable): Custom loader taking the path (e.g. a Keras
+            load_model); defaults to joblib.load.
+    """
+    mmap_mode = mmap_mode if mmap_mode is not None else _default_mmap_mode()
+    mtime = os.path.getmtime(path)
+    key = (path, mmap_mode, loader)
+    with _lock:
+        entry = _models.get(key)
+        if entry is None or (entry["mtime"] != mtime and entry.get("failed_mtime") != mtime):
+            try:
+                if loader is not None:
+                    model = loader(path)
+                else:
+                    model = joblib.load(path, mmap_mode=mmap_mode)
+            except Exception as e:
+                if entry is None:
+                    raise
+                print(f"⚠️ Could not reload changed model file '{path}' ({e}); still serving the previous version.")
+                entry["failed_mtime"] = mtime
+                return entry["model"]
+            if entry is not None:
+                print(f"--- Model file '{path}' changed; reloaded. ---")
+            entry = _models[key] = {"mtime": mtime, "model": model}
+        return entry["model"]
+
+def save_model(payload, path):
+    """
+    Dumps payload to path with joblib, atomically: it is written to a
+    temporary file in the same directory and then renamed over path, so
+    get_model() never reads a half-written artifact.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.tmp-{os.getpid()}")
+    try:
+        joblib.dump(payload, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def evict_model(path=None):
+    """Drops the cached copy of one model (or of every model when path is None)."""
+    with _lock:
+        for key in [key for key in _models if path is None or key[0] == path]:
+            del _models[key]
+
+def loaded_models():
+    """Returns {path: mtime} for the models currently held in memory."""
+    with _lock:
+        return {key[0]: entry["mtime"] for key, entry in _models.items()}
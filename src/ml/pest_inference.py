@@ -0,0 +1,254 @@
+# src/ml/pest_inference.py
+"""
+Batched pest/disease classification for many leaf images at once.
+
+Images (uploaded files, paths or raw bytes) are decoded and resized on a
+thread pool straight into one preallocated float32 batch, which is then
+classified with a single forward pass per batch_size images. The model is
+loaded once per process through the model registry, from the TFLite export
+when there is one (see pest_model_export), otherwise from the Keras .h5.
+
+Usage:
+    python -m src.ml.pest_inference path/to/images/          # a directory
+    python -m src.ml.pest_inference leaf1.jpg leaf2.png --batch-size 64
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from src.config import PEST_MODEL_FILE
+from src.ml import model_registry, pest_runtime
+
+PEST_TFLITE_FILE = 'models/pest_classifier_model.tflite'
+PEST_TFLITE_INT8_FILE = 'models/pest_classifier_model_int8.tflite'
+PEST_MODEL_ENV = "AGRI_PEST_MODEL"   # Path of the model to serve (.tflite or .h5), e.g. the int8 export
+CLASS_NAMES_FILE = 'models/pest_class_names.json'
+DEFAULT_CLASS_NAMES = ['Corn_(maize)___Common_rust', 'Corn_(maize)___healthy']
+IMAGE_SIZE = (224, 224)            # (width, height) the classifier was trained on
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+DEFAULT_BATCH_SIZE = 32            # Images per forward pass
+DEFAULT_DECODE_WORKERS = 8
+
+
+# --- MODEL & LABELS ---
+def _load_keras_model(path):
+    import tensorflow as tf  # Only needed when serving the full Keras model
+    return tf.keras.models.load_model(path)
+
+def _load_tflite_model(path):
+    return pest_runtime.TFLiteClassifier(path)
+
+def resolve_pest_model_path():
+    """The model file to serve: AGRI_PEST_MODEL if set, else the TFLite export if present, else the Keras .h5."""
+    override = os.environ.get(PEST_MODEL_ENV)
+    if override:
+        return override
+    return PEST_TFLITE_FILE if os.path.exists(PEST_TFLITE_FILE) else PEST_MODEL_FILE
+
+def load_pest_model(path=None):
+    """
+    The pest classifier, loaded at most once per process (reloaded if the
+    file changes). A .tflite file runs on the lean runtime in pest_runtime,
+    without importing TensorFlow; a .h5 file is loaded with Keras.
+    """
+    path = path or resolve_pest_model_path()
+    loader = _load_tflite_model if path.endswith('.tflite') else _load_keras_model
+    return model_registry.get_model(path, loader=loader)
+
+def load_class_names(path=CLASS_NAMES_FILE):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Fallback if the JSON file doesn't exist
+        return list(DEFAULT_CLASS_NAMES)
+
+def display_name(class_name):
+    return class_name.replace('___', ' ').replace('_', ' ')
+
+
+# --- PREPROCESSING ---
+def source_name(source):
+    """A readable name for an image source (uploaded file, path or bytes)."""
+    name = getattr(source, 'name', None)
+    if name:
+        return os.path.basename(str(name))
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(str(source))
+    return "<bytes>"
+
+def iter_image_files(directory):
+    """Image files directly under directory, sorted by name."""
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+def decode_image_into(source, out, size=IMAGE_SIZE):
+    """
+    Decodes one image, converts it to RGB, resizes it and writes it scaled to
+    [0, 1] into out, a (height, width, 3) float32 view of the batch.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif hasattr(source, 'seek'):
+        source.seek(0)
+    with Image.open(source) as image:
+        # JPEGs are decoded at a reduced scale when they are much larger than the target size
+        image.draft('RGB', size)
+        image = image.convert('RGB').resize(size)
+        np.multiply(np.asarray(image), np.float32(1 / 255), out=out, casting='unsafe')
+
+def load_image_batch(sources, size=IMAGE_SIZE, max_workers=DEFAULT_DECODE_WORKERS):
+    """
+    Decodes all images in parallel into one preallocated float32 array.
+    Returns (batch, errors): batch has shape (n, height, width, 3) and errors
+    maps the index of each image that could not be decoded to its error
+    message (its slot in the batch stays zero).
+    """
+    width, height = size
+    batch = np.zeros((len(sources), height, width, 3), dtype=np.float32)
+    errors = {}
+
+    def decode(i):
+        try:
+            decode_image_into(sources[i], batch[i], size)
+        except Exception as e:  # A corrupt upload should not fail the whole batch
+            errors[i] = str(e)
+
+    if len(sources) == 1:
+        decode(0)
+    elif sources:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sources)), thread_name_prefix="pest-decode") as pool:
+            list(pool.map(decode, range(len(sources))))
+    return batch, errors
+
+
+# --- INFERENCE ---
+PROBABILITY_ROW_TOLERANCE = 0.05  # How far a row of an unflagged model may sum from 1 and still count as probabilities
+
+def outputs_are_probabilities(model):
+    """
+    Whether the model's outputs are already softmax probabilities: the
+    exported TFLite model says so in its metadata, a Keras model through its
+    final activation. None when it can't be told.
+    """
+    flag = getattr(model, 'outputs_probabilities', None)
+    if flag is not None:
+        return bool(flag)
+    try:
+        return getattr(model.layers[-1].activation, '__name__', None) == 'softmax'
+    except (AttributeError, IndexError, TypeError):
+        return None
+
+def _softmax(rows):
+    shifted = np.exp(rows - rows.max(axis=1, keepdims=True))
+    return shifted / shifted.sum(axis=1, keepdims=True)
+
+def _rescale(rows):
+    # Quantized softmax outputs come in steps of 1/256, so a row sums to about, not exactly, 1
+    sums = rows.sum(axis=1, keepdims=True)
+    uniform = np.full_like(rows, 1.0 / rows.shape[1])
+    return np.divide(rows, sums, out=uniform, where=sums > 0)
+
+def _as_probabilities(outputs, are_probabilities=None):
+    """
+    Normalises model outputs to probabilities row by row. Softmax outputs
+    (are_probabilities=True) are only rescaled to sum to 1, raw logits
+    (False) go through a softmax. When unknown, each row is judged on its
+    own: non-negative and summing to about 1 means probabilities.
+    """
+    outputs = np.asarray(outputs, dtype=np.float64)
+    if are_probabilities is True:
+        return _rescale(np.clip(outputs, 0, None))
+    if are_probabilities is False:
+        return _softmax(outputs)
+    is_probability = (outputs >= 0).all(axis=1) & (np.abs(outputs.sum(axis=1) - 1) <= PROBABILITY_ROW_TOLERANCE)
+    probabilities = np.empty_like(outputs)
+    probabilities[is_probability] = _rescale(outputs[is_probability])
+    probabilities[~is_probability] = _softmax(outputs[~is_probability])
+    return probabilities
+
+def predict_probabilities(model, batch, batch_size=DEFAULT_BATCH_SIZE):
+    """Class probabilities for a preprocessed batch, one forward pass per batch_size images."""
+    if not len(batch):
+        return np.empty((0, 0))
+    outputs = [np.asarray(model.predict_on_batch(batch[start:start + batch_size]))
+               for start in range(0, len(batch), batch_size)]
+    return _as_probabilities(np.concatenate(outputs), outputs_are_probabilities(model))
+
+def classify_images(sources, model=None, class_names=None, batch_size=DEFAULT_BATCH_SIZE,
+                    max_workers=DEFAULT_DECODE_WORKERS):
+    """
+    Classifies many images at once.
+
+    Args:
+        sources (list): Uploaded files, file paths or raw image bytes.
+        model: A loaded classifier (default: load_pest_model()).
+        class_names (list): Labels in model output order (default: load_class_names()).
+    Returns:
+        tuple: (results, stats). results is a DataFrame with one row per image:
+        image, class_name, label, confidence (0-100) and error. stats holds
+        decode_s, inference_s, total_s and images_per_s.
+    """
+    sources = list(sources)
+    model = model if model is not None else load_pest_model()
+    class_names = class_names if class_names is not None else load_class_names()
+
+    start = time.perf_counter()
+    batch, errors = load_image_batch(sources, max_workers=max_workers)
+    decoded_at = time.perf_counter()
+
+    valid = np.array([i not in errors for i in range(len(sources))], dtype=bool)
+    probabilities = predict_probabilities(model, batch[valid], batch_size)
+    finished_at = time.perf_counter()
+
+    names = np.full(len(sources), None, dtype=object)
+    confidence = np.full(len(sources), np.nan)
+    if valid.any():
+        names[valid] = [class_names[i] for i in probabilities.argmax(axis=1)]
+        confidence[valid] = 100 * probabilities.max(axis=1)
+
+    results = pd.DataFrame({
+        'image': [source_name(s) for s in sources],
+        'class_name': names,
+        'label': [display_name(n) if n is not None else None for n in names],
+        'confidence': confidence,
+        'error': [errors.get(i) for i in range(len(sources))],
+    })
+    total = finished_at - start
+    stats = {
+        'images': len(sources),
+        'decode_s': decoded_at - start,
+        'inference_s': finished_at - decoded_at,
+        'total_s': total,
+        'images_per_s': len(sources) / total if total > 0 else float('inf'),
+    }
+    return results, stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Classify leaf images in one batched pass.")
+    parser.add_argument("paths", nargs="+", help="Image files and/or directories of images.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_DECODE_WORKERS, help="Decode threads.")
+    args = parser.parse_args()
+
+    image_paths = []
+    for path in args.paths:
+        image_paths.extend(iter_image_files(path) if os.path.isdir(path) else [path])
+
+    load_start = time.perf_counter()
+    pest_model = load_pest_model()
+    print(f"--- Model loaded in {time.perf_counter() - load_start:.2f}s ---")
+
+    results, stats = classify_images(image_paths, pest_model, batch_size=args.batch_size, max_workers=args.workers)
+    print(results.to_string(index=False))
+    print(f"--- {stats['images']} images: decode {stats['decode_s']:.2f}s, inference {stats['inference_s']:.2f}s, "
+          f"{stats['images_per_s']:.1f} images/s ---")
@@ -0,0 +1,181 @@
+# src/ml/pest_model_export.py
+"""
+Export of the Keras pest classifier to TFLite for lean CPU serving.
+
+The float export keeps the weights in float32. The int8 export quantizes
+weights and activations, calibrated on sample leaf images, which makes the
+file about 4x smaller and is usually faster on CPU. The app serves the
+export through pest_runtime.TFLiteClassifier without importing TensorFlow.
+
+Usage:
+    python -m src.ml.pest_model_export                              # float export + parity + benchmark
+    python -m src.ml.pest_model_export --int8 --images pest_img_data # int8 export, calibrated on real images
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from src.config import PEST_MODEL_FILE
+from src.ml import pest_inference, pest_runtime
+
+CALIBRATION_IMAGES = 200          # Images used to calibrate the int8 activation ranges
+CALIBRATION_BATCH = 1
+
+
+# --- SAMPLE IMAGES ---
+def find_images(image_dir, limit=None, seed=0):
+    """Image files anywhere under image_dir (e.g. the class folders of pest_img_data), a random subset if limit is set."""
+    paths = [os.path.join(root, name) for root, _, names in os.walk(image_dir) for name in sorted(names)
+             if name.lower().endswith(pest_inference.IMAGE_EXTENSIONS)]
+    paths.sort()
+    if limit is not None and len(paths) > limit:
+        chosen = np.random.default_rng(seed).choice(len(paths), size=limit, replace=False)
+        paths = [paths[i] for i in sorted(chosen)]
+    return paths
+
+def sample_batch(image_dir=None, n_images=CALIBRATION_IMAGES, seed=0):
+    """A preprocessed batch of real images from image_dir, or random images when no directory is given."""
+    if image_dir:
+        batch, errors = pest_inference.load_image_batch(find_images(image_dir, n_images, seed))
+        return np.delete(batch, sorted(errors), axis=0)
+    width, height = pest_inference.IMAGE_SIZE
+    return np.random.default_rng(seed).random((n_images, height, width, 3), dtype=np.float32)
+
+
+# --- EXPORT ---
+def export_tflite(model, output_path, int8=False, calibration_batch=None):
+    """
+    Converts a Keras model to a TFLite file. With int8=True, weights and
+    activations are quantized to int8, calibrated on calibration_batch.
+    The model keeps float input and output, so callers don't change.
+    Metadata (whether the outputs are softmax probabilities) is written
+    next to it for pest_runtime. Returns the size of the written file in bytes.
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if int8:
+        if calibration_batch is None or not len(calibration_batch):
+            raise ValueError("int8 export needs a calibration batch of sample images.")
+
+        def representative_dataset():
+            for start in range(0, len(calibration_batch), CALIBRATION_BATCH):
+                yield [calibration_batch[start:start + CALIBRATION_BATCH]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+    with open(pest_runtime.metadata_path(output_path), 'w') as f:
+        json.dump({
+            "outputs_probabilities": bool(pest_inference.outputs_are_probabilities(model)),
+            "int8": int8,
+        }, f, indent=2)
+    return len(tflite_model)
+
+def export_pest_model(model_path=PEST_MODEL_FILE, int8=False, image_dir=None, output_path=None):
+    """Exports the saved Keras pest model (int8 needs image_dir for calibration). Returns (output_path, size_bytes)."""
+    if int8 and not image_dir:
+        raise ValueError("int8 export needs a directory of sample leaf images for calibration.")
+    output_path = output_path or (pest_inference.PEST_TFLITE_INT8_FILE if int8 else pest_inference.PEST_TFLITE_FILE)
+    model = tf.keras.models.load_model(model_path)
+    calibration = sample_batch(image_dir) if int8 else None
+    return output_path, export_tflite(model, output_path, int8=int8, calibration_batch=calibration)
+
+
+# --- PARITY & BENCHMARK ---
+def check_parity(keras_model, tflite_model, batch, batch_size=pest_inference.DEFAULT_BATCH_SIZE):
+    """
+    Compares the two models on the same images. Returns a dict with the
+    top-1 agreement rate and the mean/max absolute difference in class
+    probabilities.
+    """
+    expected = pest_inference.predict_probabilities(keras_model, batch, batch_size)
+    actual = pest_inference.predict_probabilities(tflite_model, batch, batch_size)
+    diff = np.abs(expected - actual)
+    return {
+        "images": len(batch),
+        "top1_agreement": float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean()),
+        "mean_abs_prob_diff": float(diff.mean()),
+        "max_abs_prob_diff": float(diff.max()),
+    }
+
+def cold_start_seconds(model_path):
+    """
+    Seconds from a fresh Python process to the first prediction with model_path,
+    served the way the app does it (imports included, so TensorFlow's own start-up counts).
+    """
+    width, height = pest_inference.IMAGE_SIZE
+    script = (
+        "import time; t = time.perf_counter(); import numpy as np; "
+        "from src.ml import pest_inference; "
+        f"m = pest_inference.load_pest_model({model_path!r}); "
+        f"m.predict_on_batch(np.zeros((1, {height}, {width}, 3), dtype=np.float32)); "
+        "print(time.perf_counter() - t)"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def benchmark(loaders, batch, single_image_repeats=20, batch_size=pest_inference.DEFAULT_BATCH_SIZE):
+    """
+    Startup and inference timings for each named model loader:
+    load_s, single-image latency (ms) and batched throughput (images/s).
+    """
+    results = {}
+    for name, load in loaders.items():
+        start = time.perf_counter()
+        model = load()
+        load_s = time.perf_counter() - start
+
+        model.predict_on_batch(batch[:1])                # Warm-up (graph tracing / tensor allocation)
+        start = time.perf_counter()
+        for i in range(single_image_repeats):
+            model.predict_on_batch(batch[i % len(batch):i % len(batch) + 1])
+        latency_ms = (time.perf_counter() - start) / single_image_repeats * 1000
+
+        start = time.perf_counter()
+        pest_inference.predict_probabilities(model, batch, batch_size)
+        images_per_s = len(batch) / (time.perf_counter() - start)
+        results[name] = {"load_s": load_s, "latency_ms": latency_ms, "images_per_s": images_per_s}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the pest classifier to TFLite and check it against Keras.")
+    parser.add_argument("--int8", action="store_true", help="Quantize weights and activations to int8.")
+    parser.add_argument("--images", default=None,
+                        help="Directory of sample leaf images for int8 calibration and the parity check.")
+    parser.add_argument("--model", default=PEST_MODEL_FILE, help="Keras model to export.")
+    parser.add_argument("--output", default=None, help="Output .tflite path.")
+    parser.add_argument("--skip-checks", action="store_true", help="Only export; skip the parity check and benchmark.")
+    args = parser.parse_args()
+
+    output_path, size = export_pest_model(args.model, int8=args.int8, image_dir=args.images, output_path=args.output)
+    print(f"--- Exported {'int8' if args.int8 else 'float'} TFLite model to {output_path} "
+          f"({size / 1e6:.1f} MB, Keras file {os.path.getsize(args.model) / 1e6:.1f} MB) ---")
+
+    if not args.skip_checks:
+        if not args.images:
+            print("⚠️ No --images given: parity is measured on random images, which says little about accuracy.")
+        batch = sample_batch(args.images, n_images=64, seed=1)
+        parity = check_parity(tf.keras.models.load_model(args.model), pest_runtime.TFLiteClassifier(output_path), batch)
+        print(f"✅ Parity on {parity['images']} images: top-1 agreement {parity['top1_agreement']:.1%}, "
+              f"mean |Δp| {parity['mean_abs_prob_diff']:.4f}, max |Δp| {parity['max_abs_prob_diff']:.4f}")
+
+        timings = benchmark({
+            "keras": lambda: tf.keras.models.load_model(args.model),
+            "tflite": lambda: pest_runtime.TFLiteClassifier(output_path),
+        }, batch)
+        for name, stats in timings.items():
+            print(f"  {name:7s} load: {stats['load_s']:.2f}s   single image: {stats['latency_ms']:.1f} ms   "
+                  f"batched: {stats['images_per_s']:.1f} images/s")
+        for name, path in (("keras", args.model), ("tflite", output_path)):
+            print(f"  {name:7s} cold start to first prediction (new process): {cold_start_seconds(path):.2f}s")
@@ -0,0 +1,99 @@
+# src/ml/pest_runtime.py
+"""
+Lean CPU runtime for the exported (TFLite) pest classifier.
+
+Importing this module does not import TensorFlow. The interpreter comes
+from the small ai-edge-litert package (the serving dependency in
+requirements.txt) or the older tflite-runtime; full TensorFlow is only
+imported as a last resort.
+TFLiteClassifier offers the same predict_on_batch() as the Keras model, so
+pest_inference can use either one.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+METADATA_SUFFIX = '.meta.json'    # Written next to the .tflite file by pest_model_export
+
+
+def _import_interpreter():
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf  # Fallback: the full framework also ships the interpreter
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+def metadata_path(model_path):
+    return os.path.splitext(model_path)[0] + METADATA_SUFFIX
+
+def load_metadata(model_path):
+    """The export metadata of a .tflite file, or {} for a file exported without it."""
+    try:
+        with open(metadata_path(model_path), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class TFLiteClassifier:
+    """
+    Wraps a TFLite interpreter for batched classification. The input tensor
+    is resized to the batch size on demand. Quantized (int8/uint8) inputs and
+    outputs are converted with the model's scale and zero point, so callers
+    always pass float32 images in [0, 1] and get float scores back.
+
+    outputs_probabilities comes from the export metadata: True when the
+    model ends in a softmax, None when the file carries no metadata.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = _import_interpreter()(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        self._lock = threading.Lock()    # An interpreter must not be invoked from two threads at once
+        self.metadata = load_metadata(model_path)
+        self.outputs_probabilities = self.metadata.get("outputs_probabilities")
+
+    @property
+    def input_shape(self):
+        return tuple(int(d) for d in self._input['shape'][1:])
+
+    def _resize(self, batch_size):
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input['index'], [batch_size, *self.input_shape])
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = batch_size
+
+    def _quantize(self, batch):
+        dtype = self._input['dtype']
+        if dtype == np.float32:
+            return np.asarray(batch, dtype=np.float32)
+        scale, zero_point = self._input['quantization']
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def _dequantize(self, output):
+        if self._output['dtype'] == np.float32:
+            return output
+        scale, zero_point = self._output['quantization']
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def predict_on_batch(self, batch):
+        """Scores for a (n, height, width, 3) float32 batch, shape (n, classes)."""
+        with self._lock:
+            self._resize(len(batch))
+            self.interpreter.set_tensor(self._input['index'], self._quantize(batch))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output['index']).copy())
@@ -1,10 +1,16 @@
 # train_pest_model.py
+import argparse
 import tensorflow as tf
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.layers import Dense, GlobalAveragePooling2D
 from tensorflow.keras.models import Model
 
+parser = argparse.ArgumentParser(description="Train the pest/disease classifier.")
+parser.add_argument("--int8", action="store_true", help="Also export an int8-quantized TFLite model.")
+parser.add_argument("--no-export", action="store_true", help="Only save the Keras model; skip the TFLite export.")
+args = parser.parse_args()
+
 # --- 1. Setup Data Paths ---
 base_dir = 'pest_img_data'
 
@@ -49,4 +55,15 @@ print("✅ Model training complete.")
 
 # --- 5. Save the Model ---
 model.save('models/pest_classifier_model.h5')
-print("\n✅ Model saved as 'pest_classifier_model.h5'")
\ No newline at end of file
+print("\n✅ Model saved as 'pest_classifier_model.h5'")
+
+# --- 6. Export for lightweight serving ---
+# The app serves the TFLite file without importing TensorFlow (see src/ml/pest_runtime.py)
+if not args.no_export:
+    from src.ml.pest_model_export import export_pest_model
+
+    path, size = export_pest_model('models/pest_classifier_model.h5')
+    print(f"✅ Exported TFLite model to '{path}' ({size / 1e6:.1f} MB)")
+    if args.int8:
+        path, size = export_pest_model('models/pest_classifier_model.h5', int8=True, image_dir=base_dir)
+        print(f"✅ Exported int8 TFLite model to '{path}' ({size / 1e6:.1f} MB)")
\ No newline at end of file
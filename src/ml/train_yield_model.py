@@ -1,3 +1,7 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
@@ -6,7 +10,9 @@ import warnings
 import joblib
 
 # Import the functions we need from other files
-from src.data_ingestion.smart_soil_ingestion import get_state_average_fallback
+from src.data_ingestion.crop_dataset import load_crop_data
+from src.data_ingestion.soil_join import SOURCE_UNRESOLVED, attach_soil, build_state_soil_table
+from src.ml import model_registry, yield_model_bundle
 
 # --- CONFIGURATION & SETUP ---
 warnings.filterwarnings('ignore')
@@ -16,61 +22,96 @@ CROP_DATA_FILE = 'data/crop_yield.csv'
 # PART 1: DATA PREPARATION FUNCTION
 # ==============================================================================
 
-def prepare_training_data(location_soil_data):
+TRAINING_STATES = ['Odisha']
+
+def prepare_training_data(location_soil_data=None, states=TRAINING_STATES, soil_table=None, use_remote_soil=True):
     """
-    Loads historical crop data and injects the location-specific soil data.
+    Loads historical crop data and attaches soil properties to every record.
+
+    By default each record gets the soil profile of its own state, joined by
+    key (see soil_join.build_state_soil_table); records whose state could not
+    be resolved are dropped. Passing location_soil_data instead writes that
+    single soil row into every record. states=None loads the whole national
+    dataset.
     """
     print("\n--- 2. Preparing Training Data ---")
     try:
-        crop_df = pd.read_csv(CROP_DATA_FILE)
+        # Only the requested states' partitions of the cleaned columnar cache are read
+        crop_df = load_crop_data(states=states, csv_path=CROP_DATA_FILE)
     except FileNotFoundError:
         print(f"❌ ERROR: Could not find '{CROP_DATA_FILE}'.")
         return None
-    
-    # Filter for a specific state if needed, e.g., Odisha
-    state_crop_df = crop_df[crop_df['State'] == 'Odisha'].copy()
-    state_crop_df.columns = state_crop_df.columns.str.lower().str.replace(' ', '_')
-    
-    # Inject the fetched soil data into every row
-    for col in location_soil_data.columns:
-        if col in state_crop_df.columns:
-            state_crop_df.drop(columns=[col], inplace=True)
-        state_crop_df[col] = location_soil_data[col].iloc[0]
 
-    state_crop_df.dropna(inplace=True)
-    print("✅ Historical data injected with location-specific soil properties.")
-    return state_crop_df
+    if location_soil_data is not None:
+        training_df = crop_df.drop(columns=[c for c in location_soil_data.columns if c in crop_df.columns])
+        training_df = training_df.assign(**location_soil_data.iloc[0].to_dict())
+        print("✅ Historical data injected with location-specific soil properties.")
+    else:
+        if soil_table is None:
+            soil_table = build_state_soil_table(crop_df['state'].cat.categories, use_remote_tiers=use_remote_soil)
+        training_df = attach_soil(crop_df, soil_table, keys=['state'])
+        is_unresolved = training_df['soil_source'] == SOURCE_UNRESOLVED
+        if is_unresolved.any():
+            unresolved = sorted(training_df.loc[is_unresolved, 'state'].unique())
+            print(f"⚠️ No soil profile for {len(unresolved)} state(s), their records are skipped: {', '.join(unresolved)}")
+        resolved = training_df.loc[~is_unresolved]
+        print(f"✅ Soil profiles joined for {resolved['state'].nunique()} state(s), "
+              f"rows per source: {resolved['soil_source'].value_counts().to_dict()}")
+
+    training_df.dropna(inplace=True)
+    return training_df
 
 # ==============================================================================
 # PART 2: MODEL TRAINING FUNCTION
 # ==============================================================================
 
-def train_model(df):
+FEATURES = ['area', 'annual_rainfall', 'ph', 'nitrogen_kg_ha', 'phosphorus_kg_ha', 'potassium_kg_ha', 'organic_carbon_percent', 'crop', 'season']
+TARGET = 'yield'
+
+CATEGORICAL_FEATURES = ['crop', 'season', 'state']
+
+def build_feature_matrix(df, features=FEATURES):
     """
-    Trains the RandomForestRegressor model and returns the model and its columns.
+    One-hot encodes the training frame. Returns (X, y), or (None, None) if a
+    required column is missing.
     """
-    print("\n--- 3. Training AI Model ---")
-    features = ['area', 'annual_rainfall', 'ph', 'nitrogen_kg_ha', 'phosphorus_kg_ha', 'potassium_kg_ha', 'organic_carbon_percent', 'crop', 'season']
-    target = 'yield'
-    
     for col in features:
         if col not in df.columns:
             print(f"❌ ERROR: Missing required column '{col}' in the dataset.")
             return None, None
 
-    X_raw = df[features]
-    y = df[target]
+    X_raw = df[features].copy()
+    y = df[TARGET]
     
-    # One-hot encode categorical features
-    X = pd.get_dummies(X_raw, columns=['crop', 'season'], drop_first=True)
+    # One-hot encode categorical features (only the levels present, e.g. in one state's shard)
+    categorical = [col for col in CATEGORICAL_FEATURES if col in features]
+    for col in categorical:
+        if isinstance(X_raw[col].dtype, pd.CategoricalDtype):
+            X_raw[col] = X_raw[col].cat.remove_unused_categories()
+    X = pd.get_dummies(X_raw, columns=categorical, drop_first=True)
+    return X, y
+
+def train_model(df, model_params=None, features=FEATURES, return_metrics=False):
+    """
+    Trains the RandomForestRegressor model and returns the model and its columns.
+    model_params overrides the default hyperparameters (e.g. the best ones from --search).
+    With return_metrics=True, a dict of hold-out metrics is returned as a third value.
+    """
+    print("\n--- 3. Training AI Model ---")
+    X, y = build_feature_matrix(df, features)
+    if X is None:
+        return (None, None, None) if return_metrics else (None, None)
     
     # Get the column names AFTER one-hot encoding
     trained_columns = X.columns
     
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+    params = {"n_estimators": 100, "n_jobs": -1, **(model_params or {})}
+    model = RandomForestRegressor(random_state=42, **params)
+    fit_start = time.perf_counter()
     model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_start
     print("✅ Model training complete.")
     
     y_pred = model.predict(X_test)
@@ -78,33 +119,162 @@ def train_model(df):
     print(f" 	-> Model R-squared (R²): {r2:.4f}")
     
     # Return the trained model AND the list of columns it was trained on
+    if return_metrics:
+        metrics = {"r2": float(r2), "train_rows": len(X_train), "test_rows": len(X_test), "fit_seconds": fit_seconds}
+        return model, trained_columns, metrics
     return model, trained_columns
 
+def build_model_payload(model, trained_columns, training_df, features=FEATURES):
+    # Categories are saved too, since drop_first leaves one level of each without a column
+    return {
+        "model": model,
+        "columns": list(trained_columns),
+        "categories": {col: sorted(training_df[col].unique()) for col in CATEGORICAL_FEATURES if col in features},
+    }
+
+# ==============================================================================
+# PART 2b: PER-STATE MODEL BUNDLE
+# ==============================================================================
+
+NATIONAL_FEATURES = FEATURES + ['state']
+MIN_SHARD_ROWS = 200              # States with fewer usable rows are served by the national model
+MIN_SHARD_R2 = 0.5                # Shards scoring below this on their hold-out set are not routed to
+
+def _fit_shard(shard, shard_df, features, model_params, path):
+    """Trains one shard and writes its payload. Runs in a worker process."""
+    start = time.perf_counter()
+    model, trained_columns, metrics = train_model(shard_df, model_params, features, return_metrics=True)
+    joblib.dump(build_model_payload(model, trained_columns, shard_df, features), path)
+    return shard, {**metrics, "wall_seconds": time.perf_counter() - start}
+
+def train_model_bundle(states=None, model_params=None, max_workers=None, min_shard_rows=MIN_SHARD_ROWS,
+                       national=True, use_remote_soil=True, bundle_root=yield_model_bundle.BUNDLE_ROOT):
+    """
+    Trains one model per state (with at least min_shard_rows rows) and a
+    national model with the state as a feature, in parallel on a process pool,
+    then writes and publishes a versioned bundle with a manifest.
+    Returns the bundle directory, or None if there was no training data.
+    """
+    start = time.perf_counter()
+    training_df = prepare_training_data(states=states, use_remote_soil=use_remote_soil)
+    if training_df is None or training_df.empty:
+        return None
+
+    version = yield_model_bundle.new_version()
+    bundle_dir = os.path.join(bundle_root, version)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    rows_per_state = training_df['state'].value_counts()
+    shard_states = sorted(rows_per_state[rows_per_state >= min_shard_rows].index)
+    jobs = {state: (training_df[training_df['state'] == state], FEATURES, state) for state in shard_states}
+    if national:
+        jobs[yield_model_bundle.NATIONAL_SHARD] = (training_df, NATIONAL_FEATURES, None)
+
+    # One core per fit; the shards themselves run side by side (the national model first, as it is the largest)
+    shard_params = {**(model_params or {}), "n_jobs": 1}
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"--- Training {len(jobs)} shard(s) on {max_workers} worker(s) ---")
+    shards = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_fit_shard, shard, df, features, shard_params,
+                        os.path.join(bundle_dir, yield_model_bundle.shard_file_name(shard)))
+            for shard, (df, features, _) in sorted(jobs.items(), key=lambda job: -len(job[1][0]))
+        ]
+        for future in as_completed(futures):
+            shard, metrics = future.result()
+            df, features, state = jobs[shard]
+            shards[shard] = {
+                "file": yield_model_bundle.shard_file_name(shard),
+                "state": state,
+                "features": features,
+                "rows": len(df),
+                **metrics,
+                "routable": state is not None and metrics["r2"] >= MIN_SHARD_R2,
+            }
+            print(f"  ✅ {shard}: {len(df)} rows, R² {metrics['r2']:.4f} in {metrics['wall_seconds']:.1f}s")
+
+    wall_seconds = time.perf_counter() - start
+    yield_model_bundle.write_manifest(bundle_dir, {
+        "version": version,
+        "created_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "national_shard": yield_model_bundle.NATIONAL_SHARD if national else None,
+        "shards": dict(sorted(shards.items())),
+        "training": {
+            "states": sorted(training_df['state'].unique()),
+            "min_shard_rows": min_shard_rows,
+            "model_params": model_params or {},
+            "workers": max_workers,
+            "wall_seconds": wall_seconds,
+            "sum_fit_seconds": sum(info["wall_seconds"] for info in shards.values()),
+        },
+    })
+    yield_model_bundle.publish_bundle(version, bundle_root)
+    print(f"--- Bundle {version} published with {len(shards)} shard(s) in {wall_seconds:.1f}s: {bundle_dir} ---")
+    return bundle_dir
+
 # ==============================================================================
 # PART 3: MAIN EXECUTION BLOCK
 # ==============================================================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the crop yield model.")
+    parser.add_argument("--search", action="store_true", help="Run the resumable k-fold hyperparameter search first.")
+    parser.add_argument("--folds", type=int, default=5, help="CV folds per search trial.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --search/--bundle (default: all cores).")
+    parser.add_argument("--max-trials", type=int, default=None, help="Search a random subset of the grid.")
+    parser.add_argument("--run-dir", default=None, help="Checkpoint/report directory of the search.")
+    parser.add_argument("--fresh", action="store_true", help="Discard the search checkpoints and start over.")
+    parser.add_argument("--refit", action="store_true", help="After --search, train and save the model with the best parameters.")
+    parser.add_argument("--states", default=",".join(TRAINING_STATES),
+                        help="Comma-separated states to train on, or 'all' for the national dataset.")
+    parser.add_argument("--offline-soil", action="store_true", help="Use only the local soil CSV (no ISRIC/Bhuvan).")
+    parser.add_argument("--bundle", action="store_true",
+                        help="Train per-state models and a national model in parallel into a versioned bundle.")
+    parser.add_argument("--min-shard-rows", type=int, default=MIN_SHARD_ROWS,
+                        help="Smallest state that gets its own model in --bundle mode.")
+    parser.add_argument("--no-national", action="store_true", help="Skip the national model in --bundle mode.")
+    args = parser.parse_args()
+    states = None if args.states.strip().lower() == "all" else [s.strip() for s in args.states.split(",")]
+
+    if args.bundle:
+        bundle_dir = train_model_bundle(states, max_workers=args.workers, min_shard_rows=args.min_shard_rows,
+                                        national=not args.no_national, use_remote_soil=not args.offline_soil)
+        raise SystemExit(0 if bundle_dir else 1)
+
     print("--- Preparing data for model training ---")
-    soil_data = get_state_average_fallback()
+    training_df = prepare_training_data(states=states, use_remote_soil=not args.offline_soil)
+
+    if training_df is not None and not training_df.empty:
+        best = None
+        if args.search:
+            from src.ml import yield_model_search
 
-    if not soil_data.empty:
-        training_df = prepare_training_data(soil_data)
+            X, y = build_feature_matrix(training_df)
+            run_dir = args.run_dir or yield_model_search.DEFAULT_RUN_DIR
+            leaderboard = yield_model_search.run_search(
+                X, y, folds=args.folds, max_workers=args.workers, max_trials=args.max_trials,
+                run_dir=run_dir, fresh=args.fresh,
+            )
+            print(leaderboard.head(10).to_string(index=False))
+            if not args.refit:
+                raise SystemExit(0)
+            best = yield_model_search.best_params(leaderboard, run_dir)
+            print(f"--- Refitting with the best parameters: {best} ---")
+
+        # Call the training function and receive the model and columns
+        model, trained_columns = train_model(training_df, best)
         
-        if training_df is not None:
-            # Call the training function and receive the model and columns
-            model, trained_columns = train_model(training_df)
+        # Now, create the payload and save it
+        if model and trained_columns is not None:
+            model_payload = build_model_payload(model, trained_columns, training_df)
+            
+            model_registry.save_model(model_payload, 'models/crop_yield_model.joblib')
             
-            # Now, create the payload and save it
-            if model and trained_columns is not None:
-                model_payload = {"model": model, "columns": list(trained_columns)}
-                
-                joblib.dump(model_payload, 'models/crop_yield_model.joblib')
-                
-                print("\n✅✅✅")
-                print("Model training successful.")
-                print("Saved to 'models/crop_yield_model.joblib'")
-                print("✅✅✅")
-            else:
-                print("\n❌ CRITICAL ERROR: Model training failed. Model not saved.")
+            print("\n✅✅✅")
+            print("Model training successful.")
+            print("Saved to 'models/crop_yield_model.joblib'")
+            print("✅✅✅")
+        else:
+            print("\n❌ CRITICAL ERROR: Model training failed. Model not saved.")
     else:
-        print("\n❌ CRITICAL ERROR: Could not load soil data for training. Aborting.")
\ No newline at end of file
+        print("\n❌ CRITICAL ERROR: No training data with soil profiles. Aborting.")
@@ -0,0 +1,109 @@
+# src/ml/yield_model_bundle.py
+"""
+Versioned bundles of per-state yield models.
+
+A bundle is a directory models/yield_bundles/<version>/ holding one joblib
+payload per shard (one per state with enough data, plus a national model
+that has the state as a feature) and a manifest.json describing them. The
+file models/yield_bundles/CURRENT names the published version. It is
+replaced atomically once a bundle is complete, so readers never see a
+partial bundle.
+
+Routing: a row goes to the shard of its state, or to the national shard
+(with its state filled in as a feature) when that state has no shard or
+its shard scored too poorly in training to be used.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+from src.ml import model_registry
+
+BUNDLE_ROOT = 'models/yield_bundles'
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+NATIONAL_SHARD = 'national'
+BUNDLE_FORMAT_VERSION = 1
+
+_warned_untrained = set()        # (bundle version, state) pairs already reported by warn_untrained_states
+_warned_lock = threading.Lock()
+
+
+# --- WRITING ---
+def new_version():
+    return time.strftime('%Y%m%d-%H%M%S')
+
+def shard_file_name(shard):
+    return re.sub(r'[^a-z0-9]+', '_', shard.lower()).strip('_') + '.joblib'
+
+def write_manifest(bundle_dir, manifest):
+    with open(os.path.join(bundle_dir, MANIFEST_FILE), 'w') as f:
+        json.dump({"format_version": BUNDLE_FORMAT_VERSION, **manifest}, f, indent=2)
+
+def publish_bundle(version, root=BUNDLE_ROOT):
+    """Points CURRENT at version (atomic replace)."""
+    tmp_path = os.path.join(root, f".{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(tmp_path, 'w') as f:
+        f.write(version + "\n")
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+
+# --- READING ---
+def _read_pointer(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+def _read_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def current_bundle_dir(root=BUNDLE_ROOT):
+    """Directory of the published bundle, or None if nothing has been published."""
+    pointer = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(pointer):
+        return None
+    return os.path.join(root, model_registry.get_model(pointer, loader=_read_pointer))
+
+def load_manifest(bundle_dir):
+    """The bundle's manifest (cached by the model registry, reloaded if the file changes)."""
+    return model_registry.get_model(os.path.join(bundle_dir, MANIFEST_FILE), loader=_read_json)
+
+def load_shard_payload(bundle_dir, manifest, shard, mmap_mode=None):
+    return model_registry.get_model(os.path.join(bundle_dir, manifest["shards"][shard]["file"]),
+                                    mmap_mode=mmap_mode)
+
+def route_shards(manifest, states):
+    """
+    Shard name for each state: the state's own shard if it has a routable
+    one, otherwise the national shard.
+    """
+    state_shards = {info["state"]: name for name, info in manifest["shards"].items()
+                    if info.get("state") and info.get("routable", True)}
+    national = manifest.get("national_shard")
+    routed = []
+    for state in states:
+        shard = state_shards.get(state, national)
+        if shard is None:
+            raise ValueError(f"Model bundle has no shard for state '{state}' and no national model.")
+        routed.append(shard)
+    return routed
+
+def warn_untrained_states(manifest, states):
+    """
+    Reports (once per bundle version and state) states that had no rows in
+    the bundle's training data: the national shard still answers for them,
+    but it has never seen that state, so its predictions are extrapolated.
+    Returns the untrained states among states.
+    """
+    trained = set(manifest.get("training", {}).get("states", []))
+    untrained = sorted({state for state in states if state not in trained})
+    with _warned_lock:
+        new = [state for state in untrained if (manifest.get("version"), state) not in _warned_untrained]
+        _warned_untrained.update((manifest.get("version"), state) for state in new)
+    if new:
+        print(f"⚠️ No training data for {', '.join(map(str, new))} in model bundle {manifest.get('version')}; "
+              f"the national model's predictions there are extrapolated.")
+    return untrained
@@ -0,0 +1,246 @@
+# src/ml/yield_model_search.py
+"""
+Resumable k-fold hyperparameter search for the yield RandomForest.
+
+Trials (one hyperparameter combination, scored with k-fold CV) run on a
+process pool. Each finished trial is appended to a JSONL checkpoint, so an
+interrupted search picks up where it stopped when run again with the same
+run directory. A leaderboard (CSV) and a timing report (JSON) are written at
+the end.
+
+Usage:
+    python -m src.ml.train_yield_model --search --folds 5 --workers 8
+    python -m src.ml.train_yield_model --search --max-trials 20 --refit
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+
+DEFAULT_RUN_DIR = 'models/search/yield'
+DEFAULT_FOLDS = 5
+SEARCH_SEED = 42
+
+PARAM_GRID = {
+    "n_estimators": [100, 200, 400],
+    "max_depth": [None, 20, 40],
+    "min_samples_leaf": [1, 2, 5],
+    "max_features": [1.0, 0.5, "sqrt"],
+}
+
+TRIALS_FILE = "trials.jsonl"
+CONFIG_FILE = "search_config.json"
+LEADERBOARD_FILE = "leaderboard.csv"
+TIMING_FILE = "timing_report.json"
+
+# Training data for the current worker process, set once by _init_worker
+_worker_data = {}
+
+
+# --- SEARCH SPACE ---
+def expand_grid(param_grid=PARAM_GRID, max_trials=None, seed=SEARCH_SEED):
+    """All combinations of the grid, or a reproducible random subset of max_trials of them."""
+    names = sorted(param_grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+    if max_trials is not None and max_trials < len(combos):
+        chosen = np.random.default_rng(seed).choice(len(combos), size=max_trials, replace=False)
+        combos = [combos[i] for i in sorted(chosen)]
+    return combos
+
+def trial_id(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+def data_fingerprint(X, y, folds):
+    # Checkpoints are only valid for the same data and fold layout
+    digest = hashlib.sha1()
+    digest.update(",".join(map(str, X.columns)).encode())
+    digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(f"folds={folds};seed={SEARCH_SEED}".encode())
+    return digest.hexdigest()
+
+
+# --- ONE TRIAL (runs in a worker process) ---
+def _init_worker(X, y, folds):
+    _worker_data["X"], _worker_data["y"], _worker_data["folds"] = X, y, folds
+
+def run_trial(params):
+    """Scores one parameter set with k-fold CV on the worker's data. Returns a result record."""
+    X, y, folds = _worker_data["X"], _worker_data["y"], _worker_data["folds"]
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    r2_scores, rmse_scores, fit_s, predict_s = [], [], 0.0, 0.0
+
+    for train_idx, test_idx in KFold(n_splits=folds, shuffle=True, random_state=SEARCH_SEED).split(X):
+        # One core per trial; parallelism comes from running trials side by side
+        model = RandomForestRegressor(random_state=SEARCH_SEED, n_jobs=1, **params)
+        t0 = time.perf_counter()
+        model.fit(X[train_idx], y[train_idx])
+        t1 = time.perf_counter()
+        pred = model.predict(X[test_idx])
+        predict_s += time.perf_counter() - t1
+        fit_s += t1 - t0
+        r2_scores.append(r2_score(y[test_idx], pred))
+        rmse_scores.append(float(np.sqrt(mean_squared_error(y[test_idx], pred))))
+
+    return {
+        "trial_id": trial_id(params),
+        "params": params,
+        "mean_r2": float(np.mean(r2_scores)),
+        "std_r2": float(np.std(r2_scores)),
+        "mean_rmse": float(np.mean(rmse_scores)),
+        "fold_r2": [float(s) for s in r2_scores],
+        "fit_seconds": fit_s,
+        "predict_seconds": predict_s,
+        "wall_seconds": time.perf_counter() - start,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "worker_pid": os.getpid(),
+    }
+
+
+# --- CHECKPOINTS ---
+def load_checkpoint(run_dir):
+    """Returns {trial_id: record} for the trials already finished in run_dir."""
+    path = os.path.join(run_dir, TRIALS_FILE)
+    done = {}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A line cut short by an interruption; that trial simply reruns
+                done[record["trial_id"]] = record
+    return done
+
+def _append_checkpoint(run_dir, record):
+    with open(os.path.join(run_dir, TRIALS_FILE), 'a') as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _prepare_run_dir(run_dir, fingerprint, fresh):
+    os.makedirs(run_dir, exist_ok=True)
+    config_path = os.path.join(run_dir, CONFIG_FILE)
+    if fresh:
+        for name in (TRIALS_FILE, LEADERBOARD_FILE, TIMING_FILE):
+            if os.path.exists(os.path.join(run_dir, name)):
+                os.remove(os.path.join(run_dir, name))
+    elif os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            previous = json.load(f).get("data_fingerprint")
+        if previous != fingerprint and os.path.exists(os.path.join(run_dir, TRIALS_FILE)):
+            raise ValueError(
+                f"Checkpoint in '{run_dir}' was made with different training data or folds. "
+                "Use a new run directory or start fresh."
+            )
+    with open(config_path, 'w') as f:
+        json.dump({"data_fingerprint": fingerprint}, f)
+
+
+# --- REPORTS ---
+def build_leaderboard(records):
+    rows = [{"trial_id": r["trial_id"], **{f"param_{k}": v for k, v in r["params"].items()},
+             "mean_r2": r["mean_r2"], "std_r2": r["std_r2"], "mean_rmse": r["mean_rmse"],
+             "wall_seconds": r["wall_seconds"]} for r in records]
+    leaderboard = pd.DataFrame(rows)
+    if not leaderboard.empty:
+        leaderboard = leaderboard.sort_values(["mean_r2", "wall_seconds"], ascending=[False, True]).reset_index(drop=True)
+        leaderboard.insert(0, "rank", np.arange(1, len(leaderboard) + 1))
+    return leaderboard
+
+
+# --- THE SEARCH ---
+def run_search(X, y, param_grid=PARAM_GRID, folds=DEFAULT_FOLDS, max_workers=None, max_trials=None,
+               run_dir=DEFAULT_RUN_DIR, fresh=False):
+    """
+    Runs (or resumes) the hyperparameter search.
+
+    Args:
+        X (pd.DataFrame): One-hot encoded features (see train_yield_model.build_feature_matrix).
+        y (pd.Series): Target yields.
+        max_workers (int): Worker processes; defaults to all cores.
+        max_trials (int): Evaluate a random subset of the grid.
+        run_dir (str): Where checkpoints, leaderboard and timing report are kept.
+        fresh (bool): Discard existing checkpoints in run_dir.
+    Returns:
+        pd.DataFrame: The leaderboard, best trial first.
+    """
+    start = time.perf_counter()
+    max_workers = max_workers or os.cpu_count() or 1
+    _prepare_run_dir(run_dir, data_fingerprint(X, y, folds), fresh)
+
+    trials = expand_grid(param_grid, max_trials)
+    done = load_checkpoint(run_dir)
+    wanted = {trial_id(p) for p in trials}
+    pending = [p for p in trials if trial_id(p) not in done]
+    print(f"--- Hyperparameter search: {len(trials)} trials x {folds} folds, "
+          f"{len(trials) - len(pending)} already done, {len(pending)} to run on {max_workers} workers ---")
+
+    X_values = X.to_numpy(dtype=np.float32)
+    y_values = y.to_numpy(dtype=np.float64)
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(X_values, y_values, folds)) as pool:
+            futures = {pool.submit(run_trial, params): params for params in pending}
+            for i, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                _append_checkpoint(run_dir, record)
+                done[record["trial_id"]] = record
+                print(f"  [{i}/{len(pending)}] R² {record['mean_r2']:.4f} ± {record['std_r2']:.4f} "
+                      f"in {record['wall_seconds']:.1f}s  {record['params']}")
+
+    records = [done[t] for t in done if t in wanted]
+    leaderboard = build_leaderboard(records)
+    leaderboard.to_csv(os.path.join(run_dir, LEADERBOARD_FILE), index=False)
+
+    wall = time.perf_counter() - start
+    pending_ids = {trial_id(p) for p in pending}
+    ran = [r for r in records if r["trial_id"] in pending_ids]
+    if not ran:
+        # A resumed run with nothing left to do keeps the timing report of the runs that did the work
+        print(f"--- Search already complete; leaderboard in '{run_dir}', timing report left as it was ---")
+        return leaderboard
+
+    trial_seconds = sum(r["wall_seconds"] for r in ran)
+    timing = {
+        "total_wall_seconds": wall,
+        "workers": max_workers,
+        "trials_total": len(trials),
+        "trials_run": len(ran),
+        "trials_resumed": len(trials) - len(pending),
+        "folds": folds,
+        "sum_trial_seconds": trial_seconds,
+        "mean_trial_seconds": trial_seconds / len(ran),
+        "parallel_speedup": trial_seconds / wall if wall > 0 else 0.0,
+        "fit_seconds": sum(r["fit_seconds"] for r in ran),
+        "predict_seconds": sum(r["predict_seconds"] for r in ran),
+    }
+    with open(os.path.join(run_dir, TIMING_FILE), 'w') as f:
+        json.dump(timing, f, indent=2)
+
+    print(f"--- Search finished in {wall:.1f}s (speedup x{timing['parallel_speedup']:.1f}); "
+          f"leaderboard and timing report in '{run_dir}' ---")
+    return leaderboard
+
+def best_params(leaderboard, run_dir=DEFAULT_RUN_DIR):
+    """
+    Hyperparameters of the top leaderboard trial, read back from the checkpoint (exact types, None kept).
+    Raises ValueError if the leaderboard is empty (an empty grid, or no trial finished).
+    """
+    if leaderboard.empty:
+        raise ValueError(f"The search leaderboard in '{run_dir}' is empty: no trial finished, so there are no best "
+                         f"parameters. Check the parameter grid or rerun the search.")
+    return load_checkpoint(run_dir)[leaderboard.iloc[0]["trial_id"]]["params"]
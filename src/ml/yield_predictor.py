@@ -1,21 +1,139 @@
-import joblib
+import warnings
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
+from src.data_ingestion import soil_join
+from src.ml import model_registry, yield_model_bundle
+
 # Path to your saved model
 MODEL_PATH = "models/crop_yield_model.joblib"
 
-def load_model_payload():
-    """Loads the saved model and its associated column data."""
-    return joblib.load(MODEL_PATH)
+def load_model_payload(mmap_mode=None):
+    """
+    Returns the saved model and its associated column data. Loaded once per
+    process and reloaded automatically when the model file is replaced.
+    """
+    return model_registry.get_model(MODEL_PATH, mmap_mode=mmap_mode)
+
+# --- Feature Encoding ---
+@lru_cache(maxsize=8)
+def compile_feature_encoder(model_columns):
+    """
+    Precomputes the column layout of the model's feature matrix from the
+    trained column names (a tuple), so rows can be encoded without
+    pd.get_dummies/reindex. One-hot columns are named "<feature>_<value>",
+    exactly as pd.get_dummies names them.
+    """
+    return {
+        "columns": model_columns,
+        "positions": {name: i for i, name in enumerate(model_columns)},
+    }
+
+def encode_features(input_df, encoder):
+    """
+    Encodes a frame of raw features straight into a preallocated float32
+    matrix laid out like the training data. Equivalent to
+    pd.get_dummies(input_df).reindex(columns=model_columns, fill_value=0):
+    text columns are one-hot encoded, numeric columns are copied, and
+    anything the model was not trained on is ignored.
+    """
+    positions = encoder["positions"]
+    X = np.zeros((len(input_df), len(positions)), dtype=np.float32)
+    for col in input_df.columns:
+        values = input_df[col]
+        if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values) \
+                or isinstance(values.dtype, pd.CategoricalDtype):
+            # One category lookup per distinct value, then a single scatter
+            codes, uniques = pd.factorize(values)
+            target = np.array([positions.get(f"{col}_{value}", -1) for value in uniques] + [-1])
+            cols = target[codes]                   # code -1 (missing value) maps to the trailing -1
+            rows = np.flatnonzero(cols >= 0)
+            X[rows, cols[rows]] = 1.0
+        elif col in positions:
+            X[:, positions[col]] = values.to_numpy(dtype=np.float32)
+    return X
+
+def _with_payload_defaults(input_df, model_payload):
+    # Feature values fixed by the payload (e.g. the state for a national model) unless the rows carry their own
+    defaults = model_payload.get("defaults") or {}
+    missing = {col: value for col, value in defaults.items() if col not in input_df.columns}
+    return input_df.assign(**missing) if missing else input_df
+
+# --- Prediction ---
+def predict_batch(input_df, model_payload):
+    """
+    Predicts yields for every row of input_df with one model.predict call.
+    Returns a NumPy array with one prediction per row.
+    """
+    encoder = compile_feature_encoder(tuple(model_payload["columns"]))
+    X = encode_features(_with_payload_defaults(input_df, model_payload), encoder)
+    with warnings.catch_warnings():
+        # The model was fitted on a DataFrame; the encoded matrix has the same column order
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model_payload["model"].predict(X)
+
+def predict_batch_per_tree(input_df, model_payload):
+    """
+    Per-tree predictions of the forest for every row, shape (rows, trees).
+    Their mean is predict_batch(); their spread reflects model uncertainty.
+    """
+    encoder = compile_feature_encoder(tuple(model_payload["columns"]))
+    X = encode_features(_with_payload_defaults(input_df, model_payload), encoder)
+    model = model_payload["model"]
+    if hasattr(model, "predict_trees"):
+        return model.predict_trees(X)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return np.column_stack([tree.predict(X) for tree in model.estimators_])
 
 def make_prediction(input_df, model_payload):
     """Uses the loaded model to make a yield prediction."""
-    model = model_payload["model"]
-    model_columns = model_payload["columns"]
+    return predict_batch(input_df, model_payload)[0]
+
+# --- Per-State Model Bundles ---
+def _bundle_payload(bundle_dir, manifest, shard, state, mmap_mode=None):
+    payload = yield_model_bundle.load_shard_payload(bundle_dir, manifest, shard, mmap_mode)
+    if shard == manifest.get("national_shard"):
+        # The national model takes the state as a feature
+        payload = {**payload, "defaults": {"state": state}}
+    return payload
+
+def load_payload_for_location(lat, lon, mmap_mode=None):
+    """
+    Returns the model payload for a farm: the shard of its state from the
+    published model bundle (see yield_model_bundle), or the single saved
+    model when no bundle has been published.
+    """
+    bundle_dir = yield_model_bundle.current_bundle_dir()
+    if bundle_dir is None:
+        return load_model_payload(mmap_mode)
+    manifest = yield_model_bundle.load_manifest(bundle_dir)
+    state = soil_join.nearest_states([lat], [lon])[0]
+    shard = yield_model_bundle.route_shards(manifest, [state])[0]
+    yield_model_bundle.warn_untrained_states(manifest, [state])
+    return _bundle_payload(bundle_dir, manifest, shard, state, mmap_mode)
 
-    # Ensure the input data has the same columns as the training data
-    input_processed = pd.get_dummies(input_df)
-    input_processed = input_processed.reindex(columns=model_columns, fill_value=0)
+def predict_batch_routed(input_df, lats=None, lons=None, states=None, mmap_mode=None):
+    """
+    Predicts every row with the bundle shard of its state. States are given
+    directly or located from lats/lons. Rows are grouped so each shard is
+    called once. Returns (predictions, shard name per row).
+    """
+    bundle_dir = yield_model_bundle.current_bundle_dir()
+    if bundle_dir is None:
+        raise FileNotFoundError(f"No model bundle has been published under '{yield_model_bundle.BUNDLE_ROOT}'.")
+    manifest = yield_model_bundle.load_manifest(bundle_dir)
+    if states is None:
+        states = soil_join.nearest_states(lats, lons)
+    states = np.asarray(states, dtype=object)
+    shards = np.asarray(yield_model_bundle.route_shards(manifest, states), dtype=object)
+    yield_model_bundle.warn_untrained_states(manifest, pd.unique(states))
 
-    prediction = model.predict(input_processed)
-    return prediction[0]
+    predictions = np.empty(len(input_df))
+    for shard in pd.unique(shards):
+        rows = np.flatnonzero(shards == shard)
+        group = input_df.iloc[rows].assign(state=states[rows])
+        predictions[rows] = predict_batch(group, _bundle_payload(bundle_dir, manifest, shard, None, mmap_mode))
+    return predictions, shards
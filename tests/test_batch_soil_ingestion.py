@@ -0,0 +1,37 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.irrigation_planner import plan_irrigation
+from src.data_ingestion.batch_soil_ingestion import get_smart_soil_data_batch
+from src.data_ingestion.smart_soil_ingestion import SOIL_COLUMNS
+
+
+def test_empty_coordinates_give_an_empty_frame_with_the_soil_columns():
+    for coords in (pd.DataFrame({'lat': [], 'lon': []}), np.empty((0, 2))):
+        result = get_smart_soil_data_batch(coords, use_cache=False)
+        assert result.empty
+        assert list(result.columns) == ['lat', 'lon', 'cell_lat', 'cell_lon', *SOIL_COLUMNS, 'tier']
+
+
+def test_empty_farm_list_gives_no_plans():
+    plans = plan_irrigation(pd.DataFrame({'lat': [], 'lon': []}), api_key="unused", use_remote_tiers=False)
+    assert plans.empty
+    assert {'soil_type', 'soil_tier', 'advice', 'next_action'} <= set(plans.columns)
+
+
+def test_invalid_coordinates_are_flagged_instead_of_failing_the_batch(tmp_path, monkeypatch):
+    from src.data_ingestion import soil_cache
+    from src.data_ingestion.smart_soil_ingestion import TIER_INVALID_COORDINATES
+
+    db_path = str(tmp_path / 'soil.sqlite')
+    monkeypatch.setattr(soil_cache, 'get_cached_soil', functools.partial(soil_cache.get_cached_soil, db_path=db_path))
+    monkeypatch.setattr(soil_cache, 'put_cached_soil', functools.partial(soil_cache.put_cached_soil, db_path=db_path))
+    coords = pd.DataFrame({'lat': [20.3, np.nan, 95.0], 'lon': [85.8, 85.0, 85.0]})
+    for use_cache in (True, False):
+        result = get_smart_soil_data_batch(coords, use_cache=use_cache, use_remote_tiers=False)
+        assert result['tier'].tolist()[1:] == [TIER_INVALID_COORDINATES] * 2
+        assert result['tier'].iloc[0] != TIER_INVALID_COORDINATES
+        assert result.loc[1:, SOIL_COLUMNS].isna().all().all()
+        assert result.loc[0, SOIL_COLUMNS].notna().any()
@@ -0,0 +1,38 @@
+import os
+
+import pandas as pd
+
+from src.data_ingestion import crop_dataset
+
+CSV_HEADER = "Crop,Crop_Year,Season,State,Area,Production,Annual_Rainfall,Fertilizer,Pesticide,Yield\n"
+
+
+def _write_csv(path, rows):
+    with open(path, 'w') as f:
+        f.write(CSV_HEADER + "".join(row + "\n" for row in rows))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + len(rows) * 1_000_000_000))
+
+
+def test_rebuilds_publish_a_new_version_and_keep_only_the_previous_one(tmp_path):
+    csv_path, cache_dir = str(tmp_path / 'crop.csv'), str(tmp_path / 'cache')
+    versions = []
+    for n in (1, 2, 3):
+        _write_csv(csv_path, ["Rice,2000,Kharif     ,Odisha,10,20,1500,100,5,2.0"] * n)
+        df = crop_dataset.load_crop_data(csv_path=csv_path, cache_dir=cache_dir)
+        assert len(df) == n
+        versions.append(os.path.basename(crop_dataset.current_cache_dir(cache_dir)))
+
+    assert len(set(versions)) == 3
+    assert sorted(os.listdir(cache_dir)) == sorted([crop_dataset.CURRENT_FILE, *versions[1:]])
+
+
+def test_legacy_unversioned_cache_is_replaced(tmp_path):
+    csv_path, cache_dir = str(tmp_path / 'crop.csv'), tmp_path / 'cache'
+    _write_csv(csv_path, ["Wheat,2001,Rabi,Punjab,10,40,600,100,5,4.0"])
+    (cache_dir / 'state=Punjab').mkdir(parents=True)
+    (cache_dir / crop_dataset.MANIFEST_FILE).write_text("{}")
+
+    df = crop_dataset.load_crop_data(states="Punjab", csv_path=csv_path, cache_dir=str(cache_dir))
+    assert df['crop'].tolist() == ['Wheat'] and isinstance(df['crop'].dtype, pd.CategoricalDtype)
+    assert 'state=Punjab' not in os.listdir(cache_dir)
@@ -0,0 +1,50 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from src.ml import forest_export, model_registry
+
+
+@pytest.fixture(scope="module")
+def forest_and_rows():
+    rng = np.random.default_rng(0)
+    X = rng.random((400, 5))
+    y = 3 * X[:, 0] + X[:, 1] ** 2 + rng.normal(0, 0.1, 400)
+    X[rng.random(X.shape) < 0.1] = np.nan       # Trained with missing values, so splits learn missing_go_to_left
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+
+    X_test = rng.random((300, 5))
+    X_test[rng.random(X_test.shape) < 0.2] = np.nan
+    return model, X_test
+
+
+def test_flat_forest_matches_sklearn_with_missing_values(forest_and_rows):
+    model, X = forest_and_rows
+    flat = forest_export.flatten_forest(model)
+    assert flat.missing_left.any()
+    assert np.allclose(flat.predict(X), model.predict(X))
+    assert forest_export.check_fidelity(model, flat, X) < 1e-9
+
+
+def test_flat_forest_handles_an_empty_input(forest_and_rows):
+    model, X = forest_and_rows
+    flat = forest_export.flatten_forest(model)
+    assert flat.predict(X[:0]).shape == (0,)
+    assert flat.predict_trees(X[:0]).shape == (0, len(model.estimators_))
+    assert forest_export.check_fidelity(model, flat, X[:0]) == 0.0
+
+
+def test_export_round_trip_keeps_the_payload(forest_and_rows, tmp_path):
+    model, X = forest_and_rows
+    model_path, flat_path = str(tmp_path / 'model.joblib'), str(tmp_path / 'model_flat.joblib')
+    joblib.dump({"model": model, "columns": [f"f{i}" for i in range(5)], "trained_states": ["Odisha"]}, model_path)
+
+    forest_export.export_yield_model(model_path, flat_path)
+    try:
+        loaded = forest_export.load_flat_model_payload(mmap_mode="r", flat_path=flat_path)
+        assert isinstance(loaded["model"], forest_export.FlatForest)
+        assert loaded["columns"] == [f"f{i}" for i in range(5)] and loaded["trained_states"] == ["Odisha"]
+        assert np.allclose(loaded["model"].predict(X), model.predict(X))
+    finally:
+        model_registry.evict_model(flat_path)
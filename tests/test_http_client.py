@@ -0,0 +1,47 @@
+import time
+
+import pytest
+import requests
+
+from src.data_ingestion import http_client
+
+
+class FlakySession:
+    """Fails every request with a connection error and records the timeouts it was given."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.timeouts = []
+
+    def get(self, url, params=None, timeout=None):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        raise requests.exceptions.ConnectionError("refused")
+
+
+@pytest.fixture(autouse=True)
+def no_breakers():
+    http_client.reset_circuit_breakers()
+    yield
+    http_client.reset_circuit_breakers()
+
+
+def test_attempts_get_only_the_time_left_and_stop_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(http_client, '_backoff_delay', lambda attempt, response=None: 0.05)
+    session = FlakySession(delay=0.1)
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        http_client.get("http://soil.example/q", timeout=10, attempts=5, session=session, deadline=start + 0.25)
+
+    assert time.monotonic() - start < 0.4
+    assert len(session.timeouts) < 5
+    assert all(t <= 0.25 for t in session.timeouts)
+    assert session.timeouts == sorted(session.timeouts, reverse=True)
+
+
+def test_without_a_deadline_every_attempt_gets_the_full_timeout(monkeypatch):
+    monkeypatch.setattr(http_client, '_backoff_delay', lambda attempt, response=None: 0.0)
+    session = FlakySession()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        http_client.get("http://soil.example/q", timeout=7, attempts=3, session=session)
+    assert session.timeouts == [7, 7, 7]
@@ -0,0 +1,52 @@
+import functools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import irrigation_planner
+from src.data_ingestion import api_providers, soil_cache
+
+
+@pytest.fixture
+def replay_weather(tmp_path, monkeypatch):
+    # Offline weather and a throwaway soil cache
+    db_path = str(tmp_path / 'soil.sqlite')
+    monkeypatch.setattr(soil_cache, 'get_cached_soil', functools.partial(soil_cache.get_cached_soil, db_path=db_path))
+    monkeypatch.setattr(soil_cache, 'put_cached_soil', functools.partial(soil_cache.put_cached_soil, db_path=db_path))
+    monkeypatch.setenv(api_providers.FIXTURE_DIR_ENV, str(tmp_path / 'fixtures'))
+    api_providers.set_api_mode("replay")
+    yield
+    api_providers.set_api_mode(None)
+
+
+def test_bad_coordinates_get_error_advice_and_the_rest_are_planned(tmp_path, replay_weather):
+    farm_file = tmp_path / 'farms.csv'
+    farm_file.write_text("farm_id,latitude,longitude\n1,20.46,85.88\n2,,85.0\n3,20.47,85.90\n4,abc,85.1\n")
+    farms = irrigation_planner.load_farms(str(farm_file), 'latitude', 'longitude')
+
+    plans = irrigation_planner.plan_irrigation(farms, api_key="unused", use_remote_tiers=False)
+    assert plans['farm_id'].tolist() == [1, 2, 3, 4]
+    bad = plans['farm_id'].isin([2, 4])
+    assert (plans.loc[bad, 'advice'] == irrigation_planner.INVALID_LOCATION_ADVICE).all()
+    assert (plans.loc[bad, 'next_action'] == "none").all()
+    good_advice = plans.loc[~bad, 'advice']
+    assert good_advice.notna().all()
+    assert not good_advice.isin([irrigation_planner.INVALID_LOCATION_ADVICE,
+                                 irrigation_planner.WEATHER_ERROR_ADVICE]).any()
+
+
+def test_malformed_weather_response_only_affects_its_cell(replay_weather, monkeypatch):
+    real_forecast = irrigation_planner.get_weatherapi_forecast
+
+    def flaky_forecast(lat, lon, api_key, days=5):
+        if lat > 21:
+            raise KeyError("forecastday")
+        return real_forecast(lat, lon, api_key, days=days)
+
+    monkeypatch.setattr(irrigation_planner, 'get_weatherapi_forecast', flaky_forecast)
+    farms = pd.DataFrame({'lat': [20.46, 21.5], 'lon': [85.88, 85.0]})
+    plans = irrigation_planner.plan_irrigation(farms, api_key="unused", use_remote_tiers=False)
+    assert plans['advice'].iloc[1] == irrigation_planner.WEATHER_ERROR_ADVICE
+    assert plans['advice'].iloc[0] != irrigation_planner.WEATHER_ERROR_ADVICE
+    assert not np.isnan(plans['weather_cell_lat']).any()
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from src.ml import model_registry
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    model_registry.evict_model()
+    yield
+    model_registry.evict_model()
+
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_save_model_replaces_the_file_and_leaves_no_temp_files(tmp_path):
+    path = str(tmp_path / 'model.joblib')
+    model_registry.save_model({"version": 1}, path)
+    model_registry.save_model({"version": 2}, path)
+    assert os.listdir(tmp_path) == ['model.joblib']
+    assert model_registry.get_model(path) == {"version": 2}
+
+
+def test_failed_reload_keeps_serving_the_previous_model(tmp_path):
+    path = str(tmp_path / 'model.joblib')
+    model_registry.save_model({"version": 1}, path)
+    assert model_registry.get_model(path) == {"version": 1}
+
+    with open(path, 'wb') as f:
+        f.write(b'half-written')
+    _bump_mtime(path)
+    assert model_registry.get_model(path) == {"version": 1}
+
+    model_registry.save_model({"version": 2}, path)
+    _bump_mtime(path)
+    assert model_registry.get_model(path) == {"version": 2}
+
+
+def test_first_load_failure_is_raised(tmp_path):
+    path = str(tmp_path / 'model.joblib')
+    with open(path, 'wb') as f:
+        f.write(b'not a model')
+    with pytest.raises(Exception):
+        model_registry.get_model(path)
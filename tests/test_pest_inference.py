@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.ml import pest_inference, pest_runtime
+
+OUTPUT_SCALE = 1 / 256      # What the TFLite converter uses for an int8 softmax output
+OUTPUT_ZERO_POINT = -128
+
+
+class FakeInt8Interpreter:
+    """Stands in for a TFLite interpreter whose int8 output is a quantized softmax."""
+
+    def __init__(self, model_path=None, num_threads=None):
+        self.outputs = None
+        self.shape = [1, 2, 2, 3]
+
+    def allocate_tensors(self):
+        pass
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array(self.shape), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{'index': 1, 'shape': np.array([self.shape[0], 2]), 'dtype': np.int8,
+                 'quantization': (OUTPUT_SCALE, OUTPUT_ZERO_POINT)}]
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = list(shape)
+
+    def set_tensor(self, index, value):
+        # Image i gets P(class 0) = its mean pixel, quantized the way the converter does it
+        p0 = value.reshape(len(value), -1).mean(axis=1)
+        probabilities = np.stack([p0, 1 - p0], axis=1)
+        self.outputs = np.clip(np.round(probabilities / OUTPUT_SCALE + OUTPUT_ZERO_POINT), -128, 127).astype(np.int8)
+
+    def invoke(self):
+        pass
+
+    def get_tensor(self, index):
+        return self.outputs
+
+
+@pytest.fixture
+def int8_classifier(tmp_path, monkeypatch):
+    monkeypatch.setattr(pest_runtime, '_import_interpreter', lambda: FakeInt8Interpreter)
+    model_path = str(tmp_path / 'pest.tflite')
+    with open(pest_runtime.metadata_path(model_path), 'w') as f:
+        json.dump({"outputs_probabilities": True, "int8": True}, f)
+    return pest_runtime.TFLiteClassifier(model_path)
+
+
+def test_quantized_softmax_is_rescaled_not_softmaxed_again(int8_classifier):
+    batch = np.stack([np.full((2, 2, 3), p, dtype=np.float32) for p in (1.0, 0.75, 0.5)])
+    raw = int8_classifier.predict_on_batch(batch)
+    assert raw[0].sum() == pytest.approx(255 / 256)     # A confident row falls short of 1
+
+    probabilities = pest_inference.predict_probabilities(int8_classifier, batch)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    np.testing.assert_allclose(probabilities[:, 0], [1.0, 0.75, 0.5], atol=2 * OUTPUT_SCALE)
+
+
+def test_rows_are_judged_one_by_one_without_metadata():
+    quantized_row = [255 / 256, 0.0]
+    logits_row = [2.0, -1.0]
+    probabilities = pest_inference._as_probabilities(np.array([quantized_row, logits_row]))
+    np.testing.assert_allclose(probabilities[0], [1.0, 0.0])
+    np.testing.assert_allclose(probabilities[1], np.exp(logits_row) / np.exp(logits_row).sum())
+
+
+def test_flagged_logits_always_go_through_softmax():
+    outputs = np.array([[0.5, 0.5], [3.0, 1.0]])
+    probabilities = pest_inference._as_probabilities(outputs, are_probabilities=False)
+    np.testing.assert_allclose(probabilities[0], [0.5, 0.5])
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from src.ml import pest_inference, pest_model_export, pest_runtime  # noqa: E402
+
+
+def _tiny_classifier():
+    tf.keras.utils.set_random_seed(0)
+    inputs = tf.keras.Input(shape=(16, 16, 3))
+    x = tf.keras.layers.Conv2D(4, 3, activation='relu')(inputs)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(2, activation='softmax')(x)
+    return tf.keras.Model(inputs, outputs)
+
+
+@pytest.mark.parametrize("int8", [False, True])
+def test_tflite_export_matches_keras(tmp_path, int8):
+    model = _tiny_classifier()
+    batch = np.random.default_rng(0).random((12, 16, 16, 3), dtype=np.float32)
+    output_path = str(tmp_path / 'tiny.tflite')
+
+    size = pest_model_export.export_tflite(model, output_path, int8=int8, calibration_batch=batch)
+    assert size > 0
+    assert pest_runtime.load_metadata(output_path) == {"outputs_probabilities": True, "int8": int8}
+
+    classifier = pest_runtime.TFLiteClassifier(output_path)
+    parity = pest_model_export.check_parity(model, classifier, batch, batch_size=5)
+    assert parity["images"] == len(batch)
+    assert parity["max_abs_prob_diff"] < (0.05 if int8 else 1e-4)
+    np.testing.assert_allclose(pest_inference.predict_probabilities(classifier, batch).sum(axis=1), 1.0)
+
+
+def test_int8_export_needs_calibration_images(tmp_path):
+    with pytest.raises(ValueError):
+        pest_model_export.export_tflite(_tiny_classifier(), str(tmp_path / 'tiny.tflite'), int8=True)
@@ -0,0 +1,46 @@
+import json
+
+import pandas as pd
+
+from src.analysis import risk_rules, weather_risk
+
+
+def _humid_warm_week():
+    # Warm, dry and very humid every day: fits maize and rice rules alike
+    return pd.DataFrame({
+        'time': pd.date_range('2024-07-01', periods=7, freq='D'),
+        'temperature_2m_max': [28.0] * 7,
+        'relative_humidity_2m_mean': [92.0] * 7,
+        'precipitation_sum': [0.0] * 7,
+    })
+
+
+def test_only_the_selected_crops_rules_raise_alerts():
+    maize = risk_rules.rules_for_crop("Maize")
+    assert {rule.rule_id for rule in maize} == {"fungal_common_rust", "fall_armyworm"}
+
+    alerted = {i.rule_id for i in weather_risk.analyze_forecast_for_risk(_humid_warm_week(), maize)}
+    assert alerted == {"fungal_common_rust", "fall_armyworm"}
+    all_crops = {i.rule_id for i in weather_risk.analyze_forecast_for_risk(_humid_warm_week())}
+    assert "rice_blast" in all_crops
+
+
+def test_rule_crops_lists_every_crop_once():
+    crops = risk_rules.rule_crops()
+    assert len(crops) == len(set(crops))
+    assert {"Maize", "Rice", "Wheat", "Sugarcane"} <= set(crops)
+
+
+def test_rule_file_from_the_environment_replaces_the_defaults(tmp_path, monkeypatch):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps([
+        {"rule_id": "late_blight", "name": "Late Blight", "min_run_days": 2,
+         "temp_max": 25, "humidity_min": 90, "crops": ["Potato"]},
+        {"rule_id": "generic_humid", "name": "Humid Spell", "min_run_days": 3, "humidity_min": 95},
+    ]))
+    monkeypatch.setenv(risk_rules.RISK_RULES_ENV, str(path))
+
+    rules = risk_rules.active_risk_rules()
+    assert risk_rules.rule_crops(rules) == ["Potato"]
+    assert [rule.rule_id for rule in risk_rules.rules_for_crop("Potato", rules)] == ["late_blight", "generic_humid"]
+    assert [rule.rule_id for rule in risk_rules.rules_for_crop("Rice", rules)] == ["generic_humid"]
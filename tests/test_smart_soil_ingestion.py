@@ -0,0 +1,28 @@
+import time
+
+import pandas as pd
+
+from src.data_ingestion import smart_soil_ingestion
+
+
+def test_concurrent_tiers_share_one_absolute_deadline(monkeypatch):
+    calls = {}
+
+    def slow_isric(lat, lon, timeout=None, deadline=None, session=None):
+        calls['isric'] = deadline
+        time.sleep(0.3)
+        return pd.DataFrame()
+
+    def fast_bhuvan(lat, lon, timeout=None, deadline=None):
+        calls['bhuvan'] = deadline
+        return next(iter(smart_soil_ingestion.BHUVAN_SOIL_LOOKUP))
+
+    monkeypatch.setattr(smart_soil_ingestion, 'get_soil_data_isric', slow_isric)
+    monkeypatch.setattr(smart_soil_ingestion, 'get_soil_type_bhuvan', fast_bhuvan)
+    start = time.monotonic()
+    soil_df, tier = smart_soil_ingestion.resolve_soil_tiers_concurrent(20.3, 85.8, deadline=0.1)
+
+    # The Bhuvan answer is held for ISRIC until the deadline, not for ISRIC's full call
+    assert tier == smart_soil_ingestion.TIER_BHUVAN and not soil_df.empty
+    assert time.monotonic() - start < 0.25
+    assert calls['isric'] == calls['bhuvan'] and abs(calls['isric'] - (start + 0.1)) < 0.05
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from src.data_ingestion import soil_cache
+
+
+def _soil(ph):
+    return pd.DataFrame([{'ph': ph}])
+
+
+def test_eviction_runs_periodically_and_bounds_the_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(soil_cache, 'SOIL_CACHE_EVICT_EVERY', 10)
+    db_path = str(tmp_path / 'soil.sqlite')
+    for i in range(25):
+        soil_cache.put_cached_soil(20 + i * 0.01, 85, _soil(6.5), "isric", db_path=db_path, max_entries=5)
+    # Evicted on writes 1, 11 and 21, so at most EVICT_EVERY - 1 rows over the limit
+    cells = int(soil_cache.soil_cache_stats(db_path)['cells'].sum())
+    assert cells == 5 + 4
+    soil_cache.clear_soil_cache(db_path)
+
+
+def test_expiry_delete_uses_the_expires_index(tmp_path):
+    conn = soil_cache._get_connection(str(tmp_path / 'soil.sqlite'))
+    plan = conn.execute("EXPLAIN QUERY PLAN DELETE FROM soil_cache WHERE expires_at <= ?", (0,)).fetchall()
+    assert any('idx_soil_cache_expires' in row[-1] for row in plan)
@@ -0,0 +1,19 @@
+from src.data_ingestion import soil_join
+
+# (lat, lon) of towns on both sides of the Odisha border
+BORDER_TOWNS = {
+    "Kharagpur": ((22.35, 87.23), "West Bengal"),
+    "Digha": ((21.63, 87.51), "West Bengal"),
+    "Jagdalpur": ((19.07, 82.03), "Chhattisgarh"),
+    "Raigarh": ((21.90, 83.40), "Chhattisgarh"),
+    "Balasore": ((21.49, 86.93), "Odisha"),
+    "Baripada": ((21.93, 86.73), "Odisha"),
+    "Koraput": ((18.81, 82.71), "Odisha"),
+    "Malkangiri": ((18.35, 81.88), "Odisha"),
+}
+
+
+def test_border_farms_are_not_pulled_into_the_district_state():
+    coords = [point for point, _ in BORDER_TOWNS.values()]
+    states = soil_join.nearest_states([lat for lat, _ in coords], [lon for _, lon in coords])
+    assert dict(zip(BORDER_TOWNS, states)) == {town: state for town, (_, state) in BORDER_TOWNS.items()}
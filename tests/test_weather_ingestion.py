@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from src.data_ingestion import weather_ingestion
+
+
+def test_null_or_missing_wind_becomes_nan(monkeypatch):
+    payload = {"forecast": {"forecastday": [
+        {"date": "2024-06-01", "day": {"totalprecip_mm": 1.0, "avgtemp_c": 30, "avghumidity": 70, "maxwind_kph": 36}},
+        {"date": "2024-06-02", "day": {"totalprecip_mm": 0.0, "avgtemp_c": 31, "avghumidity": 65, "maxwind_kph": None}},
+        {"date": "2024-06-03", "day": {"totalprecip_mm": 0.0, "avgtemp_c": 32, "avghumidity": 60}},
+    ]}}
+    monkeypatch.setattr(weather_ingestion, 'fetch_json', lambda *args, **kwargs: payload)
+    forecast = weather_ingestion.get_weatherapi_forecast(20.3, 85.8, "key")
+    assert forecast["wind_speed_ms"].iloc[0] == pytest.approx(10.0)
+    assert np.isnan(forecast["wind_speed_ms"].iloc[1:]).all()
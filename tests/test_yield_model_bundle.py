@@ -0,0 +1,20 @@
+from src.ml import yield_model_bundle
+
+MANIFEST = {
+    "version": "20240101-000000",
+    "national_shard": "national",
+    "shards": {
+        "national": {"file": "national.joblib", "state": None},
+        "odisha": {"file": "odisha.joblib", "state": "Odisha", "routable": True},
+    },
+    "training": {"states": ["Odisha", "Punjab"]},
+}
+
+
+def test_states_without_training_rows_are_reported_once(capsys):
+    assert yield_model_bundle.route_shards(MANIFEST, ["Odisha", "Punjab", "Goa"]) == ["odisha", "national", "national"]
+
+    assert yield_model_bundle.warn_untrained_states(MANIFEST, ["Odisha", "Punjab", "Goa"]) == ["Goa"]
+    assert "Goa" in capsys.readouterr().out
+    assert yield_model_bundle.warn_untrained_states(MANIFEST, ["Goa"]) == ["Goa"]
+    assert capsys.readouterr().out == ""
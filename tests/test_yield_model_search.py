@@ -0,0 +1,38 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml import yield_model_search
+
+TINY_GRID = {"n_estimators": [5], "max_depth": [3], "min_samples_leaf": [1], "max_features": [1.0]}
+
+
+def test_resumed_run_with_nothing_left_keeps_the_timing_report(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((60, 3)), columns=['a', 'b', 'c'])
+    y = pd.Series(X['a'] * 2 + rng.random(60) * 0.1)
+    run_dir = str(tmp_path / 'search')
+    timing_path = os.path.join(run_dir, yield_model_search.TIMING_FILE)
+
+    yield_model_search.run_search(X, y, TINY_GRID, folds=2, max_workers=1, run_dir=run_dir)
+    with open(timing_path) as f:
+        first = json.load(f)
+    assert first["trials_run"] == 1 and first["parallel_speedup"] > 0
+
+    leaderboard = yield_model_search.run_search(X, y, TINY_GRID, folds=2, max_workers=1, run_dir=run_dir)
+    with open(timing_path) as f:
+        assert json.load(f) == first
+    assert len(leaderboard) == 1
+    assert yield_model_search.best_params(leaderboard, run_dir) == {
+        "max_depth": 3, "max_features": 1.0, "min_samples_leaf": 1, "n_estimators": 5}
+
+    # An empty grid runs nothing and has no best parameters
+    empty_dir = str(tmp_path / 'empty')
+    empty = yield_model_search.run_search(X, y, {**TINY_GRID, "max_depth": []}, folds=2, max_workers=1,
+                                          run_dir=empty_dir)
+    assert empty.empty
+    with pytest.raises(ValueError, match="empty"):
+        yield_model_search.best_params(empty, empty_dir)